@@ -0,0 +1,27 @@
+"""prediction deadlines
+
+Revision ID: 0b8d4f6e2a19
+Revises: f1a6c2d9e457
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision = '0b8d4f6e2a19'
+down_revision = 'f1a6c2d9e457'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('access_policy', sa.Column('request_timeout', sa.Float(), nullable=True))
+    op.add_column('service_call', sa.Column('time_expired', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    op.drop_column('service_call', 'time_expired')
+    op.drop_column('access_policy', 'request_timeout')
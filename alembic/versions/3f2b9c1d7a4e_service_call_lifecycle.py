@@ -0,0 +1,71 @@
+"""service call lifecycle and latency stats
+
+Revision ID: 3f2b9c1d7a4e
+Revises: 186644cdd6f7
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2b9c1d7a4e'
+down_revision = '186644cdd6f7'
+branch_labels = None
+depends_on = None
+
+
+LATENCY_STATS_VIEW = """
+CREATE MATERIALIZED VIEW service_call_latency_stats AS
+SELECT
+    sc.model_id,
+    w.window_name,
+    count(*) AS calls,
+    count(sc.time_failed) AS failures,
+    percentile_cont(0.50) WITHIN GROUP (ORDER BY sc.queue_latency) AS queue_p50,
+    percentile_cont(0.95) WITHIN GROUP (ORDER BY sc.queue_latency) AS queue_p95,
+    percentile_cont(0.99) WITHIN GROUP (ORDER BY sc.queue_latency) AS queue_p99,
+    percentile_cont(0.50) WITHIN GROUP (ORDER BY sc.run_latency) AS run_p50,
+    percentile_cont(0.95) WITHIN GROUP (ORDER BY sc.run_latency) AS run_p95,
+    percentile_cont(0.99) WITHIN GROUP (ORDER BY sc.run_latency) AS run_p99,
+    percentile_cont(0.50) WITHIN GROUP (ORDER BY sc.total_latency) AS total_p50,
+    percentile_cont(0.95) WITHIN GROUP (ORDER BY sc.total_latency) AS total_p95,
+    percentile_cont(0.99) WITHIN GROUP (ORDER BY sc.total_latency) AS total_p99
+FROM (
+    VALUES ('5m', interval '5 minutes'), ('1h', interval '1 hour'), ('24h', interval '24 hours')
+) AS w(window_name, span)
+JOIN service_call sc ON sc.time_requested >= now() - w.span
+WHERE sc.total_latency IS NOT NULL
+GROUP BY sc.model_id, w.window_name
+"""
+
+
+def upgrade():
+    op.add_column('service_call', sa.Column('time_started', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('service_call', sa.Column('time_failed', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('service_call', sa.Column('queue_latency', sa.Float(), nullable=True))
+    op.add_column('service_call', sa.Column('run_latency', sa.Float(), nullable=True))
+    op.add_column('service_call', sa.Column('total_latency', sa.Float(), nullable=True))
+    op.create_index(op.f('ix_service_call_celery_task_id'), 'service_call', ['celery_task_id'], unique=False)
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(LATENCY_STATS_VIEW)
+        # Unique index required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+        op.execute(
+            "CREATE UNIQUE INDEX ix_service_call_latency_stats "
+            "ON service_call_latency_stats (model_id, window_name)"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP MATERIALIZED VIEW IF EXISTS service_call_latency_stats")
+
+    op.drop_index(op.f('ix_service_call_celery_task_id'), table_name='service_call')
+    op.drop_column('service_call', 'total_latency')
+    op.drop_column('service_call', 'run_latency')
+    op.drop_column('service_call', 'queue_latency')
+    op.drop_column('service_call', 'time_failed')
+    op.drop_column('service_call', 'time_started')
@@ -0,0 +1,27 @@
+"""service call cancellation
+
+Revision ID: 5c7e1b3a9d20
+Revises: 0b8d4f6e2a19
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision = '5c7e1b3a9d20'
+down_revision = '0b8d4f6e2a19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('service_call', sa.Column('time_cancelled', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('service_call', sa.Column('quota_refunded', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade():
+    op.drop_column('service_call', 'quota_refunded')
+    op.drop_column('service_call', 'time_cancelled')
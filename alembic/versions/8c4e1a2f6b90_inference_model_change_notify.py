@@ -0,0 +1,45 @@
+"""notify inference_model changes
+
+Revision ID: 8c4e1a2f6b90
+Revises: 3f2b9c1d7a4e
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4e1a2f6b90'
+down_revision = '3f2b9c1d7a4e'
+branch_labels = None
+depends_on = None
+
+
+NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_inference_model_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('inference_model_changed', COALESCE(NEW.id, OLD.id)::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+NOTIFY_TRIGGER = """
+CREATE TRIGGER inference_model_changed
+AFTER INSERT OR UPDATE OR DELETE ON inference_model
+FOR EACH ROW EXECUTE FUNCTION notify_inference_model_changed()
+"""
+
+
+def upgrade():
+    # LISTEN/NOTIFY only exists on Postgres, other databases rely on the registry miss fallback
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(NOTIFY_FUNCTION)
+        op.execute(NOTIFY_TRIGGER)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS inference_model_changed ON inference_model")
+        op.execute("DROP FUNCTION IF EXISTS notify_inference_model_changed()")
@@ -0,0 +1,34 @@
+"""model traffic split
+
+Revision ID: a71d3e5c9f02
+Revises: 8c4e1a2f6b90
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision = 'a71d3e5c9f02'
+down_revision = '8c4e1a2f6b90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('inference_model', sa.Column('traffic_percent', sa.Float(), server_default='0', nullable=False))
+    # Batch mode recreates the table on SQLite, which cannot ALTER foreign keys
+    with op.batch_alter_table('service_call') as batch_op:
+        batch_op.add_column(sa.Column('served_model_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_service_call_served_model_id', 'inference_model', ['served_model_id'], ['id']
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('service_call') as batch_op:
+        batch_op.drop_constraint('fk_service_call_served_model_id', type_='foreignkey')
+        batch_op.drop_column('served_model_id')
+    op.drop_column('inference_model', 'traffic_percent')
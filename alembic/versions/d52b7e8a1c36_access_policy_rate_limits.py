@@ -0,0 +1,27 @@
+"""access policy rate limits
+
+Revision ID: d52b7e8a1c36
+Revises: a71d3e5c9f02
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision = 'd52b7e8a1c36'
+down_revision = 'a71d3e5c9f02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('access_policy', sa.Column('requests_per_second', sa.Integer(), nullable=True))
+    op.add_column('access_policy', sa.Column('requests_per_minute', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('access_policy', 'requests_per_minute')
+    op.drop_column('access_policy', 'requests_per_second')
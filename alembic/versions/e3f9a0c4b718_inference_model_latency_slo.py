@@ -0,0 +1,25 @@
+"""inference model latency slo
+
+Revision ID: e3f9a0c4b718
+Revises: d52b7e8a1c36
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3f9a0c4b718'
+down_revision = 'd52b7e8a1c36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('inference_model', sa.Column('latency_slo', sa.Float(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('inference_model', 'latency_slo')
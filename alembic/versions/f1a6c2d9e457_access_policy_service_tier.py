@@ -0,0 +1,28 @@
+"""access policy service tier
+
+Revision ID: f1a6c2d9e457
+Revises: e3f9a0c4b718
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a6c2d9e457'
+down_revision = 'e3f9a0c4b718'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'access_policy',
+        sa.Column('service_tier', sa.String(length=16), server_default='standard', nullable=False)
+    )
+
+
+def downgrade():
+    op.drop_column('access_policy', 'service_tier')
@@ -0,0 +1,86 @@
+from uuid import uuid4
+
+import httpx
+from celery import current_app
+from sqlalchemy import update
+
+from benchmarks.harness import measure_async, scenario
+from project import create_app
+from project.database import async_session_maker
+from project.inference import policies, rate_limit, views
+from project.inference.models import AccessPolicy
+
+TEMPERATURE_INPUT = {"latitude": 40, "longitude": -74, "month": 6, "hour": 14}
+
+
+def _client(user) -> httpx.AsyncClient:
+    app = create_app()
+    # Authentication is benchmarked separately, the token round trip would dominate here
+    app.dependency_overrides[views.current_active_user] = lambda: user
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+
+@scenario("predict_endpoint")
+async def bench_predict_endpoint(ctx: dict, args) -> dict:
+    """
+    POST /predict-temp end to end: access check, ServiceCall insert, enqueue.
+    """
+    url = f"/api/v1/inference/predict-temp/{ctx['model'].id}"
+    async with _client(ctx["user"]) as client:
+        async def call():
+            response = await client.post(url, json=TEMPERATURE_INPUT)
+            response.raise_for_status()
+
+        await call()  # warmup
+        return await measure_async(call, args.repeat, concurrency=args.concurrency)
+
+
+@scenario("task_status_polling")
+async def bench_task_status_polling(ctx: dict, args) -> dict:
+    backend = current_app.backend
+    task_ids = [str(uuid4()) for _ in range(args.repeat)]
+    for task_id in task_ids:
+        backend.store_result(task_id, {"temperature": 21.5}, "SUCCESS")
+
+    pending = iter(task_ids)
+    async with _client(ctx["user"]) as client:
+        async def call():
+            response = await client.get(f"/api/v1/inference/task_status/{next(pending)}")
+            response.raise_for_status()
+
+        return await measure_async(call, args.repeat, concurrency=args.concurrency)
+
+
+async def _set_rate_limits(policy_id: int, **limits):
+    async with async_session_maker() as session:
+        await session.execute(update(AccessPolicy).where(AccessPolicy.id == policy_id).values(**limits))
+        await session.commit()
+    policies.clear_policy_cache()
+
+
+@scenario("rate_limit")
+async def bench_rate_limit(ctx: dict, args) -> dict:
+    """
+    Per request cost of the rate limit dependency: an unlimited policy (a
+    dict lookup), limits checked by the GCRA script, and a policy cache
+    miss. Redis is fakeredis here, add a network round trip in production.
+    """
+    user, model_id = ctx["user"], ctx["model"].id
+
+    async def call():
+        async with async_session_maker() as session:
+            await rate_limit.enforce_rate_limit(model_id, user, session)
+
+    async def call_uncached():
+        policies.clear_policy_cache()
+        await call()
+
+    results = {}
+    await _set_rate_limits(ctx["policy"].id, requests_per_second=None, requests_per_minute=None)
+    results["unlimited"] = await measure_async(call, args.repeat)
+    # Limits high enough that no request is rejected
+    await _set_rate_limits(ctx["policy"].id, requests_per_second=10**6, requests_per_minute=10**8)
+    results["limited"] = await measure_async(call, args.repeat)
+    results["policy_miss"] = await measure_async(call_uncached, args.repeat)
+    await _set_rate_limits(ctx["policy"].id, requests_per_second=None, requests_per_minute=None)
+    return results
@@ -0,0 +1,76 @@
+from benchmarks.harness import measure, scenario
+from project.inference.ml_models.protocol import validate_columns
+from project.inference.ml_models.tempertaure_predictor import TemperatureModel
+from project.inference.model_registry import get_model
+
+BATCH_SIZES = (1, 100, 100_000)
+
+
+def _columns(n_rows: int) -> dict:
+    rows = range(n_rows)
+    return {
+        "latitude": [i % 180 - 90 for i in rows],
+        "longitude": [i % 360 - 180 for i in rows],
+        "month": [i % 12 + 1 for i in rows],
+        "hour": [i % 24 for i in rows],
+    }
+
+
+@scenario("batch_predict")
+async def bench_batch_predict(ctx: dict, args) -> dict:
+    """
+    Rows per second of the temperature model scored row by row (one
+    pydantic Input and one predict per row) against one columnar validation
+    and one predict_batch call.
+    """
+    model = get_model(ctx["model"].id)
+
+    results = {}
+    for n_rows in BATCH_SIZES:
+        columns = _columns(n_rows)
+        rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+        repeat = max(1, min(args.repeat, 10_000 // n_rows))
+
+        def per_row():
+            for row in rows:
+                model.predict(model.Input(**row))
+
+        def columnar():
+            model.predict_batch(validate_columns(model, columns))
+
+        for mode, func in (("per_row", per_row), ("columnar", columnar)):
+            stats = measure(func, repeat)
+            stats["rows_per_s"] = stats["throughput_per_s"] * n_rows
+            results[f"{mode}_{n_rows}"] = stats
+    return results
+
+
+@scenario("linear_kernel")
+async def bench_linear_kernel(ctx: dict, args) -> dict:
+    """
+    Rows per second of the fitted sklearn estimator's predict against the
+    compiled kernel, as a NumPy dot for batches and in plain Python for a
+    single row.
+    """
+    import numpy as np
+
+    estimator = TemperatureModel.fit_estimator()
+    kernel = TemperatureModel.compile_kernel()
+
+    results = {}
+    for n_rows in BATCH_SIZES:
+        X = np.column_stack(list(_columns(n_rows).values())).astype(float)
+        repeat = max(1, min(args.repeat, 10_000 // n_rows))
+        modes = {
+            "sklearn": lambda: estimator.predict(X),
+            "kernel": lambda: kernel.predict_batch(X),
+        }
+        if n_rows == 1:
+            row = X[0].tolist()
+            modes["kernel_row"] = lambda: kernel.predict_row(row)
+
+        for mode, func in modes.items():
+            stats = measure(func, repeat)
+            stats["rows_per_s"] = stats["throughput_per_s"] * n_rows
+            results[f"{mode}_{n_rows}"] = stats
+    return results
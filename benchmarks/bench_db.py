@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
+from benchmarks.harness import measure_async, scenario
+from project.database import async_session_maker
+from project.inference import crud
+from project.inference.models import ServiceCall
+
+SERVICE_CALL_SIZES = (0, 1_000, 10_000, 50_000)
+
+
+async def _grow_service_calls(ctx: dict, target: int, current: int):
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "model_id": ctx["model"].id,
+            "user_id": ctx["user"].id,
+            # Spread over the month so both the daily and monthly counts scan them
+            "time_requested": now - timedelta(minutes=i % (60 * 24 * 20)),
+        }
+        for i in range(target - current)
+    ]
+    async with async_session_maker() as session:
+        for start in range(0, len(rows), 5_000):
+            await session.execute(insert(ServiceCall), rows[start:start + 5_000])
+        await session.commit()
+
+
+@scenario("access_check_scaling")
+async def bench_access_check_scaling(ctx: dict, args) -> dict:
+    """
+    check_user_access_and_update latency as the user's service_call history grows.
+    """
+    results = {}
+    current = 0
+    for size in SERVICE_CALL_SIZES:
+        await _grow_service_calls(ctx, size, current)
+        current = size
+
+        async with async_session_maker() as session:
+            async def call():
+                granted, message = await crud.check_user_access_and_update(
+                    session, ctx["user"].id, ctx["model"].id
+                )
+                assert granted, message
+
+            results[f"service_calls_{size}"] = await measure_async(call, args.repeat)
+    return results
@@ -0,0 +1,63 @@
+import os
+import re
+import subprocess
+import sys
+
+from benchmarks.harness import scenario, summarize
+
+HEAVY_MODULES = ("numpy", "sklearn", "scipy", "pandas", "pyarrow")
+
+PROCESSES = {
+    # What uvicorn loads for `main:app`
+    "web": "import main",
+    # What `celery -A main.celery worker` loads, plus the model warmup of a worker child
+    "worker": (
+        "import main; "
+        "from project.inference.model_registry import warmup_models; "
+        "warmup_models()"
+    ),
+}
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def _import_profile(code: str) -> tuple[float, dict, set]:
+    """
+    Run `code` in a fresh interpreter with -X importtime and return the total
+    import time in seconds, the cumulative time of each top-level import and
+    the names of every imported module.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=os.environ.copy(), check=True,
+    )
+    top_level, modules = {}, set()
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        modules.add(match.group(4))
+        if len(match.group(3)) == 1:
+            top_level[match.group(4)] = int(match.group(2)) / 1e6
+    return sum(top_level.values()), top_level, modules
+
+
+@scenario("import_time")
+async def bench_import_time(ctx: dict, args) -> dict:
+    """
+    Cold import cost of the web and worker processes (python -X importtime).
+    """
+    results = {}
+    for process, code in PROCESSES.items():
+        samples, profile, modules = [], {}, set()
+        for _ in range(3):
+            total, profile, modules = _import_profile(code)
+            samples.append(total)
+        stats = summarize(samples)
+        stats["heavy_modules"] = sorted(m for m in HEAVY_MODULES if m in modules)
+        stats["slowest_imports_ms"] = [
+            [name, round(seconds * 1000, 1)]
+            for name, seconds in sorted(profile.items(), key=lambda kv: -kv[1])[:10]
+        ]
+        results[process] = stats
+    return results
@@ -0,0 +1,31 @@
+import time
+
+from benchmarks.harness import measure, scenario, summarize
+from project.inference.tasks import run_model
+
+
+@scenario("run_model")
+async def bench_run_model(ctx: dict, args) -> dict:
+    """
+    run_model executed in-process: the first call pays the sklearn/numpy
+    imports (cold), later calls with new inputs miss the cache (warm) and
+    repeated inputs are served from Redis (cache_hit).
+    """
+    model_id = ctx["model"].id
+    counter = iter(range(10**9))
+
+    def fresh_input():
+        i = next(counter)
+        return {"latitude": i % 180 - 90, "longitude": i % 360 - 180, "month": i % 12 + 1, "hour": i % 24}
+
+    t0 = time.perf_counter()
+    run_model(model_id, fresh_input())
+    cold = summarize([time.perf_counter() - t0])
+
+    warm = measure(lambda: run_model(model_id, fresh_input()), args.repeat)
+
+    cached_input = fresh_input()
+    run_model(model_id, cached_input)
+    cache_hit = measure(lambda: run_model(model_id, cached_input), args.repeat)
+
+    return {"cold": cold, "warm": warm, "cache_hit": cache_hit}
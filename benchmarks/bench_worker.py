@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import urlparse
+
+from celery import shared_task
+
+from benchmarks.env import TEMPERATURE_MODEL_INDEX
+from benchmarks.harness import scenario, summarize
+from project.celery_utils import create_celery
+from project.config import settings
+from project.inference.model_registry import get_model
+
+WORKER_CONCURRENCY = 4
+WORKER_READY_TIMEOUT = 60
+
+
+@shared_task(name="benchmarks.score")
+def bench_score(model_id: int, input_data: dict, published_at: float) -> dict:
+    """
+    The run_model prediction without its cache and ServiceCall bookkeeping,
+    returning when it finished so latency includes the broker round trip.
+    """
+    model = get_model(model_id)
+    result = model.predict(model.Input(**input_data)).dict()
+    return {"result": result, "latency": time.time() - published_at}
+
+
+def _start_worker(name: str) -> tuple[subprocess.Popen, str]:
+    """
+    A worker process configured by CELERY_PROFILE the way deployments start
+    it, so its pool type and max_tasks_per_child are the profile's own.
+    """
+    nodename = f"bench-{name}@{os.uname().nodename}"
+    command = [
+        sys.executable, "-m", "celery", "-A", "main.celery", "worker",
+        "--hostname", nodename,
+        "--queues", "default",
+        "--include", __name__,
+        "--concurrency", str(WORKER_CONCURRENCY),
+        "--without-gossip", "--without-mingle", "--without-heartbeat",
+        "--loglevel", "WARNING",
+    ]
+    env = dict(os.environ, CELERY_PROFILE=name, MODEL_WARMUP="true")
+    return subprocess.Popen(command, env=env), nodename
+
+
+def _wait_until_ready(app, worker: subprocess.Popen, nodename: str):
+    deadline = time.monotonic() + WORKER_READY_TIMEOUT
+    while not app.control.ping(destination=[nodename], timeout=0.5):
+        if worker.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError(f"Benchmark worker {nodename} did not start")
+
+
+def _run_profile(name: str, repeat: int) -> dict:
+    app = create_celery()
+    worker, nodename = _start_worker(name)
+    try:
+        _wait_until_ready(app, worker, nodename)
+        start = time.perf_counter()
+        results = [
+            bench_score.apply_async(
+                args=(TEMPERATURE_MODEL_INDEX, {"latitude": i % 180 - 90, "longitude": i % 360 - 180,
+                                                "month": i % 12 + 1, "hour": i % 24}, time.time()),
+                queue="default",
+            )
+            for i in range(repeat)
+        ]
+        latencies = [result.get(timeout=60)["latency"] for result in results]
+        wall_time = time.perf_counter() - start
+    finally:
+        worker.terminate()
+        worker.wait(timeout=30)
+    return summarize(latencies, wall_time)
+
+
+@scenario("worker_profiles")
+async def bench_worker_profiles(ctx: dict, args) -> dict:
+    """
+    A burst of predictions through a real worker process per Celery
+    performance profile, started with the profile's pool, prefetch, acks,
+    result expiry and max_tasks_per_child.
+
+    Worker processes cannot share the in-process memory:// broker or the
+    fake Redis, so the scenario needs CELERY_BROKER_URL and
+    CELERY_RESULT_BACKEND pointing at a Redis server and is skipped
+    otherwise.
+    """
+    broker = urlparse(settings.CELERY_BROKER_URL).scheme
+    backend = urlparse(settings.CELERY_RESULT_BACKEND).scheme
+    if broker not in ("redis", "rediss") or backend not in ("redis", "rediss"):
+        return {"skipped": f"needs a Redis broker and result backend, got {broker} and {backend}"}
+
+    results = {"broker": broker}
+    for name, profile in settings.CELERY_PERFORMANCE_PROFILES.items():
+        results[name] = _run_profile(name, args.repeat)
+        results[name]["profile"] = profile
+    return results
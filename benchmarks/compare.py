@@ -0,0 +1,62 @@
+"""
+Compare two benchmark result files and flag latency regressions.
+
+    python -m benchmarks.compare base.json head.json --threshold 0.10
+
+Exits with status 1 when any p95 grows by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+METRIC = "p95_ms"
+
+
+def _flatten(results: dict, prefix: str = "") -> dict:
+    """
+    Map "scenario.case" -> stats for every dict holding the compared metric.
+    """
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and METRIC in value:
+            flat[name] = value
+        elif isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+    return flat
+
+
+def compare(base: dict, head: dict, threshold: float) -> list:
+    base_stats = _flatten(base["results"])
+    head_stats = _flatten(head["results"])
+    rows = []
+    for name in sorted(base_stats.keys() & head_stats.keys()):
+        before, after = base_stats[name][METRIC], head_stats[name][METRIC]
+        change = (after - before) / before if before else 0.0
+        rows.append((name, before, after, change, change > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    rows = compare(base, head, args.threshold)
+    print(f"{'benchmark':<50} {'base ' + METRIC:>14} {'head ' + METRIC:>14} {'change':>8}")
+    for name, before, after, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<50} {before:>14.3f} {after:>14.3f} {change:>+8.1%}{flag}")
+
+    sys.exit(1 if any(row[-1] for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Local stand-ins for the external services, so benchmarks run without a
+broker or a Redis server. Must be imported before anything from `project`.
+"""
+import os
+
+os.environ.setdefault("FASTAPI_CONFIG", "testing")
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+
+import fakeredis  # noqa: E402
+from fakeredis import aioredis  # noqa: E402
+from uuid import uuid4  # noqa: E402
+
+from project import redis_utils  # noqa: E402
+from project.inference import bulk  # noqa: E402
+from project.database import create_db_and_tables, async_session_maker  # noqa: E402
+from project.fu_core.users.models import User  # noqa: E402
+from project.inference.models import AccessPolicy, InferenceModel, UserAccess  # noqa: E402
+from project.inference.model_registry import model_registry  # noqa: E402
+
+TEMPERATURE_MODEL_INDEX = 2
+
+fake_server = fakeredis.FakeServer()
+fake_redis = fakeredis.FakeStrictRedis(server=fake_server)
+# The request path uses the asyncio client, sharing the data of the blocking one
+fake_async_redis = aioredis.FakeRedis(server=fake_server)
+
+
+def patch_redis():
+    redis_utils.redis_client = fake_redis
+    redis_utils.async_redis_client = fake_async_redis
+    bulk.redis_client = fake_redis
+    fake_redis.flushall()
+
+
+async def seed_benchmark_objects() -> dict:
+    """
+    A user with unlimited access to a fresh model, so quotas never interfere
+    with the measurements.
+    """
+    await create_db_and_tables()
+    async with async_session_maker() as session:
+        policy = AccessPolicy(name="benchmark", daily_api_calls=10**9, monthly_api_calls=10**9)
+        session.add(policy)
+        await session.flush()
+
+        model = InferenceModel(
+            name="temperature_model",
+            problem="regression",
+            category="temperature",
+            version="1.0.0",
+            access_policy_id=policy.id,
+        )
+        user = User(
+            id=uuid4(),
+            email=f"bench_{uuid4()}@example.com",
+            hashed_password="benchmark",
+            is_active=True,
+            is_superuser=False,
+            is_verified=True,
+        )
+        session.add_all([model, user])
+        await session.flush()
+
+        session.add(UserAccess(user_id=user.id, model_id=model.id, access_policy_id=policy.id))
+        await session.commit()
+
+    # Serve the seeded row with the temperature model implementation
+    model_registry[model.id] = model_registry[TEMPERATURE_MODEL_INDEX]
+    return {"policy": policy, "model": model, "user": user}
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict
+
+# Dictionary to store benchmark scenarios
+scenario_registry: Dict[str, Callable] = {}
+
+
+def scenario(name: str):
+    def decorator(func: Callable):
+        scenario_registry[name] = func
+        return func
+    return decorator
+
+
+def _quantile(sorted_values: list, q: float) -> float:
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(samples: list, wall_time: float | None = None) -> dict:
+    """
+    Latency percentiles in milliseconds and throughput in operations per second.
+    """
+    values = sorted(samples)
+    wall_time = wall_time if wall_time is not None else sum(values)
+    return {
+        "n": len(values),
+        "mean_ms": sum(values) / len(values) * 1000,
+        "p50_ms": _quantile(values, 0.50) * 1000,
+        "p95_ms": _quantile(values, 0.95) * 1000,
+        "p99_ms": _quantile(values, 0.99) * 1000,
+        "max_ms": values[-1] * 1000,
+        "throughput_per_s": len(values) / wall_time if wall_time else None,
+    }
+
+
+def measure(func: Callable, repeat: int) -> dict:
+    samples = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples, time.perf_counter() - start)
+
+
+async def measure_async(coro_func: Callable, repeat: int, concurrency: int = 1) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def timed():
+        async with semaphore:
+            t0 = time.perf_counter()
+            await coro_func()
+            samples.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed() for _ in range(repeat)))
+    return summarize(samples, time.perf_counter() - start)
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: str, results: dict, config: dict):
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            **config,
+        },
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    return report
@@ -0,0 +1,64 @@
+"""
+Run the inference API benchmarks and write the results as JSON.
+
+    python -m benchmarks.run --output bench.json
+    FASTAPI_CONFIG=development python -m benchmarks.run  # Postgres from POSTGRES_* env vars
+
+Compare two runs with `python -m benchmarks.compare base.json head.json`.
+"""
+import argparse
+import asyncio
+import logging
+import os
+
+from benchmarks import env
+
+# Scenario modules register themselves on import, in execution order
+from benchmarks import bench_import, bench_tasks, bench_batch, bench_api, bench_db, bench_worker  # noqa: F401
+from benchmarks.harness import scenario_registry, write_results
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--scenario", action="append", choices=sorted(scenario_registry),
+        help="Run only these scenarios (default: all)",
+    )
+    return parser.parse_args(argv)
+
+
+async def run(args) -> dict:
+    env.patch_redis()
+    ctx = await env.seed_benchmark_objects()
+
+    results = {}
+    for name, func in scenario_registry.items():
+        if args.scenario and name not in args.scenario:
+            continue
+        logger.info(f"Running benchmark {name}")
+        results[name] = await func(ctx, args)
+    return results
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger("project").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    args = parse_args(argv)
+
+    results = asyncio.run(run(args))
+    write_results(args.output, results, {
+        "config": os.environ["FASTAPI_CONFIG"],
+        "repeat": args.repeat,
+        "concurrency": args.concurrency,
+    })
+    logger.info(f"Benchmark results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
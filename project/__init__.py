@@ -1,11 +1,11 @@
 import logging
 from fastapi import FastAPI, Depends
-from sqladmin import Admin
 from project.config import settings
 from project.database import engine
 from project.fu_core import fastapi_users_router
 from project.inference import inference_router
-from project.database import engine, get_async_session
+from project.database import engine, async_session_maker, get_async_session
+from project.inference.registry_service import registry_service
 from project.inference.seeders import seed_inference_data
 
 logger = logging.getLogger(__name__)
@@ -19,14 +19,32 @@ def create_app() -> FastAPI:
     
     app = FastAPI()
 
+    from project.metrics import metrics_endpoint, metrics_middleware, register_db_pool_collector
+    app.middleware("http")(metrics_middleware)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+    register_db_pool_collector(engine)
+
     from project.celery_utils import create_celery
     app.celery_app = create_celery()
 
     @app.on_event("startup")
     async def on_startup():
+        from project.fu_core.security import get_jwt_strategy
+        # Missing or inconsistent signing keys fail the startup, not the first login
+        get_jwt_strategy()
         async for session in get_async_session():
-            logger.info("Seeding the database with initial data...")
-            await seed_inference_data(session)
+            # Deploys running `python -m project.cli seed` once can turn this off
+            if settings.SEED_ON_STARTUP:
+                logger.info("Seeding the database with initial data...")
+                await seed_inference_data(session)
+            await registry_service.load(session)
+        await registry_service.start_listener(engine, async_session_maker)
+
+    @app.on_event("shutdown")
+    async def on_shutdown():
+        from project.celery_utils import shutdown_publisher
+        shutdown_publisher()
+        await registry_service.stop_listener()
 
     @app.get("/")
     async def root():
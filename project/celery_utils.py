@@ -1,21 +1,69 @@
 from celery import current_app as current_celery_app
 from celery.result import AsyncResult
 from project.config import settings
+from project.metrics import TASK_PUBLISH_LATENCY
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import functools
 import logging
+import time
 from celery import shared_task
 from celery.utils.log import get_task_logger
-from celery.exceptions import MaxRetriesExceededError
+from celery.exceptions import MaxRetriesExceededError, Retry
 
 logger = get_task_logger(__name__)
 
 def create_celery():
+    import project.metrics  # noqa: F401 - connects the task metric signal handlers
+
     celery_app = current_celery_app
     celery_app.config_from_object(settings, namespace="CELERY")
 
     return celery_app
 
 
+_publish_executor: ThreadPoolExecutor | None = None
+
+
+def _get_publish_executor() -> ThreadPoolExecutor:
+    global _publish_executor
+    if _publish_executor is None:
+        _publish_executor = ThreadPoolExecutor(
+            max_workers=settings.CELERY_PUBLISH_THREADS, thread_name_prefix="celery-publish"
+        )
+    return _publish_executor
+
+
+async def enqueue_task(task, args=(), kwargs=None, **options):
+    """
+    Publish a task without blocking the event loop.
+
+    kombu writes to the broker socket synchronously, so the publish runs on a
+    dedicated thread pool; the producer pool keeps the broker connections
+    open between publishes. With the Redis transport the call returns once
+    the server acknowledged the write.
+    """
+    loop = asyncio.get_running_loop()
+    publish = functools.partial(task.apply_async, args=args, kwargs=kwargs, **options)
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        result = await loop.run_in_executor(_get_publish_executor(), publish)
+        outcome = "ok"
+        return result
+    finally:
+        TASK_PUBLISH_LATENCY.labels(task=task.name, outcome=outcome).observe(
+            time.perf_counter() - start
+        )
+
+
+def shutdown_publisher():
+    global _publish_executor
+    if _publish_executor is not None:
+        _publish_executor.shutdown(wait=True)
+        _publish_executor = None
+
+
 def get_task_info(task_id):
     """
     return task info according to the task_id
@@ -37,13 +85,18 @@ def get_task_info(task_id):
 
 
 
-@shared_task
+@shared_task(ignore_result=True)
 def dummy_task():
     return "This is a dummy task."
 
 
 
 class custom_celery_task:
+    """
+    Task decorator owning the retry policy: the only place a task is
+    retried, with exponential backoff up to `max_retries`. Non-retryable
+    exceptions and exhausted retries go to the dead-letter queue.
+    """
 
     EXCEPTION_BLOCK_LIST = (
         IndexError,
@@ -71,10 +124,17 @@ class custom_celery_task:
                     result = func(*args, **kwargs)
                 logger.info(f"Completed task {func.__name__} with result: {result}")
                 return result
+            except Retry:
+                raise
             except self.EXCEPTION_BLOCK_LIST as e:
                 logger.error(f"Task {func.__name__} failed with non-retryable exception: {e}")
+                self._dead_letter(task_func, e)
                 raise
             except Exception as e:
+                if task_func.request.retries >= task_func.max_retries:
+                    logger.error(f"Task {func.__name__} failed after {task_func.request.retries} retries: {e}")
+                    self._dead_letter(task_func, e)
+                    raise
                 logger.error(f"Task {func.__name__} failed with exception: {e}")
                 countdown = self._get_retry_countdown(task_func)
                 raise task_func.retry(exc=e, countdown=countdown)
@@ -82,6 +142,13 @@ class custom_celery_task:
         task_func = shared_task(*self.task_args, **self.task_kwargs)(wrapper_func)
         return task_func
 
+    @staticmethod
+    def _dead_letter(task_func, exc: Exception):
+        from project import dead_letter
+
+        request = task_func.request
+        dead_letter.push(task_func.name, request.id, request.args, request.kwargs, exc, request.retries)
+
     def _get_retry_countdown(self, task_func):
         retry_backoff = int(
             max(1.0, float(self.task_kwargs.get('retry_backoff', True)))
@@ -0,0 +1,57 @@
+"""
+Management commands.
+
+    python -m project.cli seed
+    python -m project.cli export-kernels [--version VERSION]
+"""
+import argparse
+import asyncio
+import importlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def seed(args):
+    from project.database import async_session_maker
+    from project.inference.seeders import seed_inference_data
+
+    async with async_session_maker() as session:
+        await seed_inference_data(session)
+    logger.info("Database seeded")
+
+
+async def export_kernels(args):
+    from project.inference.ml_models.linear_kernel import CompiledLinearModel
+    from project.inference.model_registry import model_registry
+
+    for model_id, model_info in sorted(model_registry.items()):
+        if "loader" not in model_info:
+            continue
+        module_name, _, attribute = model_info["loader"].partition(":")
+        model_class = getattr(importlib.import_module(module_name), attribute)
+        if issubclass(model_class, CompiledLinearModel):
+            path = model_class.export_kernel(args.version)
+            logger.info(f"Exported kernel of model {model_id} to {path}")
+
+
+COMMANDS = {
+    "seed": seed,
+    "export-kernels": export_kernels,
+}
+
+
+def main(argv=None):
+    from project.logging import configure_logging
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("--version", help="export-kernels: model version of the artifacts")
+    args = parser.parse_args(argv)
+
+    asyncio.run(COMMANDS[args.command](args))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,8 +14,19 @@ def route_task(name, args, kwargs, options, task=None, **kw):
 
 class BaseConfig:
     API_V1_STR: str = "/api/v1"
-    SECRET_KEY: str = secrets.token_urlsafe(32)
+    # Set it when running several processes, a generated key is only known to this one
+    SECRET_KEY_CONFIGURED: bool = bool(os.getenv('SECRET_KEY'))
+    SECRET_KEY: str = os.getenv('SECRET_KEY') or secrets.token_urlsafe(32)
     JWT_TOKEN_LIFETIME: int = 3600
+    # Access token signing keys, see project/fu_core/keys.py. Without them
+    # tokens are signed with SECRET_KEY
+    JWT_SIGNING_KEYS: str = os.getenv('JWT_SIGNING_KEYS', '')
+    JWT_KEY_FILE: str = os.getenv('JWT_KEY_FILE', '')
+    # kid signing new tokens, the first key by default
+    JWT_ACTIVE_KID: str = os.getenv('JWT_ACTIVE_KID', '')
+    # Web worker processes, as read by uvicorn and gunicorn. Several of them
+    # refuse to start without a configured signing key
+    WEB_CONCURRENCY: int = int(os.getenv('WEB_CONCURRENCY', 1))
 
     BASE_DIR: pathlib.Path = pathlib.Path(__file__).parent.parent
     UPLOAD_DEFAULT_DEST: ClassVar[str] = str(BASE_DIR / "upload")
@@ -35,8 +46,21 @@ class BaseConfig:
     CELERY_BROKER_URL: str = os.environ.get("CELERY_BROKER_URL", "redis://127.0.0.1:6379/0")
     CELERY_RESULT_BACKEND: str = os.environ.get("CELERY_RESULT_BACKEND", "redis://127.0.0.1:6379/0")
 
+    # Bound how long a publish may retry against an unavailable broker
+    CELERY_TASK_PUBLISH_RETRY_POLICY: dict = {
+        "max_retries": 3,
+        "interval_start": 0,
+        "interval_step": 0.2,
+        "interval_max": 0.5,
+    }
+    # Threads publishing tasks off the event loop, each reusing a pooled broker connection
+    CELERY_PUBLISH_THREADS: int = int(os.getenv('CELERY_PUBLISH_THREADS', 4))
+
     CELERY_TASK_DEFAULT_QUEUE: str = "default"
     CELERY_TASK_CREATE_MISSING_QUEUES: bool = False
+    # Workers report STARTED before running a task, so a cancellation can tell
+    # a running task from a queued one before the ServiceCall records it
+    CELERY_TASK_TRACK_STARTED: bool = True
 
     CELERY_TASK_QUEUES: list = (
         Queue("default"), # type: ignore
@@ -50,18 +74,195 @@ class BaseConfig:
     }
     CELERY_TASK_ROUTES = (route_task,)
 
+    # Redis emulates message priorities with one list per step, 0 is served
+    # first. Workers poll their queues in the order given to -Q instead of
+    # round robin, so high_priority is always drained before default.
+    CELERY_BROKER_TRANSPORT_OPTIONS: dict = {
+        "priority_steps": [0, 3, 6, 9],
+        "sep": "\x06\x16",
+        "queue_order_strategy": "priority",
+    }
+
+    # Priority lane of the predictions of each AccessPolicy.service_tier
+    SERVICE_TIERS: ClassVar[dict] = {
+        "premium": {"queue": "high_priority", "priority": 0},
+        "standard": {"queue": "default", "priority": 3},
+        "batch": {"queue": "low_priority", "priority": 3},
+    }
+    DEFAULT_SERVICE_TIER: ClassVar[str] = "standard"
+    # Shadow scoring yields to batch predictions sharing low_priority
+    SHADOW_LANE: ClassVar[dict] = {"queue": "low_priority", "priority": 9}
+
+    # Named worker tuning profiles, selected with CELERY_PROFILE
+    CELERY_PERFORMANCE_PROFILES: ClassVar[dict] = {
+        # Every process reserves a single task so short predictions never
+        # wait behind a busy sibling; acks after running so a lost worker
+        # hands its task to another one
+        "latency": {
+            "worker_prefetch_multiplier": 1,
+            "task_acks_late": True,
+            "task_ignore_result": False,
+            "result_expires": 3600,
+            "result_backend_thread_safe": False,
+            "worker_pool": "prefork",
+            "worker_max_tasks_per_child": None,
+        },
+        # Fewer broker round trips: processes reserve batches and ack on receipt.
+        # Clients still poll prediction results, tasks nobody reads opt out
+        # with ignore_result themselves
+        "throughput": {
+            "worker_prefetch_multiplier": 16,
+            "task_acks_late": False,
+            "task_ignore_result": False,
+            "result_expires": 3600,
+            "result_backend_thread_safe": False,
+            "worker_pool": "prefork",
+            "worker_max_tasks_per_child": None,
+        },
+        # I/O bound tasks on threads sharing the process' event loop and
+        # connection pools instead of one process per concurrent task, with
+        # a result backend client per thread
+        "io": {
+            "worker_prefetch_multiplier": 4,
+            "task_acks_late": True,
+            "task_ignore_result": False,
+            "result_expires": 3600,
+            "result_backend_thread_safe": True,
+            "worker_pool": "threads",
+            "worker_max_tasks_per_child": None,
+        },
+        # Short-lived results in Redis and recycled children bound the
+        # memory held by model instances
+        "memory": {
+            "worker_prefetch_multiplier": 1,
+            "task_acks_late": True,
+            "task_ignore_result": False,
+            "result_expires": 600,
+            "result_backend_thread_safe": False,
+            "worker_pool": "prefork",
+            "worker_max_tasks_per_child": 200,
+        },
+    }
+    CELERY_PROFILE: ClassVar[str] = os.getenv('CELERY_PROFILE', 'latency')
+    if CELERY_PROFILE not in CELERY_PERFORMANCE_PROFILES:
+        raise ValueError(
+            f"Unknown CELERY_PROFILE {CELERY_PROFILE!r}, "
+            f"expected one of: {', '.join(CELERY_PERFORMANCE_PROFILES)}"
+        )
+    _celery_profile: ClassVar[dict] = CELERY_PERFORMANCE_PROFILES[CELERY_PROFILE]
+
+    CELERY_WORKER_PREFETCH_MULTIPLIER: int = _celery_profile["worker_prefetch_multiplier"]
+    CELERY_TASK_ACKS_LATE: bool = _celery_profile["task_acks_late"]
+    CELERY_TASK_IGNORE_RESULT: bool = _celery_profile["task_ignore_result"]
+    CELERY_RESULT_EXPIRES: int = _celery_profile["result_expires"]
+    CELERY_RESULT_BACKEND_THREAD_SAFE: bool = _celery_profile["result_backend_thread_safe"]
+    CELERY_WORKER_POOL: str = _celery_profile["worker_pool"]
+    CELERY_WORKER_MAX_TASKS_PER_CHILD: int | None = _celery_profile["worker_max_tasks_per_child"]
+
+    # Seconds between flushes of the UserAccess usage counted in Redis
+    USAGE_FLUSH_INTERVAL: float = float(os.getenv('USAGE_FLUSH_INTERVAL', 10))
     # Define your Celery beat schedule here
     CELERY_BEAT_SCHEDULE: dict = {
         "dummy_task": {
             "task": "project.celery_utils.dummy_task",
             "schedule": 60.0  # Run every 60 seconds
         },
+        "refresh_latency_stats": {
+            "task": "project.inference.tasks.refresh_latency_stats",
+            "schedule": 60.0
+        },
+        "flush_user_access_usage": {
+            "task": "project.inference.tasks.flush_user_access_usage",
+            "schedule": USAGE_FLUSH_INTERVAL,
+        },
+        "collect_result_garbage": {
+            "task": "project.inference.tasks.collect_result_garbage",
+            "schedule": 3600.0
+        },
     }
     REDIS_HOST: str = os.getenv('REDIS_HOST', 'redis')
     REDIS_PORT: int = int(os.getenv('REDIS_PORT', 6379))
     REDIS_URL: str = f"redis://{REDIS_HOST}:{REDIS_PORT}/0"
     CACHE_EXPIRATION_TIME: int = 3600  # Default cache expiration time in seconds
 
+    METRICS_WORKER_PORT: int = int(os.getenv('METRICS_WORKER_PORT', 9808))
+
+    # Sliding windows of the latency stats, must match service_call_latency_stats
+    LATENCY_STATS_WINDOWS: ClassVar[dict] = {"5m": 300, "1h": 3600, "24h": 86400}
+
+    # Seed the reference data from every web process at startup
+    SEED_ON_STARTUP: bool = os.getenv('SEED_ON_STARTUP', 'true').lower() == 'true'
+
+    # Seconds an unknown model id is remembered before the database is asked again
+    MODEL_REGISTRY_MISS_TTL: float = float(os.getenv('MODEL_REGISTRY_MISS_TTL', 5))
+    # Seconds between full reloads of the registry cache, on top of change notifications
+    MODEL_REGISTRY_RESYNC_INTERVAL: float = float(os.getenv('MODEL_REGISTRY_RESYNC_INTERVAL', 300))
+
+    # Run the async code of worker hooks on one persistent loop per worker process
+    WORKER_EVENT_LOOP: bool = os.getenv('WORKER_EVENT_LOOP', 'true').lower() == 'true'
+
+    # Import and build declared models when a worker process starts
+    MODEL_WARMUP: bool = os.getenv('MODEL_WARMUP', 'true').lower() == 'true'
+
+    # Redis pub/sub channel the workers listen on for hot model reloads
+    MODEL_RELOAD_CHANNEL: str = os.getenv('MODEL_RELOAD_CHANNEL', 'model-reload')
+
+    # Shadow results within this absolute difference of the primary count as a match
+    SHADOW_DIFF_TOLERANCE: float = float(os.getenv('SHADOW_DIFF_TOLERANCE', 1e-6))
+
+    # Task results larger than this many bytes of JSON go to the result store
+    RESULT_OFFLOAD_THRESHOLD: int = int(os.getenv('RESULT_OFFLOAD_THRESHOLD', 256 * 1024))
+    RESULT_STORE_URL: str = os.getenv('RESULT_STORE_URL', f"file://{UPLOAD_DEFAULT_DEST}/results")
+    # Custom endpoint of an S3 compatible store, e.g. MinIO
+    RESULT_STORE_S3_ENDPOINT: str | None = os.getenv('RESULT_STORE_S3_ENDPOINT')
+
+    # Rows accepted by /predict-batch, larger datasets go through bulk scoring
+    BATCH_PREDICT_MAX_ROWS: int = int(os.getenv('BATCH_PREDICT_MAX_ROWS', 100000))
+
+    # Seconds a process caches the rate limits and tier of a user's access policy
+    POLICY_CACHE_TTL: float = float(os.getenv('POLICY_CACHE_TTL', 60))
+
+    # Shed predict requests whose projected queue wait exceeds the model's
+    # latency_slo, or ADMISSION_DEFAULT_SLO seconds when it has none
+    ADMISSION_CONTROL: bool = os.getenv('ADMISSION_CONTROL', 'true').lower() == 'true'
+    ADMISSION_DEFAULT_SLO: float = float(os.getenv('ADMISSION_DEFAULT_SLO', 30))
+    ADMISSION_SAMPLE_INTERVAL: float = float(os.getenv('ADMISSION_SAMPLE_INTERVAL', 1))
+    # Backlogs below this size are always admitted, the drain rate is noisy when idle
+    ADMISSION_MIN_BACKLOG: int = int(os.getenv('ADMISSION_MIN_BACKLOG', 50))
+    # Weight of the latest sample in the smoothed drain rate
+    ADMISSION_RATE_SMOOTHING: float = float(os.getenv('ADMISSION_RATE_SMOOTHING', 0.3))
+
+    # Predictions not started within this many seconds are dropped by the
+    # workers; clients may ask for less with the header, the policy's
+    # request_timeout caps it
+    PREDICT_DEFAULT_TIMEOUT: float = float(os.getenv('PREDICT_DEFAULT_TIMEOUT', 60))
+    REQUEST_TIMEOUT_HEADER: ClassVar[str] = "X-Request-Timeout"
+
+    # Give cancelled predictions that never started back to the user's quota
+    REFUND_CANCELLED_CALLS: bool = os.getenv('REFUND_CANCELLED_CALLS', 'true').lower() == 'true'
+    # Long-poll of GET /tasks/{task_id}/wait
+    TASK_WAIT_MAX_TIMEOUT: float = float(os.getenv('TASK_WAIT_MAX_TIMEOUT', 60))
+    TASK_WAIT_POLL_INTERVAL: float = float(os.getenv('TASK_WAIT_POLL_INTERVAL', 0.2))
+    # Task ids per POST /task_status request
+    TASK_STATUS_MAX_IDS: int = int(os.getenv('TASK_STATUS_MAX_IDS', 500))
+
+    # Seconds a prediction's Idempotency-Key keeps returning its task id
+    IDEMPOTENCY_KEY_TTL: int = int(os.getenv('IDEMPOTENCY_KEY_TTL', 24 * 3600))
+    # Seconds a key stays claimed by a submission that has not enqueued its
+    # task yet, so a process dying mid-request blocks the retries briefly
+    IDEMPOTENCY_PENDING_TTL: int = int(os.getenv('IDEMPOTENCY_PENDING_TTL', 30))
+
+    # Consecutive run_model failures opening a model's circuit, and seconds it
+    # stays open before a single trial request is let through
+    CIRCUIT_BREAKER_THRESHOLD: int = int(os.getenv('CIRCUIT_BREAKER_THRESHOLD', 5))
+    CIRCUIT_BREAKER_COOLDOWN: int = int(os.getenv('CIRCUIT_BREAKER_COOLDOWN', 30))
+    DEAD_LETTER_MAX_LENGTH: int = int(os.getenv('DEAD_LETTER_MAX_LENGTH', 10000))
+
+    # Compiled model kernels written by `python -m project.cli export-kernels`
+    MODEL_ARTIFACT_DIR: str = os.getenv('MODEL_ARTIFACT_DIR', str(BASE_DIR / "artifacts"))
+
+    BULK_SCORING_CHUNK_SIZE: int = int(os.getenv('BULK_SCORING_CHUNK_SIZE', 10000))
+
 
 
 class DevelopmentConfig(BaseConfig):
@@ -0,0 +1,48 @@
+"""
+Dead-letter queue of tasks that failed for good.
+
+Tasks raising a non-retryable exception, or still failing once their retries
+are spent, are pushed to a capped Redis list with their arguments so poison
+inputs can be inspected and replayed instead of being retried forever.
+"""
+import json
+import logging
+import time
+
+import redis
+
+from project import redis_utils
+from project.config import settings
+from project.metrics import DEAD_LETTERS
+
+logger = logging.getLogger(__name__)
+
+DEAD_LETTER_KEY = "dead_letter"
+
+
+def push(task_name: str, task_id: str | None, args, kwargs, exc: BaseException, retries: int = 0):
+    entry = {
+        "task": task_name,
+        "task_id": task_id,
+        "args": args,
+        "kwargs": kwargs,
+        "exception": f"{type(exc).__name__}: {exc}",
+        "retries": retries,
+        "failed_at": time.time(),
+    }
+    try:
+        pipe = redis_utils.redis_client.pipeline()
+        pipe.lpush(DEAD_LETTER_KEY, json.dumps(entry, default=str))
+        pipe.ltrim(DEAD_LETTER_KEY, 0, settings.DEAD_LETTER_MAX_LENGTH - 1)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.error(f"Could not dead-letter task {task_id}: {e}")
+        return
+    DEAD_LETTERS.labels(task=task_name).inc()
+
+
+def read(limit: int = 100) -> list:
+    """
+    Most recent dead letters first.
+    """
+    return [json.loads(entry) for entry in redis_utils.redis_client.lrange(DEAD_LETTER_KEY, 0, limit - 1)]
@@ -0,0 +1,73 @@
+"""
+JWT signing keys shared by every web process.
+
+Keys come from configuration rather than being generated at import, so a
+token minted by one process verifies on any other. Each key has a kid:
+tokens are signed with the active key and carry its kid in their header,
+verification uses whichever configured key the kid names. To rotate, add
+the new key, make it active once every process knows it, and drop the old
+one after JWT_TOKEN_LIFETIME.
+
+    JWT_SIGNING_KEYS="2026-10:secret,2026-07:older-secret"
+    JWT_KEY_FILE=/run/secrets/jwt_keys.json  # {"active": "2026-10", "keys": {"2026-10": "secret", ...}}
+"""
+import json
+import logging
+from dataclasses import dataclass
+from typing import Dict
+
+from project.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KID = "default"
+
+
+@dataclass(frozen=True)
+class SigningKeys:
+    active_kid: str
+    keys: Dict[str, str]
+
+    @property
+    def active_key(self) -> str:
+        return self.keys[self.active_kid]
+
+
+def parse_keys(spec: str) -> Dict[str, str]:
+    """
+    Parse "kid:secret,kid:secret", keeping the listed order.
+    """
+    keys = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        kid, _, secret = item.partition(":")
+        if not kid or not secret:
+            raise ValueError(f"Malformed JWT signing key '{kid}', expected kid:secret")
+        keys[kid] = secret
+    return keys
+
+
+def load_signing_keys() -> SigningKeys:
+    active_kid = settings.JWT_ACTIVE_KID
+    if settings.JWT_KEY_FILE:
+        with open(settings.JWT_KEY_FILE) as f:
+            content = json.load(f)
+        keys = content["keys"]
+        active_kid = active_kid or content.get("active", "")
+    elif settings.JWT_SIGNING_KEYS:
+        keys = parse_keys(settings.JWT_SIGNING_KEYS)
+    else:
+        if not settings.SECRET_KEY_CONFIGURED and settings.WEB_CONCURRENCY > 1:
+            raise ValueError(
+                f"{settings.WEB_CONCURRENCY} web workers need a shared JWT signing key, "
+                "set SECRET_KEY, JWT_SIGNING_KEYS or JWT_KEY_FILE"
+            )
+        if not settings.SECRET_KEY_CONFIGURED:
+            logger.warning("No JWT signing key configured, tokens only verify in this process")
+        keys = {DEFAULT_KID: settings.SECRET_KEY}
+
+    if not keys:
+        raise ValueError("No JWT signing key configured")
+    active_kid = active_kid or next(iter(keys))
+    if active_kid not in keys:
+        raise ValueError(f"Active JWT key '{active_kid}' is not among the signing keys {sorted(keys)}")
+    return SigningKeys(active_kid, dict(keys))
@@ -1,3 +1,8 @@
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+
+import jwt
 from fastapi_users.authentication import (
     AuthenticationBackend,
     BearerTransport,
@@ -5,14 +10,52 @@ from fastapi_users.authentication import (
 )
 
 from project.config import settings
+from project.fu_core.keys import SigningKeys, load_signing_keys
 
 bearer_transport = BearerTransport(tokenUrl=f"{settings.API_V1_STR}/auth/jwt/login")
 
 
-def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(
-        secret=settings.SECRET_KEY, lifetime_seconds=settings.JWT_TOKEN_LIFETIME, algorithm="HS256"
-    )
+class KeyRotatingJWTStrategy(JWTStrategy):
+    """
+    Signs with the active key and names it in the token's kid header,
+    verifies with the key the kid names. Tokens without a kid are checked
+    against the active key.
+    """
+
+    def __init__(self, signing_keys: SigningKeys, lifetime_seconds: Optional[int], algorithm: str = "HS256"):
+        super().__init__(signing_keys.active_key, lifetime_seconds, algorithm=algorithm)
+        self.signing_keys = signing_keys
+        self._verifiers = {
+            kid: JWTStrategy(secret, lifetime_seconds, self.token_audience, algorithm)
+            for kid, secret in signing_keys.keys.items()
+        }
+
+    async def read_token(self, token, user_manager):
+        if token is None:
+            return None
+        try:
+            kid = jwt.get_unverified_header(token).get("kid", self.signing_keys.active_kid)
+        except jwt.PyJWTError:
+            return None
+        verifier = self._verifiers.get(kid)
+        if verifier is None:
+            return None
+        return await verifier.read_token(token, user_manager)
+
+    async def write_token(self, user) -> str:
+        # As fastapi_users.jwt.generate_jwt, which cannot set headers
+        payload = {"sub": str(user.id), "aud": self.token_audience}
+        if self.lifetime_seconds:
+            payload["exp"] = datetime.now(timezone.utc) + timedelta(seconds=self.lifetime_seconds)
+        return jwt.encode(
+            payload, self.encode_key, algorithm=self.algorithm, headers={"kid": self.signing_keys.active_kid}
+        )
+
+
+@lru_cache
+def get_jwt_strategy() -> KeyRotatingJWTStrategy:
+    # Keys are read once per process, rotating them takes a restart
+    return KeyRotatingJWTStrategy(load_signing_keys(), settings.JWT_TOKEN_LIFETIME)
 
 
 auth_backend = AuthenticationBackend(
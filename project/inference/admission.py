@@ -0,0 +1,188 @@
+"""
+Admission control for the prediction endpoints.
+
+Each web process samples the broker backlog of every Celery queue (Redis
+list lengths, including kombu's priority sub-queues) together with a
+counter of completed tasks the workers increment per queue. The completion
+rate is the queue's drain rate, which accounts for both worker capacity and
+task run time, so the projected wait of a new task is backlog / drain rate.
+Requests whose projected wait exceeds the model's latency SLO are shed with
+503 before any ServiceCall is created or task is enqueued. They only read
+the last sample, a stale one is refreshed by a background task on the
+asyncio client, so a slow broker never holds a request.
+"""
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict
+from urllib.parse import urlparse
+
+import redis
+import redis.asyncio
+from fastapi import Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from project.config import settings
+from project.database import get_async_session
+from project.fu_core.users import current_active_user, models
+from project.inference import policies
+from project.inference.registry_service import registry_service
+from project.metrics import ADMISSION_SHED, QUEUE_BACKLOG, QUEUE_DRAIN_RATE
+
+logger = logging.getLogger(__name__)
+
+COMPLETED_KEY = "admission:completed:{queue}"
+
+
+@lru_cache
+def get_broker_redis() -> redis.StrictRedis | None:
+    if urlparse(settings.CELERY_BROKER_URL).scheme not in ("redis", "rediss"):
+        return None
+    return redis.StrictRedis.from_url(settings.CELERY_BROKER_URL)
+
+
+@lru_cache
+def get_async_broker_redis() -> redis.asyncio.StrictRedis | None:
+    if urlparse(settings.CELERY_BROKER_URL).scheme not in ("redis", "rediss"):
+        return None
+    return redis.asyncio.StrictRedis.from_url(settings.CELERY_BROKER_URL)
+
+
+def queue_names() -> list:
+    return [queue.name for queue in settings.CELERY_TASK_QUEUES]
+
+
+def _list_keys(queue: str) -> list:
+    # kombu keeps the messages of priority N > 0 in "<queue><sep><N>"
+    options = settings.CELERY_BROKER_TRANSPORT_OPTIONS
+    return [
+        queue if step == 0 else f"{queue}{options['sep']}{step}"
+        for step in options["priority_steps"]
+    ]
+
+
+@dataclass
+class QueueState:
+    backlog: int = 0
+    completed: int | None = None
+    drain_rate: float = 0.0
+
+    def projected_wait(self) -> float:
+        if self.backlog < settings.ADMISSION_MIN_BACKLOG:
+            return 0.0
+        if self.drain_rate <= 0:
+            # A backlog nobody drains, workers are down or stuck
+            return math.inf
+        return self.backlog / self.drain_rate
+
+
+@dataclass
+class QueueMonitor:
+    """
+    Per-process view of the queues, refreshed at most every
+    ADMISSION_SAMPLE_INTERVAL seconds so admission costs one pipelined
+    Redis round trip per interval rather than per request.
+    """
+    queues: Dict[str, QueueState] = field(default_factory=dict)
+    sampled_at: float = 0.0
+    _sampling: asyncio.Task | None = field(default=None, repr=False)
+
+    async def sample(self, client: redis.asyncio.StrictRedis, now: float):
+        names = queue_names()
+        pipe = client.pipeline(transaction=False)
+        for queue in names:
+            for key in _list_keys(queue):
+                pipe.llen(key)
+            pipe.get(COMPLETED_KEY.format(queue=queue))
+        replies = iter(await pipe.execute())
+
+        elapsed = now - self.sampled_at
+        for queue in names:
+            backlog = sum(next(replies) for _ in _list_keys(queue))
+            completed = int(next(replies) or 0)
+            state = self.queues.setdefault(queue, QueueState())
+            if state.completed is not None and elapsed > 0:
+                rate = max(completed - state.completed, 0) / elapsed
+                # Smooth the instantaneous rate, a single idle interval must not zero it
+                alpha = settings.ADMISSION_RATE_SMOOTHING
+                state.drain_rate = alpha * rate + (1 - alpha) * state.drain_rate
+            state.backlog = backlog
+            state.completed = completed
+            QUEUE_BACKLOG.labels(queue=queue).set(backlog)
+            QUEUE_DRAIN_RATE.labels(queue=queue).set(state.drain_rate)
+        self.sampled_at = now
+
+    async def _resample(self, client: redis.asyncio.StrictRedis, now: float):
+        try:
+            await self.sample(client, now)
+        except redis.RedisError as e:
+            # Admit on stale data rather than failing requests
+            logger.warning(f"Queue backlog sampling failed: {e}")
+        self.sampled_at = now
+
+    def refresh(self) -> Dict[str, QueueState]:
+        """
+        The last sampled state. A stale one is resampled in the background
+        for the next requests, this one does not wait for the broker.
+        """
+        now = time.monotonic()
+        if now - self.sampled_at < settings.ADMISSION_SAMPLE_INTERVAL:
+            return self.queues
+        if self._sampling is not None and not self._sampling.done():
+            return self.queues
+        client = get_async_broker_redis()
+        if client is None:
+            self.sampled_at = now
+            return self.queues
+        self._sampling = asyncio.create_task(self._resample(client, now))
+        return self.queues
+
+
+queue_monitor = QueueMonitor()
+
+
+async def enforce_admission(
+    model_id: int,
+    current_user: models.User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    if not settings.ADMISSION_CONTROL:
+        return
+    metadata = await registry_service.get(session, model_id)
+    if metadata is None:
+        # The endpoint answers 404
+        return
+
+    slo = metadata.get("latency_slo") or settings.ADMISSION_DEFAULT_SLO
+    # Each tier is judged on the backlog of its own lane
+    policy = await policies.get_user_policy(session, current_user.id, model_id)
+    queue = policies.service_lane(policy)["queue"]
+    state = queue_monitor.refresh().get(queue)
+    if state is None:
+        return
+
+    wait = state.projected_wait()
+    if wait > slo:
+        ADMISSION_SHED.labels(model_id=str(model_id), queue=queue).inc()
+        retry_after = settings.ADMISSION_SAMPLE_INTERVAL if math.isinf(wait) else wait - slo
+        raise HTTPException(
+            status_code=503,
+            detail=f"Queue {queue} is over capacity, projected wait {wait:.1f}s exceeds {slo:.1f}s",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def record_completed(queue: str):
+    """
+    Count a finished task against its queue, the source of the drain rate.
+    """
+    client = get_broker_redis()
+    if client is None or queue not in queue_names():
+        return
+    try:
+        client.incr(COMPLETED_KEY.format(queue=queue))
+    except redis.RedisError as e:
+        logger.debug(f"Could not count completed task: {e}")
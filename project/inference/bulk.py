@@ -0,0 +1,129 @@
+import pathlib
+import shutil
+from typing import BinaryIO, List
+
+from celery import current_app
+
+from project.config import settings
+from project.redis_utils import redis_client
+
+SUPPORTED_FORMATS = (".csv", ".parquet")
+PREDICTION_COLUMN = "prediction"
+
+
+def job_dir(job_id: str) -> pathlib.Path:
+    """
+    return the working directory of a bulk scoring job, creating it if needed
+    """
+    path = pathlib.Path(settings.UPLOAD_DEFAULT_DEST) / "bulk" / job_id
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def save_upload(job_id: str, filename: str, fileobj: BinaryIO) -> pathlib.Path:
+    suffix = pathlib.Path(filename or "").suffix.lower()
+    if suffix not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported file format '{suffix}', expected one of {SUPPORTED_FORMATS}")
+
+    input_path = job_dir(job_id) / f"input{suffix}"
+    with open(input_path, "wb") as buffer:
+        shutil.copyfileobj(fileobj, buffer)
+    return input_path
+
+
+def discard_job(job_id: str):
+    shutil.rmtree(pathlib.Path(settings.UPLOAD_DEFAULT_DEST) / "bulk" / job_id, ignore_errors=True)
+
+
+def table_columns(path: str | pathlib.Path) -> List[str]:
+    path = pathlib.Path(path)
+    if path.suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ValueError("Parquet support requires the 'pyarrow' package") from e
+        return pq.read_schema(path).names
+
+    with open(path, newline="") as f:
+        return f.readline().strip().split(",")
+
+
+def check_columns(path: str | pathlib.Path, columns: List[str]):
+    """
+    Raise ValueError when the file lacks any of `columns`, reading only its header.
+    """
+    missing = [c for c in columns if c not in table_columns(path)]
+    if missing:
+        raise ValueError(f"Missing columns in {pathlib.Path(path).name}: {missing}")
+
+
+def read_table(path: str | pathlib.Path, columns: List[str]):
+    """
+    Load the feature columns of a CSV/Parquet file as a 2D float array,
+    ordered like `columns`.
+    """
+    import numpy as np
+
+    path = pathlib.Path(path)
+    if path.suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ValueError("Parquet support requires the 'pyarrow' package") from e
+        table = pq.read_table(path, columns=columns)
+        return np.column_stack([table.column(c).to_numpy() for c in columns]).astype(float)
+
+    check_columns(path, columns)
+    header = table_columns(path)
+    usecols = [header.index(c) for c in columns]
+    return np.loadtxt(path, delimiter=",", skiprows=1, usecols=usecols, ndmin=2, dtype=float)
+
+
+def write_chunks(X, chunk_size: int, directory: pathlib.Path) -> List[str]:
+    import numpy as np
+
+    chunk_paths = []
+    for i, start in enumerate(range(0, len(X), chunk_size)):
+        chunk_path = directory / f"chunk_{i:05d}.npy"
+        np.save(chunk_path, X[start:start + chunk_size])
+        chunk_paths.append(str(chunk_path))
+    return chunk_paths
+
+
+def write_table(path: pathlib.Path, columns: List[str], X, predictions) -> pathlib.Path:
+    import numpy as np
+
+    if path.suffix == ".parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        data = {c: X[:, i] for i, c in enumerate(columns)}
+        data[PREDICTION_COLUMN] = predictions
+        pq.write_table(pa.table(data), path)
+        return path
+
+    np.savetxt(
+        path,
+        np.column_stack((X, predictions)),
+        delimiter=",",
+        header=",".join([*columns, PREDICTION_COLUMN]),
+        comments="",
+    )
+    return path
+
+
+def mark_chunk_done(job_id: str) -> int:
+    """
+    Atomically count finished chunks so progress stays correct when chunks
+    complete on different workers.
+    """
+    key = f"bulk_job_{job_id}_chunks_done"
+    pipe = redis_client.pipeline()
+    pipe.incr(key)
+    pipe.expire(key, settings.CACHE_EXPIRATION_TIME)
+    done, _ = pipe.execute()
+    return done
+
+
+def publish_progress(job_id: str, meta: dict):
+    current_app.backend.store_result(job_id, meta, "PROGRESS")
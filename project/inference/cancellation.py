@@ -0,0 +1,47 @@
+"""
+Cancellation of enqueued predictions.
+
+A queued task is discarded by the worker that receives it, a started one is
+terminated, which only the prefork pool supports. Cancelled calls that
+never started cost no worker time and may be refunded to the quotas; a
+task that finishes anyway does not complete its cancelled call.
+"""
+import logging
+from datetime import datetime, timezone
+
+import redis
+from celery import current_app
+from celery.states import STARTED
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from project.config import settings
+from project.inference import crud, task_meta
+from project.inference.models import ServiceCall
+from project.metrics import TASKS_CANCELLED
+
+logger = logging.getLogger(__name__)
+
+USER = "user"
+DISCONNECT = "disconnect"
+
+
+async def cancel_prediction(session: AsyncSession, service_call: ServiceCall, reason: str = USER) -> dict:
+    started = service_call.time_started is not None
+    if not started:
+        # The worker records time_started asynchronously, the result backend knows first
+        try:
+            statuses = await task_meta.get_statuses([service_call.celery_task_id])
+            started = statuses[service_call.celery_task_id]["state"] == STARTED
+        except redis.RedisError as e:
+            logger.warning(f"Could not read the state of task {service_call.celery_task_id}: {e}")
+    # The revoke is a broadcast publish, it must not block the event loop
+    await run_in_threadpool(
+        current_app.control.revoke, service_call.celery_task_id, terminate=started, signal="SIGTERM"
+    )
+    refund = settings.REFUND_CANCELLED_CALLS and not started
+    await crud.mark_service_call_cancelled(session, service_call, datetime.now(timezone.utc), refund=refund)
+
+    TASKS_CANCELLED.labels(reason=reason, stage="started" if started else "queued").inc()
+    logger.info(f"Cancelled task {service_call.celery_task_id} ({reason}), terminated={started}")
+    return {"task_id": service_call.celery_task_id, "terminated": started, "refunded": refund}
@@ -0,0 +1,95 @@
+"""
+Per-model circuit breaker shared by the web and worker processes in Redis.
+
+Workers record the outcome of every finished prediction. After
+CIRCUIT_BREAKER_THRESHOLD consecutive failures the circuit opens and the
+predict endpoints fail fast for CIRCUIT_BREAKER_COOLDOWN seconds instead
+of queueing work for a broken model. Then it is half-open: one trial
+request goes through, its success closes the circuit, its failure opens it
+again. Workers record outcomes on the blocking client, the predict
+endpoints check the circuit on the asyncio one.
+
+    circuit:{model_id}:failures  consecutive failures
+    circuit:{model_id}:open      set while open, expires after the cooldown
+    circuit:{model_id}:trial     the half-open trial request in flight
+"""
+import logging
+
+import redis
+from fastapi import HTTPException
+
+from project import redis_utils
+from project.config import settings
+from project.metrics import CIRCUIT_OPENED, CIRCUIT_REJECTIONS
+
+logger = logging.getLogger(__name__)
+
+
+def _key(model_id: int, name: str) -> str:
+    return f"circuit:{model_id}:{name}"
+
+
+def record_success(model_id: int):
+    redis_utils.redis_client.delete(_key(model_id, "failures"), _key(model_id, "trial"))
+
+
+def record_failure(model_id: int):
+    pipe = redis_utils.redis_client.pipeline()
+    pipe.incr(_key(model_id, "failures"))
+    pipe.delete(_key(model_id, "trial"))
+    failures, _ = pipe.execute()
+    if failures >= settings.CIRCUIT_BREAKER_THRESHOLD:
+        opened = redis_utils.redis_client.set(
+            _key(model_id, "open"), failures, nx=True, ex=settings.CIRCUIT_BREAKER_COOLDOWN
+        )
+        if opened:
+            CIRCUIT_OPENED.labels(model_id=str(model_id)).inc()
+            logger.error(f"Circuit of model {model_id} opened after {failures} consecutive failures")
+
+
+async def retry_after(model_id: int) -> int | None:
+    """
+    Seconds until the model accepts requests again, None when it does now.
+    In the half-open state only the first caller gets None.
+    """
+    client = redis_utils.async_redis_client
+    pipe = client.pipeline()
+    pipe.ttl(_key(model_id, "open"))
+    pipe.get(_key(model_id, "failures"))
+    open_ttl, failures = await pipe.execute()
+    if open_ttl is not None and open_ttl > 0:
+        return open_ttl
+    if int(failures or 0) < settings.CIRCUIT_BREAKER_THRESHOLD:
+        return None
+    # Half-open: the trial expires with the cooldown in case its outcome is never recorded
+    if await client.set(_key(model_id, "trial"), 1, nx=True, ex=settings.CIRCUIT_BREAKER_COOLDOWN):
+        return None
+    return settings.CIRCUIT_BREAKER_COOLDOWN
+
+
+async def open_circuits(model_ids: list) -> set:
+    """
+    Ids among `model_ids` whose circuit is open. Unlike retry_after it
+    does not take the half-open trial.
+    """
+    if not model_ids:
+        return set()
+    pipe = redis_utils.async_redis_client.pipeline()
+    for model_id in model_ids:
+        pipe.exists(_key(model_id, "open"))
+    return {model_id for model_id, is_open in zip(model_ids, await pipe.execute()) if is_open}
+
+
+async def enforce_circuit(model_id: int):
+    try:
+        wait = await retry_after(model_id)
+    except redis.RedisError as e:
+        logger.warning(f"Circuit breaker unavailable, admitting request: {e}")
+        return
+    if wait is not None:
+        CIRCUIT_REJECTIONS.labels(model_id=str(model_id)).inc()
+        raise HTTPException(
+            status_code=503,
+            detail=f"Model {model_id} is failing, requests are suspended",
+            headers={"Retry-After": str(wait)},
+        )
@@ -1,6 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func, update
+from sqlalchemy import func, text, update
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
 from dateutil.parser import isoparse
@@ -10,6 +10,7 @@ from project.inference.models import (
     UserAccess,
     AccessPolicy
 ) 
+from project.inference import usage
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,12 +19,14 @@ async def create_access_policy(
     session: AsyncSession,
     name: str,
     daily_api_calls: int = 1000,
-    monthly_api_calls: int = 30000
+    monthly_api_calls: int = 30000,
+    service_tier: str = "standard"
 ) -> AccessPolicy:
     new_policy = AccessPolicy(
         name=name,
         daily_api_calls=daily_api_calls,
-        monthly_api_calls=monthly_api_calls
+        monthly_api_calls=monthly_api_calls,
+        service_tier=service_tier
     )
     session.add(new_policy)
     await session.commit()
@@ -103,10 +106,12 @@ async def create_service_call(
     session: AsyncSession, 
     model_id: int, 
     user_id: UUID, 
-    celery_task_id: str | None = None
+    celery_task_id: str | None = None,
+    served_model_id: int | None = None
 ) -> ServiceCall:
     new_service_call = ServiceCall(
-        model_id=model_id, user_id=user_id, celery_task_id=celery_task_id
+        model_id=model_id, user_id=user_id, celery_task_id=celery_task_id,
+        served_model_id=served_model_id
     )
     session.add(new_service_call)
     await session.commit()
@@ -119,38 +124,185 @@ async def get_service_call(session: AsyncSession, service_call_id: int) -> Servi
     return result.scalars().first()
 
 
+async def get_service_call_by_task_id(session: AsyncSession, task_id: str) -> ServiceCall | None:
+    result = await session.execute(
+        select(ServiceCall).where(ServiceCall.celery_task_id == task_id)
+    )
+    return result.scalars().first()
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes for CURRENT_TIMESTAMP defaults, which are UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _set_latencies(service_call: ServiceCall, finished_at: datetime):
+    time_requested = _as_utc(service_call.time_requested)
+    time_started = _as_utc(service_call.time_started) if service_call.time_started else None
+    finished_at = _as_utc(finished_at)
+
+    service_call.total_latency = (finished_at - time_requested).total_seconds()
+    if time_started:
+        service_call.queue_latency = (time_started - time_requested).total_seconds()
+        service_call.run_latency = (finished_at - time_started).total_seconds()
+
+
+async def mark_service_call_started(session: AsyncSession, task_id: str, time_started: datetime):
+    service_call = await get_service_call_by_task_id(session, task_id)
+    if not service_call:
+        logger.warning(f"No service call found for task ID: {task_id}")
+        return
+    # Retries run the prerun hook again, keep the first start
+    if service_call.time_started is None:
+        service_call.time_started = time_started
+        await session.commit()
+
+
 async def update_service_call_time_completed(session: AsyncSession, task_id: str, time_completed: datetime):
-    async with session.begin():
-        logger.info(f"Fetching service call with task ID: {task_id}")
-        result = await session.execute(
-            select(ServiceCall).where(ServiceCall.celery_task_id == task_id)
+    logger.info(f"Fetching service call with task ID: {task_id}")
+    service_call = await get_service_call_by_task_id(session, task_id)
+    if service_call and service_call.time_cancelled:
+        # Cancelled while running, the cancellation stands
+        logger.info(f"Service call with task ID: {task_id} was cancelled, not completing it")
+    elif service_call:
+        logger.info(f"Service call found for task ID: {task_id}, updating time_completed")
+        service_call.time_completed = time_completed
+        _set_latencies(service_call, time_completed)
+        await session.commit()
+        logger.info(f"Service call with task ID: {task_id} updated successfully")
+    else:
+        logger.warning(f"No service call found for task ID: {task_id}")
+
+
+async def mark_service_call_failed(session: AsyncSession, task_id: str, time_failed: datetime):
+    service_call = await get_service_call_by_task_id(session, task_id)
+    if not service_call:
+        logger.warning(f"No service call found for task ID: {task_id}")
+        return
+    if service_call.time_cancelled:
+        # A terminated task fails, its call stays cancelled
+        return
+    service_call.time_failed = time_failed
+    _set_latencies(service_call, time_failed)
+    await session.commit()
+
+
+async def mark_service_call_expired(session: AsyncSession, task_id: str, time_expired: datetime):
+    service_call = await get_service_call_by_task_id(session, task_id)
+    if not service_call:
+        logger.warning(f"No service call found for task ID: {task_id}")
+        return
+    service_call.time_expired = time_expired
+    # Only the wait is known, the prediction never ran
+    service_call.queue_latency = (_as_utc(time_expired) - _as_utc(service_call.time_requested)).total_seconds()
+    await session.commit()
+
+
+def is_finished(service_call: ServiceCall) -> bool:
+    return any((
+        service_call.time_completed,
+        service_call.time_failed,
+        service_call.time_expired,
+        service_call.time_cancelled,
+    ))
+
+
+async def mark_service_call_cancelled(
+    session: AsyncSession, service_call: ServiceCall, time_cancelled: datetime, refund: bool = False
+):
+    """
+    Record a cancellation; a refund gives the call back to the user's quotas.
+    """
+    service_call.time_cancelled = time_cancelled
+    if refund:
+        service_call.quota_refunded = True
+    # Uncounted in Redis like the call was counted, see project/inference/usage.py
+    if refund and not await usage.refund_call(service_call.user_id, service_call.model_id):
+        await session.execute(
+            update(UserAccess)
+            .where(
+                UserAccess.user_id == service_call.user_id,
+                UserAccess.model_id == service_call.model_id,
+                UserAccess.api_calls > 0
+            )
+            .values(api_calls=UserAccess.api_calls - 1)
+        )
+    await session.commit()
+
+
+LATENCY_STATS_COLUMNS = ("queue", "run", "total")
+LATENCY_STATS_QUANTILES = {"p50": 0.50, "p95": 0.95, "p99": 0.99}
+
+
+def _percentile(sorted_values: list, q: float) -> float | None:
+    """
+    Linear interpolation between closest ranks, same as Postgres percentile_cont.
+    """
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+async def _compute_latency_stats(
+    session: AsyncSession, model_id: int, window_seconds: int
+) -> dict:
+    since = datetime.now(timezone.utc) - timedelta(seconds=window_seconds)
+    result = await session.execute(
+        select(
+            ServiceCall.queue_latency,
+            ServiceCall.run_latency,
+            ServiceCall.total_latency,
+            ServiceCall.time_failed,
+        ).where(
+            ServiceCall.model_id == model_id,
+            ServiceCall.time_requested >= since,
+            ServiceCall.total_latency.is_not(None),
         )
-        service_call = result.scalars().first()
-        if service_call:
-            logger.info(f"Service call found for task ID: {task_id}, updating time_completed")
-            service_call.time_completed = time_completed
-            session.add(service_call)
-            await session.commit()
-            logger.info(f"Service call with task ID: {task_id} updated successfully")
-        else:
-            logger.warning(f"No service call found for task ID: {task_id}")
-
-
-# async def update_service_call_time_completed(
-#     session: AsyncSession, task_id: str, time_completed: datetime
-# ):
-#     async with session.begin():
-#         result = await session.execute(
-#             select(ServiceCall).where(ServiceCall.celery_task_id == task_id)
-#         )
-#         service_call = result.scalars().first()
-#         if service_call:
-#             service_call.time_completed = time_completed
-#             session.add(service_call)
-#             await session.commit()
-#             logger.info(f"Updated ServiceCall {service_call.id} with time_completed {service_call.time_completed}")
-#         else:
-#             logger.warning(f"ServiceCall with task_id {task_id} not found")
+    )
+    rows = result.all()
+    stats = {"calls": len(rows), "failures": sum(1 for row in rows if row.time_failed)}
+    for i, column in enumerate(LATENCY_STATS_COLUMNS):
+        values = sorted(row[i] for row in rows if row[i] is not None)
+        for name, q in LATENCY_STATS_QUANTILES.items():
+            stats[f"{column}_{name}"] = _percentile(values, q)
+    return stats
+
+
+async def get_latency_stats(
+    session: AsyncSession, model_id: int, windows: dict[str, int]
+) -> dict[str, dict]:
+    """
+    Per-window p50/p95/p99 of queue, run and total latency for a model.
+    On Postgres this reads the `service_call_latency_stats` materialized view,
+    elsewhere the percentiles are computed from the raw rows.
+    """
+    if session.bind.dialect.name != "postgresql":
+        return {
+            window_name: await _compute_latency_stats(session, model_id, window_seconds)
+            for window_name, window_seconds in windows.items()
+        }
+
+    result = await session.execute(
+        text("SELECT * FROM service_call_latency_stats WHERE model_id = :model_id"),
+        {"model_id": model_id},
+    )
+    stats = {window_name: {"calls": 0, "failures": 0} for window_name in windows}
+    for row in result.mappings():
+        if row["window_name"] in stats:
+            stats[row["window_name"]] = {
+                k: v for k, v in row.items() if k not in ("model_id", "window_name")
+            }
+    return stats
+
+
+async def refresh_latency_stats(session: AsyncSession):
+    if session.bind.dialect.name != "postgresql":
+        return
+    await session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY service_call_latency_stats"))
+    await session.commit()
             
 
 async def get_user_access(
@@ -174,6 +326,7 @@ async def check_daily_limit(
         select(func.count(ServiceCall.id)).where(
             ServiceCall.user_id == user_id,
             ServiceCall.model_id == model_id,
+            ServiceCall.quota_refunded.is_(False),
             func.date(ServiceCall.time_requested) == today
         )
     )
@@ -190,6 +343,7 @@ async def check_monthly_limit(
         select(func.count(ServiceCall.id)).where(
             ServiceCall.user_id == user_id,
             ServiceCall.model_id == model_id,
+            ServiceCall.quota_refunded.is_(False),
             ServiceCall.time_requested >= first_day_of_month
         )
     )
@@ -198,6 +352,9 @@ async def check_monthly_limit(
 
 
 async def update_user_access(session: AsyncSession, user_access: UserAccess):
+    # Counted in Redis and flushed to the row, see project/inference/usage.py
+    if await usage.record_call(user_access.user_id, user_access.model_id):
+        return
     user_access.api_calls += 1
     user_access.last_accessed = func.now() # datetime.utcnow()
     await session.commit()
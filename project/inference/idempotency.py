@@ -0,0 +1,115 @@
+"""
+Idempotency keys for prediction submissions.
+
+A client retrying a submission with the same Idempotency-Key header gets
+the task id of the first attempt back, without quota checks, database
+writes or a second task. Keys are scoped to the user and the endpoint and
+live in Redis:
+
+    pending  {"fingerprint": ...}                 while the first attempt runs,
+                                                  for IDEMPOTENCY_PENDING_TTL
+    done     {"fingerprint": ..., "task_id": ...} once its task was enqueued,
+                                                  for IDEMPOTENCY_KEY_TTL
+"""
+import hashlib
+import json
+import logging
+
+import redis
+from fastapi import Depends, HTTPException, Request
+
+from project import redis_utils
+from project.config import settings
+from project.fu_core.users import current_active_user, models
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+
+class IdempotentRequest:
+
+    def __init__(self, redis_key: str, fingerprint: str):
+        self.redis_key = redis_key
+        self.fingerprint = fingerprint
+        self.claimed = False
+
+    async def claim(self) -> str | None:
+        """
+        Claim the key for this request. Returns the task id of an earlier
+        request that used it, None when this request should go ahead.
+        """
+        client = redis_utils.async_redis_client
+        pending = json.dumps({"fingerprint": self.fingerprint})
+        try:
+            # A second pass covers a key released between SET and GET
+            for _ in range(2):
+                if await client.set(self.redis_key, pending, nx=True, ex=settings.IDEMPOTENCY_PENDING_TTL):
+                    self.claimed = True
+                    return None
+                stored = await client.get(self.redis_key)
+                if stored is not None:
+                    return self._replay(json.loads(stored))
+        except redis.RedisError as e:
+            logger.warning(f"Idempotency store unavailable, handling request without it: {e}")
+        return None
+
+    def _replay(self, stored: dict) -> str:
+        if stored["fingerprint"] != self.fingerprint:
+            raise HTTPException(
+                status_code=422, detail=f"{IDEMPOTENCY_HEADER} was already used for a different request"
+            )
+        if "task_id" not in stored:
+            raise HTTPException(
+                status_code=409,
+                detail=f"A request with this {IDEMPOTENCY_HEADER} is still being processed",
+                headers={"Retry-After": "1"},
+            )
+        return stored["task_id"]
+
+    async def complete(self, task_id: str):
+        if not self.claimed:
+            return
+        value = json.dumps({"fingerprint": self.fingerprint, "task_id": task_id})
+        try:
+            await redis_utils.async_redis_client.set(self.redis_key, value, ex=settings.IDEMPOTENCY_KEY_TTL)
+        except redis.RedisError as e:
+            logger.warning(f"Could not store idempotency key {self.redis_key}: {e}")
+            return
+        # Kept for replays from now on
+        self.claimed = False
+
+    async def release(self):
+        # An attempt that did not complete must not block the client's retry
+        if not self.claimed:
+            return
+        try:
+            await redis_utils.async_redis_client.delete(self.redis_key)
+        except redis.RedisError as e:
+            logger.warning(f"Could not release idempotency key {self.redis_key}: {e}")
+        self.claimed = False
+
+
+async def idempotency_guard(
+    request: Request,
+    current_user: models.User = Depends(current_active_user)
+):
+    """
+    Dependency yielding an IdempotentRequest when the header is set, None
+    otherwise. The claim is released unless the request completed it, also
+    when the request is cancelled.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        yield None
+        return
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"{IDEMPOTENCY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters")
+
+    fingerprint = hashlib.sha256(await request.body()).hexdigest()
+    guard = IdempotentRequest(f"idempotency:{current_user.id}:{request.url.path}:{key}", fingerprint)
+    try:
+        yield guard
+    finally:
+        await guard.release()
@@ -0,0 +1,104 @@
+"""
+Compiled scoring for linear models.
+
+A fitted linear estimator reduces to a coefficient vector and an intercept.
+LinearKernel evaluates them with a NumPy dot for batches and plain Python for
+single rows, skipping the estimator's per-call input validation, and loads
+from a small JSON artifact so serving never imports sklearn.
+
+    python -m project.cli export-kernels
+    python -m project.cli export-kernels --version 0.0.2   # artifact of a version rollout
+"""
+import json
+import pathlib
+from abc import ABC, abstractmethod
+
+from project.config import settings
+
+
+def kernel_path(name: str, version: str | None = None) -> pathlib.Path:
+    filename = f"{name}-{version}.kernel.json" if version else f"{name}.kernel.json"
+    return pathlib.Path(settings.MODEL_ARTIFACT_DIR) / filename
+
+
+class LinearKernel:
+
+    def __init__(self, features: list, coef: list, intercept: float):
+        self.features = list(features)
+        self.coef = [float(c) for c in coef]
+        self.intercept = float(intercept)
+        self._coef_array = None
+
+    @classmethod
+    def from_estimator(cls, estimator, features: list) -> "LinearKernel":
+        coef = estimator.coef_.ravel()
+        if len(coef) != len(features):
+            raise ValueError(f"Estimator has {len(coef)} coefficients for {len(features)} features")
+        return cls(features, coef.tolist(), float(estimator.intercept_))
+
+    @classmethod
+    def load(cls, path: str | pathlib.Path) -> "LinearKernel":
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["features"], data["coef"], data["intercept"])
+
+    def save(self, path: str | pathlib.Path):
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"features": self.features, "coef": self.coef, "intercept": self.intercept}, f)
+
+    def predict_row(self, values) -> float:
+        return sum(c * v for c, v in zip(self.coef, values)) + self.intercept
+
+    def predict_batch(self, X):
+        import numpy as np
+
+        if self._coef_array is None:
+            self._coef_array = np.asarray(self.coef)
+        return np.asarray(X, dtype=float) @ self._coef_array + self.intercept
+
+
+class CompiledLinearModel(ABC):
+    """
+    Base of the linear models served through a LinearKernel. Subclasses
+    define Input, Output, OUTPUT_FIELD, KERNEL_NAME and fit_estimator(),
+    which only runs when no exported kernel exists. A specific version is
+    only served from its exported artifact.
+    """
+    KERNEL_NAME: str
+    OUTPUT_FIELD: str
+
+    def __init__(self, version: str | None = None):
+        path = kernel_path(self.KERNEL_NAME, version)
+        if version and not path.exists():
+            raise FileNotFoundError(f"No exported kernel for {self.KERNEL_NAME} version {version} at {path}")
+        self.kernel = LinearKernel.load(path) if path.exists() else self.compile_kernel()
+
+    @classmethod
+    @abstractmethod
+    def fit_estimator(cls):
+        """
+        Fit the sklearn estimator the kernel is compiled from.
+        """
+
+    @classmethod
+    def compile_kernel(cls) -> LinearKernel:
+        return LinearKernel.from_estimator(cls.fit_estimator(), list(cls.Input.model_fields))
+
+    def predict(self, input_data):
+        value = self.kernel.predict_row([getattr(input_data, name) for name in self.kernel.features])
+        return self.Output(**{self.OUTPUT_FIELD: value})
+
+    def predict_batch(self, X):
+        """
+        Score a 2D array of rows ordered like `Input` fields in a single
+        vectorized call.
+        """
+        return self.kernel.predict_batch(X)
+
+    @classmethod
+    def export_kernel(cls, version: str | None = None) -> pathlib.Path:
+        path = kernel_path(cls.KERNEL_NAME, version)
+        cls.compile_kernel().save(path)
+        return path
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+
+from project.inference.ml_models.linear_kernel import CompiledLinearModel
+
+
+class LinearPlaceholderModel(CompiledLinearModel):
+    """
+    Linear regression fitted on a synthetic dataset with three numeric features.
+    """
+    KERNEL_NAME = "linreg_placeholder"
+    OUTPUT_FIELD = "prediction"
+
+    class Input(BaseModel):
+        x0: float
+        x1: float
+        x2: float
+
+    class Output(BaseModel):
+        prediction: float
+
+    @classmethod
+    def fit_estimator(cls):
+        from sklearn.datasets import make_regression
+        from sklearn.linear_model import LinearRegression
+
+        X, y = make_regression(n_samples=100, n_features=3, noise=0.1, random_state=0)
+        return LinearRegression().fit(X, y)
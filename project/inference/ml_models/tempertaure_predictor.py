@@ -1,8 +1,11 @@
-from typing import List
 from pydantic import BaseModel
 
+from project.inference.ml_models.linear_kernel import CompiledLinearModel
 
-class TemperatureModel:
+
+class TemperatureModel(CompiledLinearModel):
+    KERNEL_NAME = "temperature_model"
+    OUTPUT_FIELD = "temperature"
 
     class Input(BaseModel):
         latitude: int
@@ -31,18 +34,10 @@ class TemperatureModel:
             y = temperatures
             return X, y
 
-    def __init__(self):
+    @classmethod
+    def fit_estimator(cls):
         import numpy as np
         from sklearn.linear_model import LinearRegression
-        
-        self.np = np
-        self.LinearRegression = LinearRegression
-        self.model = self.LinearRegression()
-        
-        X, y = self.Dataset.generate(self.np)
-        self.model.fit(X, y)
-
-    def predict(self, input_data: Input) -> Output:
-        X_new = self.np.array([[input_data.latitude, input_data.longitude, input_data.month, input_data.hour]])
-        temperature = self.model.predict(X_new)[0]
-        return self.Output(temperature=temperature)
\ No newline at end of file
+
+        X, y = cls.Dataset.generate(np)
+        return LinearRegression().fit(X, y)
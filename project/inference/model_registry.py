@@ -1,3 +1,5 @@
+import importlib
+import threading
 from typing import Callable, Dict, Any
 
 # Define a type for model functions
@@ -6,6 +8,16 @@ ModelFunction = Callable[..., list]
 # Dictionary to store models and their metadata
 model_registry: Dict[int, Dict[str, Any]] = {}
 
+# Built model instances, keyed by registry index and tagged with the function that built them
+_model_instances: Dict[int, tuple] = {}
+
+# Guards reading a registry entry together with its instance against a reload swapping both
+_swap_lock = threading.Lock()
+
+# Loaders a reload may switch to besides the declared ones
+RELOADABLE_PACKAGE = "project.inference.ml_models."
+_declared_loaders: set = set()
+
 def register_model(
     index: int,name: str, problem: str, category: str, version: str, access_policy_id: int
 ):
@@ -22,43 +34,145 @@ def register_model(
     return decorator
 
 
+def declare_model(
+    index: int, name: str, problem: str, category: str, version: str, access_policy_id: int,
+    loader: str
+):
+    """
+    Register a model from metadata only. `loader` is a "module:attribute"
+    path to the model class, imported the first time the model is built so
+    processes that never predict do not pay for the model dependencies.
+    """
+    register_model(index, name, problem, category, version, access_policy_id)(_loader_func(loader))
+    model_registry[index]["loader"] = loader
+    _declared_loaders.add(loader)
+
+
+def check_loader(loader: str):
+    """
+    Reloads only import declared loaders or classes of the model package.
+    """
+    if loader not in _declared_loaders and not loader.startswith(RELOADABLE_PACKAGE):
+        raise ValueError(f"Loader '{loader}' is neither declared nor under {RELOADABLE_PACKAGE.rstrip('.')}")
+
+
+def _import_loader(loader: str):
+    module_name, _, attribute = loader.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _loader_func(loader: str, version: str | None = None) -> ModelFunction:
+    def load():
+        from project.inference.ml_models.protocol import BatchModel
+
+        # A versioned build loads that version's artifact, see CompiledLinearModel
+        model_class = _import_loader(loader)
+        model = model_class(version=version) if version else model_class()
+        if not isinstance(model, BatchModel):
+            raise TypeError(f"{loader} does not implement the BatchModel protocol")
+        return model
+    return load
+
+
+def get_model(model_id: int):
+    """
+    Return the built model for a registry index, building it on first use.
+    """
+    with _swap_lock:
+        func = model_registry[model_id]["func"]
+        cached = _model_instances.get(model_id)
+    if cached is None or cached[0] is not func:
+        cached = (func, func())
+        _model_instances[model_id] = cached
+    return cached[1]
+
+
+def get_input_model(model_id: int):
+    """
+    Input schema of a model. Declared models are not built for it, so the
+    web process can validate inputs without loading their weights.
+    """
+    entry = model_registry[model_id]
+    if "loader" in entry:
+        return _import_loader(entry["loader"]).Input
+    return get_model(model_id).Input
+
+
+def _reloaded_entry(model_id: int, loader: str | None, version: str | None) -> dict:
+    """
+    Registry entry of a model switched to `loader` and `version`, each
+    defaulting to the current one. `artifact_version` is None while the
+    model serves its declared, unversioned artifacts.
+    """
+    entry = model_registry[model_id]
+    loader = loader or entry.get("loader")
+    if loader is None:
+        raise ValueError(f"Model with id {model_id} was not declared with a loader")
+    check_loader(loader)
+    artifact_version = version or entry.get("artifact_version")
+    return {
+        **entry,
+        "func": _loader_func(loader, artifact_version),
+        "loader": loader,
+        "version": artifact_version or entry["version"],
+        "artifact_version": artifact_version,
+    }
+
+
+def set_loader(model_id: int, loader: str | None = None, version: str | None = None):
+    """
+    Point a declared model at another loader or version without building
+    it, get_model builds it on first use.
+    """
+    entry = _reloaded_entry(model_id, loader, version)
+    with _swap_lock:
+        model_registry[model_id] = entry
+
+
+def reload_model(model_id: int, loader: str | None = None, version: str | None = None):
+    """
+    Build a new instance of a declared model, optionally from another loader
+    or at another version, and swap it in atomically. The build runs outside
+    the lock so tasks keep predicting with the current instance meanwhile;
+    tasks already holding it finish on it and it is freed with their last
+    reference.
+    """
+    entry = _reloaded_entry(model_id, loader, version)
+    instance = entry["func"]()
+    with _swap_lock:
+        model_registry[model_id] = entry
+        _model_instances[model_id] = (entry["func"], instance)
+    return instance
+
+
+def warmup_models():
+    """
+    Import and build the declared models ahead of the first task.
+    """
+    for model_id, model_info in model_registry.items():
+        if "loader" in model_info:
+            get_model(model_id)
+
+
 
 # Example model registration
-@register_model(
+declare_model(
     index=1,
     name="linreg_placeholder",
     problem="regression",
     category="linear",
     version="0.0.1",
-    access_policy_id=1
+    access_policy_id=1,
+    loader="project.inference.ml_models.linreg_placeholder:LinearPlaceholderModel"
 )
-def placeholder_linreg_model():
-    import numpy as np
-    from sklearn.linear_model import LinearRegression
-    from sklearn.datasets import make_regression
-
-    # Generate synthetic dataset with only numeric features
-    X, y = make_regression(n_samples=100, n_features=3, noise=0.1)
-    
-    # Create and fit the model
-    model = LinearRegression()
-    model.fit(X, y)
-    
-    # Make predictions
-    predictions = model.predict(X)
-    
-    return predictions.tolist()
-
-from project.inference.ml_models.tempertaure_predictor import TemperatureModel
+
 # Register the temperature model
-@register_model(
+declare_model(
     index=2,
     name="temperature_model",
     problem="regression",
     category="temperature",
     version="1.0.0",
-    access_policy_id=1
+    access_policy_id=1,
+    loader="project.inference.ml_models.tempertaure_predictor:TemperatureModel"
 )
-def temperature_model_func():
-    model = TemperatureModel()
-    return model
\ No newline at end of file
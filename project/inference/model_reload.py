@@ -0,0 +1,104 @@
+"""
+Hot model reload over Redis pub/sub.
+
+Every worker child process subscribes to MODEL_RELOAD_CHANNEL and rebuilds
+the announced model in a background thread, so a rollout swaps models in
+place instead of restarting workers and losing their warm state.
+
+The active loader and version of every reloaded model are also kept in the
+MODEL_RELOAD_STATE_KEY hash. Processes apply them when they start, and
+listeners after reconnecting, so a recycled or new worker does not fall
+back to the declared model.
+"""
+import json
+import logging
+import threading
+import time
+
+import redis
+
+from project import redis_utils
+from project.config import settings
+from project.inference.model_registry import model_registry, reload_model, set_loader
+
+logger = logging.getLogger(__name__)
+
+MODEL_RELOAD_STATE_KEY = "model_reload:active"
+# Seconds before the first resubscription of a listener, doubled up to a minute
+RECONNECT_DELAY = 1.0
+
+
+def publish_model_reload(model_id: int, loader: str | None = None, version: str | None = None) -> int:
+    """
+    Record the model's new loader and version and ask the workers to reload
+    it. Returns the number of processes listening on the channel.
+    """
+    client = redis_utils.redis_client
+    previous = client.hget(MODEL_RELOAD_STATE_KEY, model_id)
+    state = json.loads(previous) if previous else {"loader": None, "version": None}
+    message = {
+        "model_id": model_id,
+        "loader": loader or state["loader"],
+        "version": version or state["version"],
+    }
+    client.hset(MODEL_RELOAD_STATE_KEY, model_id, json.dumps(message))
+    return client.publish(settings.MODEL_RELOAD_CHANNEL, json.dumps(message))
+
+
+def handle_reload_message(data: bytes | str):
+    message = json.loads(data)
+    model_id = message["model_id"]
+    if model_id not in model_registry:
+        logger.warning(f"Ignoring reload of unknown model {model_id}")
+        return
+    try:
+        reload_model(model_id, message.get("loader"), message.get("version"))
+    except Exception:
+        # The current instance keeps serving
+        logger.exception(f"Reload of model {model_id} failed")
+        return
+    logger.info(f"Model {model_id} reloaded at version {model_registry[model_id]['version']}")
+
+
+def apply_active_reloads(build: bool = False):
+    """
+    Switch the registry to the recorded loader and version of every reloaded
+    model that differs. Without `build` the models are only built on first
+    use, e.g. by the warmup of a starting worker.
+    """
+    for field, data in redis_utils.redis_client.hgetall(MODEL_RELOAD_STATE_KEY).items():
+        message = json.loads(data)
+        entry = model_registry.get(int(field))
+        if entry is None:
+            continue
+        if message["loader"] in (None, entry.get("loader")) and message["version"] == entry.get("artifact_version"):
+            continue
+        if build:
+            handle_reload_message(data)
+            continue
+        try:
+            set_loader(int(field), message["loader"], message["version"])
+        except Exception:
+            logger.exception(f"Recorded reload of model {field} could not be applied")
+
+
+def start_reload_listener() -> threading.Thread:
+    def listen():
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                pubsub = redis_utils.redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(settings.MODEL_RELOAD_CHANNEL)
+                # Reloads published while this listener was not subscribed
+                apply_active_reloads(build=True)
+                delay = RECONNECT_DELAY
+                for message in pubsub.listen():
+                    handle_reload_message(message["data"])
+            except redis.RedisError as e:
+                logger.warning(f"Model reload listener disconnected, reconnecting in {delay}s: {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, 60.0)
+
+    thread = threading.Thread(target=listen, name="model-reload", daemon=True)
+    thread.start()
+    return thread
@@ -2,6 +2,7 @@ from project.database import Base
 from sqlalchemy import (
     Boolean, 
     DateTime, 
+    Float,
     ForeignKey, 
     Integer, 
     String,
@@ -19,6 +20,13 @@ class AccessPolicy(Base):
     name: Mapped[str] = mapped_column(String(64), nullable=False)
     daily_api_calls: Mapped[int] = mapped_column(Integer, default=1000, server_default="1000")
     monthly_api_calls: Mapped[int] = mapped_column(Integer, default=30000, server_default="30000")
+    # Request rate limits enforced in Redis, null means unlimited
+    requests_per_second: Mapped[int] = mapped_column(Integer, nullable=True)
+    requests_per_minute: Mapped[int] = mapped_column(Integer, nullable=True)
+    # Key of settings.SERVICE_TIERS, the priority lane of the predictions
+    service_tier: Mapped[str] = mapped_column(String(16), nullable=False, default="standard", server_default="standard")
+    # Seconds a prediction may wait for a worker, null means PREDICT_DEFAULT_TIMEOUT
+    request_timeout: Mapped[float] = mapped_column(Float, nullable=True)
     
     
     
@@ -42,6 +50,10 @@ class InferenceModel(Base):
     in_production: Mapped[bool] = mapped_column(
         Boolean, nullable=False, default=False, server_default="False"
     )
+    # Share of the primary's traffic routed to this version while it is a Canary or Shadow
+    traffic_percent: Mapped[float] = mapped_column(Float, nullable=False, default=0.0, server_default="0")
+    # Longest acceptable queue wait in seconds, requests are shed beyond it
+    latency_slo: Mapped[float] = mapped_column(Float, nullable=True)
     mlflow_id: Mapped[str] = mapped_column(String, nullable=True)
     source_url: Mapped[str] = mapped_column(String, nullable=True)
     access_policy_id: Mapped[int] = mapped_column(Integer, ForeignKey("access_policy.id"))
@@ -63,7 +75,20 @@ class ServiceCall(Base):
     __tablename__ = "service_call"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     model_id: Mapped[int] = mapped_column(Integer, ForeignKey("inference_model.id"))
+    # Version that ran the prediction when traffic was split away from model_id
+    served_model_id: Mapped[int] = mapped_column(Integer, ForeignKey("inference_model.id"), nullable=True)
     user_id: Mapped[UUID] = mapped_column(UUID, ForeignKey("user.id"))  # Ensure this is also UUID
     time_requested: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=text('CURRENT_TIMESTAMP'))
+    time_started: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=True)
     time_completed: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=True)
-    celery_task_id: Mapped[str] = mapped_column(String, nullable=True)
\ No newline at end of file
+    time_failed: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Set when the task deadline passed before a worker started it
+    time_expired: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=True)
+    time_cancelled: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Refunded calls do not count against the daily and monthly quotas
+    quota_refunded: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default="0")
+    celery_task_id: Mapped[str] = mapped_column(String, nullable=True, index=True)
+    # Latencies in seconds, filled by the Celery task lifecycle signals
+    queue_latency: Mapped[float] = mapped_column(Float, nullable=True)
+    run_latency: Mapped[float] = mapped_column(Float, nullable=True)
+    total_latency: Mapped[float] = mapped_column(Float, nullable=True)
\ No newline at end of file
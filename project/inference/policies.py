@@ -0,0 +1,72 @@
+"""
+Per-process cache of the access policy settings read on every prediction
+request: rate limits and service tier. Policies change rarely, so a short
+TTL keeps the hot path free of database queries.
+"""
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from project.config import settings
+from project.inference.models import AccessPolicy, UserAccess
+
+POLICY_COLUMNS = ("requests_per_second", "requests_per_minute", "service_tier", "request_timeout")
+
+# (user_id, model_id) -> (expires_at, policy settings or None without access)
+_policies: Dict[Tuple[UUID, int], Tuple[float, Dict[str, Any] | None]] = {}
+
+
+async def get_user_policy(session: AsyncSession, user_id: UUID, model_id: int) -> Dict[str, Any] | None:
+    """
+    Settings of the policy the user was granted for a model, None when the
+    user has no access (the access check rejects the request).
+    """
+    key = (user_id, model_id)
+    cached = _policies.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+
+    result = await session.execute(
+        select(*[getattr(AccessPolicy, column) for column in POLICY_COLUMNS])
+        .join(UserAccess, UserAccess.access_policy_id == AccessPolicy.id)
+        .where(
+            UserAccess.user_id == user_id,
+            UserAccess.model_id == model_id,
+            UserAccess.access_granted == True
+        )
+    )
+    row = result.first()
+    policy = dict(zip(POLICY_COLUMNS, row)) if row else None
+    _policies[key] = (time.monotonic() + settings.POLICY_CACHE_TTL, policy)
+    return policy
+
+
+def clear_policy_cache():
+    _policies.clear()
+
+
+def service_lane(policy: Dict[str, Any] | None) -> Dict[str, Any]:
+    """
+    Celery `queue` and `priority` options of the policy's service tier.
+    """
+    tier = (policy or {}).get("service_tier")
+    return dict(settings.SERVICE_TIERS.get(tier, settings.SERVICE_TIERS[settings.DEFAULT_SERVICE_TIER]))
+
+
+def request_deadline(policy: Dict[str, Any] | None, timeout_header: str | None = None) -> datetime:
+    """
+    Time after which a prediction is not worth computing: the policy's
+    request timeout, shortened by the client's timeout header if any.
+    Raises ValueError on a malformed header.
+    """
+    timeout = (policy or {}).get("request_timeout") or settings.PREDICT_DEFAULT_TIMEOUT
+    if timeout_header is not None:
+        requested = float(timeout_header)
+        if not requested > 0:
+            raise ValueError(f"{settings.REQUEST_TIMEOUT_HEADER} must be a positive number of seconds")
+        timeout = min(timeout, requested)
+    return datetime.now(timezone.utc) + timedelta(seconds=timeout)
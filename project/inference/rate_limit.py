@@ -0,0 +1,106 @@
+"""
+Per-user request rate limiting in front of the predict endpoints.
+
+Each limit of the user's access policy (requests per second, per minute) is
+a GCRA bucket in Redis: the key holds the theoretical arrival time of the
+next request, and a request is admitted when it is not earlier than that
+time minus the burst tolerance. All limits are checked and updated by a
+single Lua script on the asyncio client, so one round trip admits or
+rejects a request without blocking the event loop. The policy limits are
+cached per process, so the hot path does no database work.
+"""
+import logging
+import math
+from typing import Dict
+from uuid import UUID
+
+import redis
+from fastapi import Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from project import redis_utils
+from project.database import get_async_session
+from project.fu_core.users import current_active_user, models
+from project.inference import policies
+from project.metrics import RATE_LIMIT_REJECTIONS
+
+logger = logging.getLogger(__name__)
+
+# Seconds covered by each AccessPolicy rate column
+RATE_LIMIT_PERIODS = {
+    "requests_per_second": 1,
+    "requests_per_minute": 60,
+}
+
+# KEYS: one bucket per limit. ARGV: emission interval and tolerance per key.
+# Returns "0" when admitted, otherwise the seconds to wait as a string.
+GCRA_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local retry_after = 0
+local arrivals = {}
+for i, key in ipairs(KEYS) do
+    local interval = tonumber(ARGV[2 * i - 1])
+    local tolerance = tonumber(ARGV[2 * i])
+    local tat = math.max(tonumber(redis.call('GET', key)) or now, now)
+    retry_after = math.max(retry_after, tat - tolerance - now)
+    arrivals[i] = tat + interval
+end
+if retry_after > 0 then
+    return tostring(retry_after)
+end
+for i, key in ipairs(KEYS) do
+    redis.call('SET', key, tostring(arrivals[i]), 'PX', math.ceil((arrivals[i] - now) * 1000))
+end
+return '0'
+"""
+
+_gcra_script = redis_utils.async_redis_client.register_script(GCRA_SCRIPT)
+
+async def get_rate_limits(session: AsyncSession, user_id: UUID, model_id: int) -> Dict[str, int]:
+    """
+    Configured rate limits of the user's policy for a model, empty when
+    unlimited or when the user has no access (the access check rejects it).
+    """
+    policy = await policies.get_user_policy(session, user_id, model_id) or {}
+    return {column: policy[column] for column in RATE_LIMIT_PERIODS if policy.get(column)}
+
+
+async def acquire(user_id: UUID, model_id: int, limits: Dict[str, int]) -> float:
+    """
+    Take one request from every bucket, or none of them. Returns 0 when
+    admitted, otherwise the seconds until the request would be admitted.
+    """
+    keys, args = [], []
+    for column, limit in limits.items():
+        period = RATE_LIMIT_PERIODS[column]
+        interval = period / limit
+        keys.append(f"rate_limit:{user_id}:{model_id}:{period}")
+        # A full bucket admits `limit` requests at once
+        args += [interval, period - interval]
+    return float(await _gcra_script(keys=keys, args=args, client=redis_utils.async_redis_client))
+
+
+async def enforce_rate_limit(
+    model_id: int,
+    current_user: models.User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    limits = await get_rate_limits(session, current_user.id, model_id)
+    if not limits:
+        return
+
+    try:
+        retry_after = await acquire(current_user.id, model_id, limits)
+    except redis.RedisError as e:
+        # An unavailable limiter must not take the predict endpoints down with it
+        logger.warning(f"Rate limiter unavailable, admitting request: {e}")
+        return
+
+    if retry_after > 0:
+        RATE_LIMIT_REJECTIONS.labels(model_id=str(model_id)).inc()
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
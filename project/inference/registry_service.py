@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.future import select
+
+from project.config import settings
+from project.inference.models import InferenceModel
+from project.inference.model_registry import model_registry
+from project.inference.routing import CANDIDATE_STATUSES
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "inference_model_changed"
+# Seconds before the first reconnection of the listener, doubled up to a minute
+RECONNECT_DELAY = 1.0
+
+METADATA_COLUMNS = (
+    "id",
+    "name",
+    "problem",
+    "category",
+    "version",
+    "deployment_status",
+    "in_production",
+    "traffic_percent",
+    "latency_slo",
+    "access_policy_id",
+)
+
+
+class ModelRegistryService:
+    """
+    Per-process cache of the servable models: rows of `inference_model` that
+    also have an implementation in the code registry under the same id and
+    name. Lookups are dict reads; the cache is loaded at startup, kept fresh
+    by Postgres NOTIFY on `inference_model` changes and falls back to the
+    database on a miss, so a model created by another process is found.
+    """
+
+    def __init__(self):
+        self._models: Dict[int, Dict[str, Any]] = {}
+        self._missing: Dict[int, float] = {}
+        self._listener_task: asyncio.Task | None = None
+        self._change_tasks: set = set()
+
+    def _reconcile(self, row: InferenceModel) -> Dict[str, Any] | None:
+        code_entry = model_registry.get(row.id)
+        if code_entry is None:
+            logger.warning(f"Model {row.id} ({row.name}) has no implementation in the registry")
+            return None
+        if code_entry["name"] != row.name:
+            logger.error(
+                f"Model {row.id} is '{row.name}' in the database but '{code_entry['name']}' in code"
+            )
+            return None
+        return {column: getattr(row, column) for column in METADATA_COLUMNS}
+
+    async def load(self, session: AsyncSession):
+        result = await session.execute(select(InferenceModel))
+        models = {}
+        for row in result.scalars():
+            metadata = self._reconcile(row)
+            if metadata is not None:
+                models[row.id] = metadata
+
+        for model_id in model_registry.keys() - models.keys():
+            logger.warning(f"Registry model {model_id} is not servable, is the database seeded?")
+
+        self._models = models
+        self._missing.clear()
+        logger.info(f"Model registry loaded with models {sorted(models)}")
+
+    async def reload_model(self, session: AsyncSession, model_id: int) -> Dict[str, Any] | None:
+        result = await session.execute(select(InferenceModel).where(InferenceModel.id == model_id))
+        row = result.scalars().first()
+        metadata = self._reconcile(row) if row else None
+        if metadata is None:
+            self._models.pop(model_id, None)
+            self._missing[model_id] = time.monotonic() + settings.MODEL_REGISTRY_MISS_TTL
+        else:
+            self._models[model_id] = metadata
+            self._missing.pop(model_id, None)
+        return metadata
+
+    async def get(self, session: AsyncSession, model_id: int) -> Dict[str, Any] | None:
+        metadata = self._models.get(model_id)
+        if metadata is not None:
+            return metadata
+        # Unknown ids are remembered for a while so they do not query on every request
+        if self._missing.get(model_id, 0) > time.monotonic():
+            return None
+        return await self.reload_model(session, model_id)
+
+    def candidates(self, model_id: int) -> list:
+        """
+        Canary and shadow versions of a cached production model.
+        """
+        primary = self._models.get(model_id)
+        if primary is None or not primary["in_production"]:
+            return []
+        return [
+            metadata
+            for candidate_id, metadata in sorted(self._models.items())
+            if candidate_id != model_id
+            and metadata["name"] == primary["name"]
+            and metadata["deployment_status"] in CANDIDATE_STATUSES
+        ]
+
+    async def start_listener(self, engine: AsyncEngine, session_maker):
+        """
+        LISTEN for `inference_model` changes on a dedicated connection.
+        Only available on Postgres, other databases rely on the miss fallback.
+        """
+        if engine.dialect.name != "postgresql":
+            return
+        self._listener_task = asyncio.create_task(self._listen(engine, session_maker))
+
+    async def _listen(self, engine: AsyncEngine, session_maker):
+        """
+        Keep the LISTEN connection open, reconnecting when it drops. The cache
+        is reloaded after every connection, since notifications sent while
+        disconnected are lost, and every MODEL_REGISTRY_RESYNC_INTERVAL
+        seconds.
+        """
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                async with engine.connect() as connection:
+                    raw_connection = await connection.get_raw_connection()
+                    driver_connection = raw_connection.driver_connection
+                    closed = asyncio.Event()
+                    driver_connection.add_termination_listener(lambda _connection: closed.set())
+                    await driver_connection.add_listener(NOTIFY_CHANNEL, self._on_notify(session_maker))
+                    logger.info(f"Listening for model changes on channel {NOTIFY_CHANNEL}")
+                    delay = RECONNECT_DELAY
+                    while not closed.is_set():
+                        await self._resync(session_maker)
+                        try:
+                            await asyncio.wait_for(closed.wait(), settings.MODEL_REGISTRY_RESYNC_INTERVAL)
+                        except asyncio.TimeoutError:
+                            pass
+                raise ConnectionError("LISTEN connection closed")
+            except Exception as e:
+                logger.warning(f"Model change listener disconnected, reconnecting in {delay}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60.0)
+
+    def _on_notify(self, session_maker):
+        def on_notify(_connection, _pid, _channel, payload):
+            # The loop only keeps weak references to tasks
+            task = asyncio.get_running_loop().create_task(self._on_change(session_maker, int(payload)))
+            self._change_tasks.add(task)
+            task.add_done_callback(self._change_tasks.discard)
+        return on_notify
+
+    async def _resync(self, session_maker):
+        async with session_maker() as session:
+            await self.load(session)
+
+    async def _on_change(self, session_maker, model_id: int):
+        async with session_maker() as session:
+            await self.reload_model(session, model_id)
+        logger.info(f"Model {model_id} refreshed after change notification")
+
+    async def stop_listener(self):
+        tasks = list(self._change_tasks)
+        if self._listener_task is not None:
+            tasks.append(self._listener_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._listener_task = None
+
+
+registry_service = ModelRegistryService()
@@ -0,0 +1,167 @@
+"""
+Out-of-band storage of large task results.
+
+Results whose JSON encoding exceeds RESULT_OFFLOAD_THRESHOLD bytes are written
+to a blob store and the task returns a reference instead, so the Redis result
+backend only carries a few hundred bytes per task.
+
+    RESULT_STORE_URL=file:///app/upload/results   # local disk (default)
+    RESULT_STORE_URL=s3://bucket/prefix           # S3 compatible, needs boto3
+"""
+import json
+import os
+import pathlib
+import time
+from functools import lru_cache
+from typing import Iterator
+from urllib.parse import urlparse
+
+from project.config import settings
+
+RESULT_REF_KEY = "result_ref"
+CHUNK_SIZE = 64 * 1024
+
+
+class LocalBlobStore:
+
+    def __init__(self, root: str | pathlib.Path):
+        self.root = pathlib.Path(root)
+
+    def put(self, key: str, data: bytes):
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Readers never see a partially written blob
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def iter_range(self, key: str, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+        """
+        Yield bytes [start, end) of a blob in chunks.
+        """
+        with open(self.root / key, "rb") as f:
+            f.seek(start)
+            remaining = None if end is None else end - start
+            while remaining is None or remaining > 0:
+                chunk = f.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def delete(self, key: str):
+        (self.root / key).unlink(missing_ok=True)
+
+    def keys_older_than(self, cutoff: float) -> Iterator[str]:
+        if not self.root.exists():
+            return
+        for path in self.root.iterdir():
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                yield path.name
+
+
+class S3BlobStore:
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: str | None = None):
+        try:
+            import boto3
+        except ImportError as e:
+            raise ValueError("S3 result storage requires the 'boto3' package") from e
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put(self, key: str, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=self._object_key(key), Body=data)
+
+    def iter_range(self, key: str, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+        byte_range = f"bytes={start}-" if end is None else f"bytes={start}-{end - 1}"
+        response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key), Range=byte_range)
+        yield from response["Body"].iter_chunks(CHUNK_SIZE)
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+    def keys_older_than(self, cutoff: float) -> Iterator[str]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        prefix = f"{self.prefix}/" if self.prefix else ""
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                if obj["LastModified"].timestamp() < cutoff:
+                    yield obj["Key"][len(prefix):]
+
+
+@lru_cache
+def get_blob_store():
+    url = urlparse(settings.RESULT_STORE_URL)
+    if url.scheme == "file":
+        return LocalBlobStore(url.path)
+    if url.scheme == "s3":
+        return S3BlobStore(url.netloc, url.path, settings.RESULT_STORE_S3_ENDPOINT)
+    raise ValueError(f"Unsupported result store '{settings.RESULT_STORE_URL}'")
+
+
+def is_reference(result) -> bool:
+    return isinstance(result, dict) and RESULT_REF_KEY in result
+
+
+def offload_result(task_id: str, result):
+    """
+    Return the result itself when it is small, otherwise store it and
+    return a reference to it.
+    """
+    data = json.dumps(result).encode("utf-8")
+    if len(data) <= settings.RESULT_OFFLOAD_THRESHOLD:
+        return result
+
+    key = f"{task_id}.json"
+    get_blob_store().put(key, data)
+    return {RESULT_REF_KEY: {"key": key, "size": len(data), "content_type": "application/json"}}
+
+
+def load_result(result):
+    """
+    Resolve a result that may be a reference to the stored value.
+    """
+    if not is_reference(result):
+        return result
+    data = b"".join(get_blob_store().iter_range(result[RESULT_REF_KEY]["key"]))
+    return json.loads(data)
+
+
+def parse_range(header: str, size: int) -> tuple[int, int]:
+    """
+    Parse a single "bytes=start-end" Range header into [start, end).
+    Raises ValueError when it is malformed or not satisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        raise ValueError(f"Unsupported range '{header}'")
+    first, _, last = spec.strip().partition("-")
+    if first:
+        start = int(first)
+        end = min(int(last) + 1, size) if last else size
+    else:
+        # Suffix range, the last N bytes
+        start, end = max(size - int(last), 0), size
+    if start >= size or start >= end:
+        raise ValueError(f"Range '{header}' not satisfiable for {size} bytes")
+    return start, end
+
+
+def collect_garbage(max_age: float) -> int:
+    """
+    Delete blobs older than `max_age` seconds, by then the task meta holding
+    their reference has expired. Returns the number of deleted blobs.
+    """
+    store = get_blob_store()
+    cutoff = time.time() - max_age
+    deleted = 0
+    for key in list(store.keys_older_than(cutoff)):
+        store.delete(key)
+        deleted += 1
+    return deleted
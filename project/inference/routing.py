@@ -0,0 +1,59 @@
+"""
+Traffic split across versions of a model.
+
+Versions are inference_model rows sharing a name. The row clients request
+is the primary once it is `in_production`. Rows of the same name with
+deployment_status "Canary" serve `traffic_percent` of its predictions in
+its place. Rows with "Shadow" score a `traffic_percent` sample of its
+inputs on the low priority queue after the primary answered, without
+affecting the response.
+"""
+import math
+import random
+
+CANARY = "Canary"
+SHADOW = "Shadow"
+CANDIDATE_STATUSES = (CANARY, SHADOW)
+
+
+def choose_route(model_id: int, candidates: list, draw=random.random) -> tuple[int, list]:
+    """
+    Return the id of the model serving this prediction and the ids of the
+    shadow models scoring it too.
+    """
+    served_model_id = model_id
+    point = draw() * 100
+    for candidate in candidates:
+        if candidate["deployment_status"] != CANARY:
+            continue
+        if point < candidate["traffic_percent"]:
+            served_model_id = candidate["id"]
+            break
+        point -= candidate["traffic_percent"]
+
+    shadow_model_ids = [
+        candidate["id"]
+        for candidate in candidates
+        if candidate["deployment_status"] == SHADOW and draw() * 100 < candidate["traffic_percent"]
+    ]
+    return served_model_id, shadow_model_ids
+
+
+def compare_results(primary: dict, candidate: dict) -> float | None:
+    """
+    Largest absolute difference between the numeric fields of two results,
+    0 when they are equal and None when they are not comparable.
+    """
+    if not isinstance(primary, dict) or not isinstance(candidate, dict):
+        return None
+    if primary.keys() != candidate.keys() or "error" in primary:
+        return None
+
+    diff = 0.0
+    for key, value in primary.items():
+        other = candidate[key]
+        if isinstance(value, (int, float)) and isinstance(other, (int, float)):
+            diff = max(diff, abs(value - other))
+        elif value != other:
+            return math.inf
+    return diff
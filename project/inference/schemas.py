@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 from uuid import UUID
 from datetime import datetime
 
+from project.config import settings
+
 class UserAccessCreate(BaseModel):
     user_id: UUID
     model_id: int
@@ -16,4 +18,37 @@ class UserAccessResponse(BaseModel):
     last_accessed: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class ModelReload(BaseModel):
+    loader: str | None = Field(None, description="module:Class path of the new implementation")
+    version: str | None = Field(None, description="Version whose exported artifacts are loaded")
+
+    @model_validator(mode="after")
+    def check_version(self):
+        # Cached predictions are keyed by version, a new implementation needs a new one
+        if self.loader and not self.version:
+            raise ValueError("A new loader needs a version")
+        return self
+
+
+class TaskStatusRequest(BaseModel):
+    task_ids: list[str] = Field(..., min_length=1, max_length=settings.TASK_STATUS_MAX_IDS)
+
+
+class BatchPredictRequest(BaseModel):
+    # One list per input field, validated against the model's input schema by the view
+    columns: dict[str, list]
+
+    @field_validator("columns")
+    @classmethod
+    def check_shape(cls, columns: dict) -> dict:
+        lengths = {len(values) for values in columns.values()}
+        if not columns or lengths == {0}:
+            raise ValueError("columns must not be empty")
+        if len(lengths) > 1:
+            raise ValueError("All input columns must have the same length")
+        if lengths.pop() > settings.BATCH_PREDICT_MAX_ROWS:
+            raise ValueError(f"At most {settings.BATCH_PREDICT_MAX_ROWS} rows per request, use bulk scoring")
+        return columns
@@ -1,38 +1,84 @@
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
-from project.inference.crud import (
-    create_inference_model, 
-    create_access_policy, 
-    get_access_policy_by_name,
-    get_inference_model
-)
 
+from project.inference.models import AccessPolicy, InferenceModel
 from project.inference.model_registry import model_registry
 
+# Arbitrary application-wide key for pg_advisory_xact_lock
+SEED_LOCK_KEY = 186644
+
+
+def _insert(session: AsyncSession, model):
+    """
+    Dialect specific INSERT supporting ON CONFLICT DO NOTHING.
+    """
+    dialect = session.bind.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"Seeding is not supported on {dialect}")
+
 
 async def add_base_access_policy(session: AsyncSession):
-    existing_policy = await get_access_policy_by_name(session, "base")
-    if not existing_policy:
-        await create_access_policy(
-            session,
-            name="base",
-        )
+    # The registry's models reference the base policy as access_policy_id=1
+    await session.execute(
+        _insert(session, AccessPolicy)
+        .values(id=1, name="base")
+        .on_conflict_do_nothing(index_elements=["id"])
+    )
 
 async def add_models_from_registry(session: AsyncSession):
-    for model_id, model_info in model_registry.items():
-        existing_model = await get_inference_model(session, model_id)
-        if not existing_model:
-            await create_inference_model(
-                session,
-                name=model_info["name"],
-                problem=model_info["problem"],
-                category=model_info["category"],
-                version=model_info["version"],
-                access_policy_id=model_info["access_policy_id"]
-            )
+    # Registry indices are the inference_model ids
+    rows = [
+        {
+            "id": model_id,
+            "name": model_info["name"],
+            "problem": model_info["problem"],
+            "category": model_info["category"],
+            "version": model_info["version"],
+            "access_policy_id": model_info["access_policy_id"],
+        }
+        for model_id, model_info in model_registry.items()
+    ]
+    if rows:
+        await session.execute(
+            _insert(session, InferenceModel)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["id"])
+        )
+
 
+async def _sync_id_sequences(session: AsyncSession):
+    """
+    Explicit ids do not advance Postgres serial sequences, move them past the
+    seeded rows so regular inserts do not collide.
+    """
+    for model in (AccessPolicy, InferenceModel):
+        table = model.__tablename__
+        max_id = (await session.execute(select(func.max(model.id)))).scalar()
+        if max_id:
+            await session.execute(
+                text("SELECT setval(pg_get_serial_sequence(:table, 'id'), :max_id)"),
+                {"table": table, "max_id": max_id},
+            )
 
 
 async def seed_inference_data(session: AsyncSession):
+    """
+    Idempotent and safe to run concurrently: every process may call it at
+    startup, the advisory lock serializes them on Postgres and the inserts
+    skip existing rows.
+    """
+    postgres = session.bind.dialect.name == "postgresql"
+    if postgres:
+        await session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SEED_LOCK_KEY})
+
     await add_base_access_policy(session)
     await add_models_from_registry(session)
-    # Add other seeders here
\ No newline at end of file
+    # Add other seeders here
+
+    if postgres:
+        await _sync_id_sequences(session)
+    await session.commit()
@@ -0,0 +1,60 @@
+"""
+Status of many tasks in one round trip to the result backend.
+
+AsyncResult reads one `celery-task-meta-*` key per task on a blocking
+client. With a Redis result backend the keys of all requested tasks are
+read with a single MGET on an asyncio client instead, so the web process
+neither blocks its event loop nor a threadpool worker. Other backends fall
+back to AsyncResult in the threadpool.
+"""
+from functools import lru_cache
+from urllib.parse import urlparse
+
+import redis.asyncio
+from celery import current_app
+from celery.result import AsyncResult
+from starlette.concurrency import run_in_threadpool
+
+from project.config import settings
+from project.inference import result_store
+
+
+@lru_cache
+def get_result_redis() -> redis.asyncio.StrictRedis | None:
+    if urlparse(settings.CELERY_RESULT_BACKEND).scheme not in ("redis", "rediss"):
+        return None
+    return redis.asyncio.StrictRedis.from_url(settings.CELERY_RESULT_BACKEND)
+
+
+def describe(state: str, result) -> dict:
+    """
+    Compact status of a task. Offloaded results stay references, their
+    content is served by /task_status/{task_id}/result.
+    """
+    if state == "FAILURE":
+        return {"state": state, "error": str(result)}
+    if result_store.is_reference(result):
+        return {"state": state, "result_ref": result[result_store.RESULT_REF_KEY]}
+    return {"state": state, "result": result}
+
+
+async def get_statuses(task_ids: list) -> dict:
+    task_ids = list(dict.fromkeys(task_ids))
+    client = get_result_redis()
+    if client is None:
+        def read(task_id: str) -> dict:
+            task = AsyncResult(task_id)
+            return describe(task.state, task.result)
+        return await run_in_threadpool(lambda: {task_id: read(task_id) for task_id in task_ids})
+
+    backend = current_app.backend
+    payloads = await client.mget([backend.get_key_for_task(task_id) for task_id in task_ids])
+    statuses = {}
+    for task_id, payload in zip(task_ids, payloads):
+        if payload is None:
+            # Unknown or expired, as AsyncResult reports it
+            statuses[task_id] = describe("PENDING", None)
+        else:
+            meta = backend.decode_result(payload)
+            statuses[task_id] = describe(meta["status"], meta["result"])
+    return statuses
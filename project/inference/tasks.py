@@ -1,15 +1,39 @@
 import asyncio
-from celery.result import AsyncResult
-from celery import shared_task
+import pathlib
+from celery import chord, shared_task
+from celery.concurrency import get_implementation
+from celery.utils import uuid
 from project.celery_utils import custom_celery_task
-from celery.signals import task_failure, task_success
-from project.inference.model_registry import model_registry
+from celery.signals import (
+    task_failure,
+    task_postrun,
+    task_prerun,
+    task_revoked,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_shutdown,
+)
+from project.inference.model_registry import get_model, model_registry, warmup_models
 from project.database import get_async_session
-from project.inference.crud import update_service_call_time_completed
-from datetime import datetime
+from project.inference import crud
+from project.inference.crud import (
+    mark_service_call_failed,
+    mark_service_call_started,
+    update_service_call_time_completed,
+)
+from datetime import datetime, timezone
 import logging
 import json
+import redis
 from project.redis_utils import get_cache, set_cache
+from project.inference import admission, bulk, circuit_breaker, result_store, usage
+from project.inference.model_reload import apply_active_reloads, start_reload_listener
+from project.inference.ml_models.protocol import BatchModel, validate_columns
+from project.inference.routing import compare_results
+from project.metrics import PREDICTION_LATENCY, SHADOW_COMPARISONS, SHADOW_RESULT_DIFF
+from project.config import settings
+from project.worker_loop import worker_loop
 logger = logging.getLogger(__name__)
 
 
@@ -52,32 +76,146 @@ def run_model(self, model_id: int, input_data: dict):
         logger.error(f"Model with id {model_id} not found")
         return {"error": f"Model with id {model_id} not found"}
     
-    model_func = model_registry[model_id]['func']
-    model = model_func()
+    model = get_model(model_id)
     
-    # Generate a cache key based on model_id and input parameters
-    cache_key = f"model_{model_id}_result_{hash(frozenset(input_data.items()))}"
+    # Generate a cache key based on model_id, version and input parameters
+    version = model_registry[model_id].get("version")
+    cache_key = f"model_{model_id}_{version}_result_{hash(frozenset(input_data.items()))}"
     logger.info(f"Generated cache key: {cache_key}")
     
     # Check if result is already cached
     cached_result = get_cache(cache_key)
     if cached_result:
         logger.info(f"Returning cached result for model {model_id}")
-        return cached_result
+        return result_store.offload_result(self.request.id or uuid(), cached_result)
     
     try:
         input_obj = model.Input(**input_data)
-        result = model.predict(input_obj)
+        with PREDICTION_LATENCY.labels(model_registry[model_id]["name"], version).time():
+            result = model.predict(input_obj)
         logger.info(f"Model {model_id} executed successfully with result: {result}")
         
         # Cache the result with an expiration time
         set_cache(cache_key, result.dict())
         logger.info(f"Cached result for model {model_id} with key {cache_key}")
         
-        return result.dict()
+        return result_store.offload_result(self.request.id or uuid(), result.dict())
     except Exception as e:
+        # Retried or dead-lettered by custom_celery_task
         logger.error(f"Error executing model {model_id}: {e}")
-        raise self.retry(exc=e)
+        raise
+
+@custom_celery_task(bind=True, max_retries=3, retry_backoff=True)
+def run_model_batch(self, model_id: int, columns: dict):
+    """
+    Score columnar inputs with one validation pass and one predict_batch call.
+    """
+    if model_id not in model_registry:
+        return {"error": f"Model with id {model_id} not found"}
+
+    model = get_model(model_id)
+    if not isinstance(model, BatchModel):
+        raise ValueError(f"Model with id {model_id} does not support batch inference")
+    X = validate_columns(model, columns)
+
+    model_info = model_registry[model_id]
+    with PREDICTION_LATENCY.labels(model_info["name"], model_info["version"]).time():
+        predictions = model.predict_batch(X)
+    return result_store.offload_result(self.request.id or uuid(), {"predictions": predictions.tolist()})
+
+
+@shared_task(ignore_result=True)
+def shadow_score(primary_result: dict, model_id: int, input_data: dict):
+    """
+    Link callback of a routed run_model: score the same input with a shadow
+    version and record its latency and its difference to the primary result.
+    """
+    model_info = model_registry[model_id]
+    model = get_model(model_id)
+    with PREDICTION_LATENCY.labels(model_info["name"], model_info["version"]).time():
+        result = model.predict(model.Input(**input_data)).dict()
+
+    diff = compare_results(result_store.load_result(primary_result), result)
+    if diff is None:
+        outcome = "incomparable"
+    else:
+        SHADOW_RESULT_DIFF.labels(model_info["name"], model_info["version"]).observe(diff)
+        outcome = "match" if diff <= settings.SHADOW_DIFF_TOLERANCE else "mismatch"
+    SHADOW_COMPARISONS.labels(model_info["name"], model_info["version"], outcome).inc()
+
+
+@shared_task(bind=True, ignore_result=True)
+def run_bulk_scoring(self, model_id: int, input_path: str):
+    """
+    Split an uploaded dataset into chunks and fan them out with a chord.
+    The job id is this task's id: chunk tasks publish PROGRESS meta under
+    it and the chord callback stores the final result under it too.
+    """
+    job_id = self.request.id
+    try:
+        if model_id not in model_registry:
+            raise ValueError(f"Model with id {model_id} not found")
+
+        model = get_model(model_id)
+        if not isinstance(model, BatchModel):
+            raise ValueError(f"Model with id {model_id} does not support batch inference")
+        columns = list(model.Input.model_fields)
+
+        X = bulk.read_table(input_path, columns)
+        if len(X) == 0:
+            raise ValueError(f"{pathlib.Path(input_path).name} has no rows to score")
+        chunk_paths = bulk.write_chunks(X, settings.BULK_SCORING_CHUNK_SIZE, bulk.job_dir(job_id))
+    except Exception as e:
+        # ignore_result leaves the job id to the chord callback, record the failure here
+        self.backend.mark_as_failure(job_id, e)
+        raise
+    logger.info(f"Bulk job {job_id}: {len(X)} rows split into {len(chunk_paths)} chunks")
+
+    self.update_state(
+        state="PROGRESS",
+        meta={"chunks_done": 0, "chunks_total": len(chunk_paths), "rows_total": len(X)},
+    )
+    header = [
+        score_bulk_chunk.s(model_id, job_id, chunk_path, len(chunk_paths))
+        for chunk_path in chunk_paths
+    ]
+    callback = merge_bulk_results.s(job_id, input_path, columns).set(task_id=job_id)
+    chord(header)(callback)
+
+
+@custom_celery_task(max_retries=3, retry_backoff=True)
+def score_bulk_chunk(model_id: int, job_id: str, chunk_path: str, chunks_total: int):
+    import numpy as np
+
+    model = get_model(model_id)
+    predictions = model.predict_batch(np.load(chunk_path))
+    prediction_path = chunk_path.replace(".npy", ".pred.npy")
+    np.save(prediction_path, predictions)
+
+    chunks_done = bulk.mark_chunk_done(job_id)
+    bulk.publish_progress(job_id, {"chunks_done": chunks_done, "chunks_total": chunks_total})
+    return prediction_path
+
+
+@shared_task
+def merge_bulk_results(prediction_paths: list, job_id: str, input_path: str, columns: list):
+    import numpy as np
+
+    predictions = np.concatenate([np.load(path) for path in prediction_paths])
+    chunks = [np.load(path.replace(".pred.npy", ".npy")) for path in prediction_paths]
+    X = np.concatenate(chunks)
+
+    directory = bulk.job_dir(job_id)
+    output_path = directory / f"result{pathlib.Path(input_path).suffix}"
+    bulk.write_table(output_path, columns, X, predictions)
+
+    for path in prediction_paths:
+        pathlib.Path(path).unlink(missing_ok=True)
+        pathlib.Path(path.replace(".pred.npy", ".npy")).unlink(missing_ok=True)
+
+    logger.info(f"Bulk job {job_id} completed, results written to {output_path}")
+    return {"output_path": str(output_path), "rows_total": len(predictions)}
+
 
 # @shared_task
 # def run_model(model_id: int):
@@ -101,15 +239,25 @@ def run_model(self, model_id: int, input_data: dict):
 #     asyncio.run(update_task())
   
     
-@task_success.connect(sender=run_model)
-def task_success_handler(sender, result, **kwargs):
-    task_id = sender.request.id
-    task_result = AsyncResult(task_id)
-    time_completed = task_result.date_done
+def run_in_session(crud_func, *args):
+    """
+    Run an async crud function with a fresh session from a synchronous
+    Celery signal handler. With WORKER_EVENT_LOOP the coroutine goes to the
+    worker's persistent loop without blocking the task; calls for the same
+    task id keep their order.
+    """
+    if settings.WORKER_EVENT_LOOP:
+        async def submitted():
+            async with worker_loop.session_maker() as session:
+                await crud_func(session, *args)
+
+        future = worker_loop.submit(submitted(), key=args[0] if args else None)
+        future.add_done_callback(_log_hook_failure)
+        return future
 
     async def update_task():
         async for session in get_async_session():
-            await update_service_call_time_completed(session, task_id, time_completed)
+            await crud_func(session, *args)
     
     try:
         loop = asyncio.get_event_loop()
@@ -122,4 +270,130 @@ def task_success_handler(sender, result, **kwargs):
         loop.create_task(update_task())
     else:
         # Otherwise, run the coroutine
-        loop.run_until_complete(update_task())
\ No newline at end of file
+        loop.run_until_complete(update_task())
+
+
+def _log_hook_failure(future):
+    if future.exception() is not None:
+        logger.error(f"Worker hook failed: {future.exception()!r}")
+
+
+# Pools whose processes send worker_process_init and worker_process_shutdown,
+# others run tasks in the worker's own process and only send worker_init and
+# worker_shutdown
+PROCESS_INIT_POOLS = ("prefork", "solo")
+PROCESS_SHUTDOWN_POOLS = ("prefork",)
+
+
+def _pool_name(worker) -> str:
+    return get_implementation(worker.pool_cls).__module__.rsplit(".", 1)[-1]
+
+
+@worker_process_shutdown.connect
+def stop_worker_loop(**kwargs):
+    worker_loop.stop()
+
+
+@worker_process_init.connect
+def warmup_worker_models(**kwargs):
+    # Reloads announced before this process started, applied before anything is built
+    try:
+        apply_active_reloads()
+    except redis.RedisError as e:
+        logger.warning(f"Could not read the active model reloads: {e}")
+    if settings.MODEL_WARMUP:
+        logger.info("Warming up registered models")
+        warmup_models()
+
+
+@worker_process_init.connect
+def listen_for_model_reloads(**kwargs):
+    # One subscriber per child process, each holds its own model instances
+    start_reload_listener()
+
+
+@worker_init.connect
+def init_worker_without_children(sender=None, **kwargs):
+    if _pool_name(sender) not in PROCESS_INIT_POOLS:
+        warmup_worker_models()
+        listen_for_model_reloads()
+
+
+@worker_shutdown.connect
+def shutdown_worker_without_children(sender=None, **kwargs):
+    if _pool_name(sender) not in PROCESS_SHUTDOWN_POOLS:
+        stop_worker_loop()
+
+
+def _is_run_model(sender) -> bool:
+    # Connecting with sender=run_model would bind the tasks to the Celery app
+    # at import time, before create_celery() applied the task_* settings
+    return getattr(sender, "name", None) in (run_model.name, run_model_batch.name)
+
+
+@task_prerun.connect
+def task_prerun_handler(sender=None, task_id=None, **kwargs):
+    if _is_run_model(sender):
+        run_in_session(mark_service_call_started, task_id, datetime.now(timezone.utc))
+
+
+@task_postrun.connect
+def task_postrun_handler(sender=None, task_id=None, state=None, **kwargs):
+    # Retries and failures also run postrun, only a SUCCESS completes the call
+    if _is_run_model(sender) and state == "SUCCESS":
+        run_in_session(update_service_call_time_completed, task_id, datetime.now(timezone.utc))
+
+
+@task_postrun.connect
+def record_circuit_outcome(sender=None, args=None, kwargs=None, state=None, retval=None, **extra):
+    # Retries are not outcomes; the non-retryable errors come from bad inputs
+    # and say nothing about the model
+    if not _is_run_model(sender) or state not in ("SUCCESS", "FAILURE"):
+        return
+    if isinstance(retval, custom_celery_task.EXCEPTION_BLOCK_LIST):
+        return
+    model_id = args[0] if args else (kwargs or {}).get("model_id")
+    try:
+        if state == "SUCCESS":
+            circuit_breaker.record_success(model_id)
+        else:
+            circuit_breaker.record_failure(model_id)
+    except redis.RedisError as e:
+        logger.warning(f"Could not record circuit outcome of model {model_id}: {e}")
+
+
+@task_postrun.connect
+def count_completed_task(task=None, **kwargs):
+    # Every task drains its queue, not only predictions
+    delivery_info = getattr(task.request, "delivery_info", None) or {}
+    admission.record_completed(delivery_info.get("routing_key"))
+
+
+@task_revoked.connect
+def task_revoked_handler(sender=None, request=None, expired=False, **kwargs):
+    # Workers check `expires` before running a task, an expired prediction never builds its model
+    if _is_run_model(sender) and expired:
+        run_in_session(crud.mark_service_call_expired, request.id, datetime.now(timezone.utc))
+
+
+@task_failure.connect
+def task_failure_handler(sender=None, task_id=None, **kwargs):
+    if _is_run_model(sender):
+        run_in_session(mark_service_call_failed, task_id, datetime.now(timezone.utc))
+
+
+@shared_task(ignore_result=True)
+def refresh_latency_stats():
+    run_in_session(crud.refresh_latency_stats)
+
+
+@shared_task(ignore_result=True)
+def flush_user_access_usage():
+    run_in_session(usage.flush)
+
+
+@shared_task(ignore_result=True)
+def collect_result_garbage():
+    # Blobs outlive their reference once the task meta expired
+    deleted = result_store.collect_garbage(settings.CELERY_RESULT_EXPIRES)
+    logger.info(f"Deleted {deleted} expired result blobs")
@@ -0,0 +1,137 @@
+"""
+Deferred UserAccess usage counting.
+
+Every granted prediction used to increment `user_access.api_calls` and set
+`last_accessed` on the user's row, so concurrent requests of one user
+serialized on that row lock. Calls are now counted in Redis hashes keyed by
+"{user_id}:{model_id}" and the flush_user_access_usage beat task adds them
+to the rows every USAGE_FLUSH_INTERVAL seconds, which writes each row,
+`last_accessed` included, at most once per interval. Requests count on
+the asyncio client, the flush runs in a worker on the blocking one.
+
+`api_calls` is a usage statistic; quotas count service calls and are not
+affected by the delay. Refunded calls are uncounted the same way.
+"""
+import logging
+from datetime import datetime, timezone
+from uuid import UUID
+
+import redis
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from project import redis_utils
+from project.inference.models import UserAccess
+
+logger = logging.getLogger(__name__)
+
+CALLS_KEY = "usage:api_calls"
+LAST_ACCESSED_KEY = "usage:last_accessed"
+
+
+async def _count(user_id: UUID, model_id: int, calls: int) -> bool:
+    # On the request path, so on the asyncio client
+    field = f"{user_id}:{model_id}"
+    try:
+        pipe = redis_utils.async_redis_client.pipeline(transaction=False)
+        pipe.hincrby(CALLS_KEY, field, calls)
+        if calls > 0:
+            pipe.hset(LAST_ACCESSED_KEY, field, datetime.now(timezone.utc).timestamp())
+        await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not count {calls} calls of user {user_id} to model {model_id} in Redis: {e}")
+        return False
+    return True
+
+
+async def record_call(user_id: UUID, model_id: int) -> bool:
+    """
+    Count a call, False when Redis is unavailable and the caller should
+    update the row itself.
+    """
+    return await _count(user_id, model_id, 1)
+
+
+async def refund_call(user_id: UUID, model_id: int) -> bool:
+    """
+    Uncount a call, pending or already flushed. False when Redis is
+    unavailable and the caller should update the row itself.
+    """
+    return await _count(user_id, model_id, -1)
+
+
+# KEYS: the calls and last accessed hashes. ARGV: field, flushed count and
+# flushed timestamp triples. Removes what was flushed and keeps what was
+# counted since, dropping the fields left with nothing pending.
+SETTLE_SCRIPT = """
+for i = 1, #ARGV, 3 do
+    local field = ARGV[i]
+    if redis.call('HINCRBY', KEYS[1], field, -tonumber(ARGV[i + 1])) == 0 then
+        redis.call('HDEL', KEYS[1], field)
+    end
+    if redis.call('HGET', KEYS[2], field) == ARGV[i + 2] then
+        redis.call('HDEL', KEYS[2], field)
+    end
+end
+"""
+
+_settle_script = redis_utils.redis_client.register_script(SETTLE_SCRIPT)
+
+
+def _read_pending() -> tuple[dict, dict]:
+    pipe = redis_utils.redis_client.pipeline()
+    pipe.hgetall(CALLS_KEY)
+    pipe.hgetall(LAST_ACCESSED_KEY)
+    calls, last_accessed = pipe.execute()
+    return calls, last_accessed
+
+
+def _settle(calls: dict, last_accessed: dict):
+    args = []
+    for field, count in calls.items():
+        args += [field, count, last_accessed.get(field, b"")]
+    _settle_script(keys=[CALLS_KEY, LAST_ACCESSED_KEY], args=args, client=redis_utils.redis_client)
+
+
+async def flush(session: AsyncSession) -> int:
+    """
+    Add the pending calls to their UserAccess rows. Returns the number of
+    rows updated.
+
+    The counts stay in Redis until the rows are committed and are only then
+    subtracted, so a flush failing or dying midway loses no calls. One
+    dying between the commit and the subtraction counts them twice.
+    """
+    calls, last_accessed = _read_pending()
+    calls = {field: count for field, count in calls.items() if int(count)}
+    if not calls:
+        return 0
+
+    rows = []
+    for field, count in calls.items():
+        user_id, _, model_id = field.decode().partition(":")
+        timestamp = last_accessed.get(field)
+        rows.append({
+            "b_user_id": UUID(user_id),
+            "b_model_id": int(model_id),
+            "b_calls": int(count),
+            # Only refunds pending, the row keeps its last access
+            "b_last_accessed": datetime.fromtimestamp(float(timestamp), timezone.utc) if timestamp else None,
+        })
+    statement = (
+        update(UserAccess.__table__)
+        .where(
+            UserAccess.user_id == bindparam("b_user_id"),
+            UserAccess.model_id == bindparam("b_model_id"),
+        )
+        .values(
+            api_calls=UserAccess.api_calls + bindparam("b_calls"),
+            last_accessed=func.coalesce(
+                bindparam("b_last_accessed", type_=UserAccess.last_accessed.type), UserAccess.last_accessed
+            ),
+        )
+    )
+    await session.execute(statement, rows)
+    await session.commit()
+    _settle(calls, last_accessed)
+    return len(rows)
@@ -1,13 +1,33 @@
+import asyncio
+import itertools
+import time
+import redis
+from datetime import datetime
 from celery.result import AsyncResult
-from fastapi import Depends, FastAPI, File, HTTPException, UploadFile
-from fastapi.responses import JSONResponse
+from celery.states import READY_STATES
+from celery.utils import uuid
+from fastapi import Depends, FastAPI, File, HTTPException, Request, UploadFile
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from uuid import UUID
+from starlette.concurrency import run_in_threadpool
+from uuid import UUID, uuid4
 
+from project import dead_letter
+from project.celery_utils import enqueue_task
+from project.config import settings
 from project.database import get_async_session
 from project.fu_core.users import current_superuser, current_active_user, models
-from project.inference import crud, inference_router, schemas, tasks
-from project.inference.model_registry import model_registry
+from project.inference import bulk, cancellation, circuit_breaker, crud, inference_router, policies, result_store, schemas, task_meta, tasks
+from project.inference.idempotency import IdempotentRequest, idempotency_guard
+from project.inference.model_registry import check_loader, get_input_model, model_registry
+from project.inference.admission import enforce_admission
+from project.inference.circuit_breaker import enforce_circuit
+from project.inference.ml_models.protocol import column_arrays
+from project.inference.model_reload import publish_model_reload
+from project.inference.rate_limit import enforce_rate_limit
+from project.inference.registry_service import registry_service
+from project.inference.routing import choose_route
+from project.metrics import observe_auth_phase, observe_phase
 
 import logging
 logger = logging.getLogger(__name__)
@@ -17,6 +37,17 @@ async def health_check():
     return JSONResponse({"status": "ok"})
 
 
+def _replayed(task_id: str) -> JSONResponse:
+    return JSONResponse({"task_id": task_id}, headers={"Idempotent-Replayed": "true"})
+
+
+def _prediction_deadline(request: Request, policy) -> datetime:
+    try:
+        return policies.request_deadline(policy, request.headers.get(settings.REQUEST_TIMEOUT_HEADER))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @inference_router.get("/predict/get_info/{model_id}")
 async def get_model_info(
     model_id: int,
@@ -32,66 +63,234 @@ async def get_model_info(
 
 
 
-@inference_router.get("/predict/{model_id}")
+@inference_router.get("/predict/{model_id}", dependencies=[Depends(enforce_rate_limit), Depends(enforce_circuit), Depends(enforce_admission)])
 async def predict(
     model_id: int,
+    request: Request,
     current_user: models.User = Depends(current_active_user),
-    session: AsyncSession = Depends(get_async_session)
+    session: AsyncSession = Depends(get_async_session),
+    idempotent: IdempotentRequest | None = Depends(idempotency_guard)
 ):
+    observe_auth_phase(request, "predict")
     user_id: UUID = current_user.id
     
-    if model_id not in model_registry:
+    if await registry_service.get(session, model_id) is None:
         raise HTTPException(status_code=404, detail=f"Model with id {model_id} not found")
+
+    if idempotent and (original_task_id := await idempotent.claim()):
+        return _replayed(original_task_id)
+
+    policy = await policies.get_user_policy(session, user_id, model_id)
+    lane = policies.service_lane(policy)
+    expires = _prediction_deadline(request, policy)
     
      # Check if the user has access to the model and update their access record
-    has_access, message = await crud.check_user_access_and_update(
-        session, user_id, model_id
-    )
+    with observe_phase("predict", "access_check"):
+        has_access, message = await crud.check_user_access_and_update(
+            session, user_id, model_id
+        )
     if not has_access:
         raise HTTPException(status_code=403, detail=message)
     
-    # Create a service call record
-    service_call = await crud.create_service_call(session, model_id, user_id)
-    
-    task = tasks.run_model.delay(model_id)
-    service_call.celery_task_id = task.task_id
-    await session.commit()
+    # Create the service call with its task id so lifecycle signals always find it
+    task_id = uuid()
+    with observe_phase("predict", "service_call_insert"):
+        await crud.create_service_call(session, model_id, user_id, celery_task_id=task_id)
     
+    with observe_phase("predict", "enqueue"):
+        task = await enqueue_task(tasks.run_model, (model_id,), task_id=task_id, expires=expires, **lane)
     
+    if idempotent:
+        await idempotent.complete(task.task_id)
     return JSONResponse({"task_id": task.task_id})
 
 
+async def _available_candidates(model_id: int) -> list:
+    """
+    Canary and shadow versions of the model. Circuits are checked on the
+    requested model only, and outcomes recorded under the served one, so a
+    failing canary gives its traffic share back to the primary here.
+    """
+    candidates = registry_service.candidates(model_id)
+    try:
+        failing = await circuit_breaker.open_circuits([candidate["id"] for candidate in candidates])
+    except redis.RedisError as e:
+        logger.warning(f"Circuit breaker unavailable, routing to all candidates: {e}")
+        return candidates
+    return [candidate for candidate in candidates if candidate["id"] not in failing]
+
+
 from project.inference.ml_models.schemas import TemperatureModelInput
 
-@inference_router.post("/predict-temp/{model_id}")
+@inference_router.post("/predict-temp/{model_id}", dependencies=[Depends(enforce_rate_limit), Depends(enforce_circuit), Depends(enforce_admission)])
 async def predict_temperature(
     model_id: int,
     input_data: TemperatureModelInput,
+    request: Request,
     current_user: models.User = Depends(current_active_user),
-    session: AsyncSession = Depends(get_async_session)
+    session: AsyncSession = Depends(get_async_session),
+    idempotent: IdempotentRequest | None = Depends(idempotency_guard)
 ):
+    observe_auth_phase(request, "predict_temperature")
     user_id: UUID = current_user.id
     
-    if model_id not in model_registry:
+    if await registry_service.get(session, model_id) is None:
         raise HTTPException(status_code=404, detail=f"Model with id {model_id} not found")
+
+    if idempotent and (original_task_id := await idempotent.claim()):
+        return _replayed(original_task_id)
+
+    policy = await policies.get_user_policy(session, user_id, model_id)
+    lane = policies.service_lane(policy)
+    expires = _prediction_deadline(request, policy)
     
     # Check if the user has access to the model and update their access record
-    has_access, message = await crud.check_user_access_and_update(
-        session, user_id, model_id
-    )
+    with observe_phase("predict_temperature", "access_check"):
+        has_access, message = await crud.check_user_access_and_update(
+            session, user_id, model_id
+        )
     if not has_access:
         raise HTTPException(status_code=403, detail=message)
     
-    # Create a service call record
-    service_call = await crud.create_service_call(session, model_id, user_id)
+    served_model_id, shadow_model_ids = choose_route(model_id, await _available_candidates(model_id))
     
-    task = tasks.run_model.delay(model_id, input_data.dict())
-    service_call.celery_task_id = task.task_id
-    await session.commit()
+    # Create the service call with its task id so lifecycle signals always find it
+    task_id = uuid()
+    with observe_phase("predict_temperature", "service_call_insert"):
+        await crud.create_service_call(
+            session, model_id, user_id, celery_task_id=task_id, served_model_id=served_model_id
+        )
     
+    # Shadow versions score the input once the served model answered
+    shadows = [
+        tasks.shadow_score.s(shadow_model_id, input_data.dict()).set(**settings.SHADOW_LANE)
+        for shadow_model_id in shadow_model_ids
+    ]
+    with observe_phase("predict_temperature", "enqueue"):
+        task = await enqueue_task(
+            tasks.run_model, (served_model_id, input_data.dict()), task_id=task_id, link=shadows or None,
+            expires=expires, **lane
+        )
+    
+    if idempotent:
+        await idempotent.complete(task.task_id)
     return JSONResponse({"task_id": task.task_id})
 
 
+@inference_router.post("/predict-batch/{model_id}", dependencies=[Depends(enforce_rate_limit), Depends(enforce_circuit), Depends(enforce_admission)])
+async def predict_batch(
+    model_id: int,
+    batch: schemas.BatchPredictRequest,
+    request: Request,
+    current_user: models.User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+    idempotent: IdempotentRequest | None = Depends(idempotency_guard)
+):
+    observe_auth_phase(request, "predict_batch")
+    user_id: UUID = current_user.id
+
+    if await registry_service.get(session, model_id) is None:
+        raise HTTPException(status_code=404, detail=f"Model with id {model_id} not found")
+
+    try:
+        # Rejected before the quota is charged and a ServiceCall recorded
+        column_arrays(_batch_input_model(model_id), batch.columns)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if idempotent and (original_task_id := await idempotent.claim()):
+        return _replayed(original_task_id)
+
+    policy = await policies.get_user_policy(session, user_id, model_id)
+    lane = policies.service_lane(policy)
+    expires = _prediction_deadline(request, policy)
+
+    with observe_phase("predict_batch", "access_check"):
+        has_access, message = await crud.check_user_access_and_update(
+            session, user_id, model_id
+        )
+    if not has_access:
+        raise HTTPException(status_code=403, detail=message)
+
+
+    task_id = uuid()
+    with observe_phase("predict_batch", "service_call_insert"):
+        await crud.create_service_call(session, model_id, user_id, celery_task_id=task_id)
+
+    with observe_phase("predict_batch", "enqueue"):
+        task = await enqueue_task(
+            tasks.run_model_batch, (model_id, batch.columns), task_id=task_id, expires=expires, **lane
+        )
+
+    if idempotent:
+        await idempotent.complete(task.task_id)
+    return JSONResponse({"task_id": task.task_id})
+
+
+def _batch_input_model(model_id: int):
+    input_model = get_input_model(model_id)
+    if not hasattr(input_model, "model_fields"):
+        raise ValueError(f"Model with id {model_id} does not support batch inference")
+    return input_model
+
+
+def _input_columns(model_id: int) -> list:
+    return list(_batch_input_model(model_id).model_fields)
+
+
+@inference_router.post("/bulk/{model_id}", dependencies=[Depends(enforce_rate_limit), Depends(enforce_circuit), Depends(enforce_admission)])
+async def bulk_predict(
+    model_id: int,
+    file: UploadFile = File(...),
+    current_user: models.User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    user_id: UUID = current_user.id
+
+    if await registry_service.get(session, model_id) is None:
+        raise HTTPException(status_code=404, detail=f"Model with id {model_id} not found")
+
+    job_id = str(uuid4())
+    try:
+        input_path = await run_in_threadpool(bulk.save_upload, job_id, file.filename, file.file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        # Rejected before the quota is charged
+        await run_in_threadpool(bulk.check_columns, input_path, _input_columns(model_id))
+        has_access, message = await crud.check_user_access_and_update(
+            session, user_id, model_id
+        )
+        if not has_access:
+            raise HTTPException(status_code=403, detail=message)
+    except ValueError as e:
+        bulk.discard_job(job_id)
+        raise HTTPException(status_code=422, detail=str(e))
+    except HTTPException:
+        bulk.discard_job(job_id)
+        raise
+
+    await crud.create_service_call(session, model_id, user_id, celery_task_id=job_id)
+    await enqueue_task(tasks.run_bulk_scoring, (model_id, str(input_path)), task_id=job_id)
+
+    return JSONResponse({"task_id": job_id})
+
+
+@inference_router.get("/bulk/{task_id}/result")
+async def bulk_result(
+    task_id: str,
+    current_user: models.User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    await _get_owned_service_call(session, task_id, current_user)
+    task = AsyncResult(task_id)
+    state, result = await run_in_threadpool(lambda: (task.state, task.result))
+    if state != 'SUCCESS':
+        raise HTTPException(status_code=409, detail=f"Bulk job is in state {state}")
+    return FileResponse(result["output_path"])
+
+
 @inference_router.get("/task_status/{task_id}")
 def task_status(task_id: str):
     task = AsyncResult(task_id)
@@ -99,11 +298,137 @@ def task_status(task_id: str):
     if state == 'FAILURE':
         error = str(task.result)
         response = {'state': state, 'error': error}
+    elif result_store.is_reference(task.result):
+        # Stream the stored result into the usual response shape
+        key = task.result[result_store.RESULT_REF_KEY]["key"]
+        body = result_store.get_blob_store().iter_range(key)
+        return StreamingResponse(
+            itertools.chain([b'{"state": "SUCCESS", "result": '], body, [b'}']),
+            media_type="application/json",
+        )
     else:
         response = {'state': state, 'result': task.result}
     return JSONResponse(response)
 
 
+@inference_router.post("/task_status")
+async def task_statuses(payload: schemas.TaskStatusRequest):
+    """
+    Status of many tasks keyed by task id, read in one backend round trip.
+    """
+    return JSONResponse(await task_meta.get_statuses(payload.task_ids))
+
+
+async def _get_owned_service_call(session: AsyncSession, task_id: str, user: models.User):
+    service_call = await crud.get_service_call_by_task_id(session, task_id)
+    if service_call is None or (service_call.user_id != user.id and not user.is_superuser):
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    return service_call
+
+
+@inference_router.delete("/tasks/{task_id}")
+async def cancel_task(
+    task_id: str,
+    current_user: models.User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    service_call = await _get_owned_service_call(session, task_id, current_user)
+    if crud.is_finished(service_call):
+        raise HTTPException(status_code=409, detail=f"Task {task_id} already finished")
+    return JSONResponse(await cancellation.cancel_prediction(session, service_call))
+
+
+@inference_router.get("/tasks/{task_id}/wait")
+async def wait_for_task(
+    task_id: str,
+    request: Request,
+    timeout: float = 30,
+    cancel_on_disconnect: bool = True,
+    current_user: models.User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Long-poll until the task finishes or `timeout` seconds passed. A client
+    that disconnects meanwhile no longer wants the result, so the task is
+    cancelled unless `cancel_on_disconnect` is false.
+    """
+    service_call = await _get_owned_service_call(session, task_id, current_user)
+    deadline = time.monotonic() + min(timeout, settings.TASK_WAIT_MAX_TIMEOUT)
+    while True:
+        state = await run_in_threadpool(lambda: AsyncResult(task_id).state)
+        if state in READY_STATES:
+            return await run_in_threadpool(task_status, task_id)
+        if time.monotonic() >= deadline:
+            return JSONResponse({"state": state})
+        if await request.is_disconnected():
+            await session.refresh(service_call)
+            if cancel_on_disconnect and not crud.is_finished(service_call):
+                await cancellation.cancel_prediction(session, service_call, cancellation.DISCONNECT)
+            return JSONResponse({"state": state})
+        await asyncio.sleep(settings.TASK_WAIT_POLL_INTERVAL)
+
+
+@inference_router.get("/task_status/{task_id}/result")
+def task_result(task_id: str, request: Request):
+    """
+    Raw stored result of a task, supporting single byte range requests.
+    """
+    task = AsyncResult(task_id)
+    if not result_store.is_reference(task.result):
+        raise HTTPException(status_code=404, detail=f"No stored result for task {task_id}")
+
+    ref = task.result[result_store.RESULT_REF_KEY]
+    store = result_store.get_blob_store()
+    size = ref["size"]
+    headers = {"Accept-Ranges": "bytes"}
+    range_header = request.headers.get("range")
+    if range_header is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(store.iter_range(ref["key"]), media_type=ref["content_type"], headers=headers)
+
+    try:
+        start, end = result_store.parse_range(range_header, size)
+    except ValueError as e:
+        raise HTTPException(status_code=416, detail=str(e), headers={"Content-Range": f"bytes */{size}"})
+    headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    headers["Content-Length"] = str(end - start)
+    return StreamingResponse(
+        store.iter_range(ref["key"], start, end), status_code=206, media_type=ref["content_type"], headers=headers
+    )
+
+
+
+@inference_router.get("/latency/{model_id}")
+async def latency_stats(
+    model_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    superuser: models.User = Depends(current_superuser)
+):
+    stats = await crud.get_latency_stats(session, model_id, settings.LATENCY_STATS_WINDOWS)
+    return JSONResponse({"model_id": model_id, "windows": stats})
+
+
+@inference_router.post("/models/{model_id}/reload")
+def reload_model(
+    model_id: int,
+    reload: schemas.ModelReload = schemas.ModelReload(),
+    superuser: models.User = Depends(current_superuser)
+):
+    if model_id not in model_registry:
+        raise HTTPException(status_code=404, detail=f"Model with id {model_id} not found")
+    if reload.loader:
+        try:
+            check_loader(reload.loader)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    receivers = publish_model_reload(model_id, reload.loader, reload.version)
+    return JSONResponse({"model_id": model_id, "receivers": receivers})
+
+
+@inference_router.get("/dead-letters")
+def list_dead_letters(limit: int = 100, superuser: models.User = Depends(current_superuser)):
+    return JSONResponse(dead_letter.read(limit))
+
 
 @inference_router.post('/pair_user_model', response_model=schemas.UserAccessResponse)
 async def pair_user_model(
@@ -0,0 +1,303 @@
+import os
+import time
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from celery.signals import (
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    task_revoked,
+    worker_init,
+    worker_process_shutdown,
+)
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily, REGISTRY
+from starlette.requests import Request
+from starlette.responses import Response
+
+from project.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+PREDICT_PHASE_LATENCY = Histogram(
+    "predict_phase_duration_seconds",
+    "Time spent in each phase of the predict handlers",
+    ["endpoint", "phase"],
+    buckets=LATENCY_BUCKETS,
+)
+TASK_RUNTIME = Histogram(
+    "celery_task_runtime_seconds",
+    "Celery task execution time",
+    ["task", "model_id"],
+    buckets=LATENCY_BUCKETS,
+)
+TASK_QUEUE_WAIT = Histogram(
+    "celery_task_queue_wait_seconds",
+    "Time between task publish and task start",
+    ["task"],
+    buckets=LATENCY_BUCKETS,
+)
+TASK_PUBLISH_LATENCY = Histogram(
+    "celery_task_publish_duration_seconds",
+    "Time until the broker acknowledged a task publish",
+    ["task", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+PREDICTION_LATENCY = Histogram(
+    "model_prediction_duration_seconds",
+    "Model predict time by model version",
+    ["model", "version"],
+    buckets=LATENCY_BUCKETS,
+)
+SHADOW_COMPARISONS = Counter(
+    "shadow_comparisons_total",
+    "Shadow predictions compared with the primary result",
+    ["model", "version", "outcome"],
+)
+SHADOW_RESULT_DIFF = Histogram(
+    "shadow_result_abs_diff",
+    "Largest absolute difference between shadow and primary numeric outputs",
+    ["model", "version"],
+    buckets=(0.0001, 0.001, 0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 50.0),
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total",
+    "Predict requests rejected by the per-user rate limiter",
+    ["model_id"],
+)
+QUEUE_BACKLOG = Gauge(
+    "celery_queue_backlog",
+    "Messages waiting in each Celery queue, as sampled by admission control",
+    ["queue"],
+    multiprocess_mode="max",
+)
+QUEUE_DRAIN_RATE = Gauge(
+    "celery_queue_drain_rate",
+    "Smoothed tasks completed per second for each Celery queue",
+    ["queue"],
+    multiprocess_mode="max",
+)
+ADMISSION_SHED = Counter(
+    "admission_shed_total",
+    "Predict requests shed because the projected queue wait exceeded the model SLO",
+    ["model_id", "queue"],
+)
+TASKS_EXPIRED = Counter(
+    "celery_tasks_expired_total",
+    "Tasks dropped unstarted because their deadline passed; times the mean "
+    "celery_task_runtime_seconds this is the work saved",
+    ["task"],
+)
+TASKS_COMPLETED_LATE = Counter(
+    "celery_tasks_completed_late_total",
+    "Tasks that finished after their deadline, their client has likely given up",
+    ["task"],
+)
+LATE_TASK_RUNTIME = Counter(
+    "celery_late_task_runtime_seconds_total",
+    "Run time spent on tasks that finished after their deadline",
+    ["task"],
+)
+TASKS_CANCELLED = Counter(
+    "celery_tasks_cancelled_total",
+    "Predictions revoked by their user or on client disconnect, by how far they got",
+    ["reason", "stage"],
+)
+CIRCUIT_OPENED = Counter(
+    "circuit_breaker_opened_total",
+    "Times a model's circuit opened after consecutive task failures",
+    ["model_id"],
+)
+CIRCUIT_REJECTIONS = Counter(
+    "circuit_breaker_rejections_total",
+    "Predict requests fast-failed because the model's circuit is open",
+    ["model_id"],
+)
+DEAD_LETTERS = Counter(
+    "celery_dead_letters_total",
+    "Tasks moved to the dead-letter queue",
+    ["task"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Redis cache lookups by outcome",
+    ["result"],
+)
+
+_task_start_times: dict = {}
+
+
+#================================================================#
+######################    WEB APPLICATION    #####################
+
+
+class DatabasePoolCollector:
+    """
+    Expose the SQLAlchemy connection pool state at scrape time.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def collect(self):
+        pool = self.engine.sync_engine.pool
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            stat = getattr(pool, name, None)
+            if stat is None:
+                continue
+            gauge = GaugeMetricFamily(f"db_pool_{name}", f"SQLAlchemy pool {name}")
+            gauge.add_metric([], stat())
+            yield gauge
+
+
+def register_db_pool_collector(engine):
+    try:
+        REGISTRY.register(DatabasePoolCollector(engine))
+    except ValueError:
+        # Already registered by a previous create_app() call in this process
+        pass
+
+
+async def metrics_middleware(request: Request, call_next):
+    request.state.received_at = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        REQUEST_LATENCY.labels(
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status,
+        ).observe(time.perf_counter() - request.state.received_at)
+
+
+def observe_auth_phase(request: Request, endpoint: str):
+    """
+    Dependencies (authentication, session) are resolved before the handler
+    body runs, so the auth phase is measured from request receipt.
+    """
+    received_at = getattr(request.state, "received_at", None)
+    if received_at is not None:
+        PREDICT_PHASE_LATENCY.labels(endpoint=endpoint, phase="auth").observe(
+            time.perf_counter() - received_at
+        )
+
+
+@contextmanager
+def observe_phase(endpoint: str, phase: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PREDICT_PHASE_LATENCY.labels(endpoint=endpoint, phase=phase).observe(
+            time.perf_counter() - start
+        )
+
+
+def _get_registry():
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_endpoint(request: Request) -> Response:
+    return Response(generate_latest(_get_registry()), media_type=CONTENT_TYPE_LATEST)
+
+
+#================================================================#
+#########################    WORKERS    ##########################
+
+
+def _model_id_label(args, kwargs) -> str:
+    model_id = (kwargs or {}).get("model_id")
+    if model_id is None and args and isinstance(args[0], int):
+        model_id = args[0]
+    return "" if model_id is None else str(model_id)
+
+
+@before_task_publish.connect
+def stamp_enqueue_time(headers=None, **kwargs):
+    if headers is not None:
+        headers.setdefault("enqueued_at", time.time())
+
+
+@task_prerun.connect
+def record_task_start(task_id=None, task=None, **kwargs):
+    _task_start_times[task_id] = time.perf_counter()
+    enqueued_at = getattr(task.request, "enqueued_at", None)
+    if enqueued_at is not None:
+        TASK_QUEUE_WAIT.labels(task=task.name).observe(max(0.0, time.time() - enqueued_at))
+
+
+def _deadline_passed(task) -> bool:
+    expires = getattr(task.request, "expires", None)
+    if not expires:
+        return False
+    if isinstance(expires, str):
+        expires = datetime.fromisoformat(expires)
+    return datetime.now(timezone.utc) > expires
+
+
+@task_postrun.connect
+def record_task_runtime(task_id=None, task=None, args=None, kwargs=None, **extra):
+    start = _task_start_times.pop(task_id, None)
+    if start is not None:
+        runtime = time.perf_counter() - start
+        TASK_RUNTIME.labels(task=task.name, model_id=_model_id_label(args, kwargs)).observe(runtime)
+        if _deadline_passed(task):
+            TASKS_COMPLETED_LATE.labels(task=task.name).inc()
+            LATE_TASK_RUNTIME.labels(task=task.name).inc(runtime)
+
+
+@task_revoked.connect
+def record_task_expired(sender=None, expired=False, **kwargs):
+    # Sent by the worker when it discards a task whose expires passed
+    if expired:
+        TASKS_EXPIRED.labels(task=getattr(sender, "name", "unknown")).inc()
+
+
+@worker_init.connect
+def start_worker_exporter(**kwargs):
+    """
+    Serve worker metrics over HTTP. With prefork pools set
+    PROMETHEUS_MULTIPROC_DIR so child processes share their samples.
+    Several workers on one host need their own METRICS_WORKER_PORT, a
+    worker whose port is taken runs without an exporter.
+    """
+    registry = _get_registry()
+    try:
+        start_http_server(settings.METRICS_WORKER_PORT, registry=registry)
+    except OSError as e:
+        logger.error(f"Worker metrics exporter could not listen on port {settings.METRICS_WORKER_PORT}: {e}")
+        return
+    logger.info(f"Worker metrics exporter listening on port {settings.METRICS_WORKER_PORT}")
+
+
+@worker_process_shutdown.connect
+def mark_worker_process_dead(pid=None, **kwargs):
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid or os.getpid())
@@ -1,15 +1,21 @@
 import redis
+import redis.asyncio
 from project.config import settings
+from project.metrics import CACHE_REQUESTS
 import json
 
 
 redis_client = redis.StrictRedis.from_url(settings.REDIS_URL)
+# For the request path of the web process, which must not block its event loop
+async_redis_client = redis.asyncio.StrictRedis.from_url(settings.REDIS_URL)
 
 
 def get_cache(key: str):
     cached_result = redis_client.get(key)
     if cached_result:
+        CACHE_REQUESTS.labels(result="hit").inc()
         return json.loads(cached_result.decode('utf-8'))
+    CACHE_REQUESTS.labels(result="miss").inc()
     return None
 
 def set_cache(key: str, value: dict, expiration: int = settings.CACHE_EXPIRATION_TIME):
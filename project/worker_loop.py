@@ -0,0 +1,119 @@
+"""
+Persistent asyncio loop for the async code run by Celery worker hooks.
+
+Each worker process starts one loop on a daemon thread the first time a hook
+needs it, with its own async engine and asyncio Redis client so their
+connections stay bound to that loop. Hooks use `worker_loop.redis` rather
+than the module-level clients of redis_utils, which may be inherited
+through fork or bound to another loop. They submit coroutines to the loop
+instead of spinning an event loop per task, which also lets them run from
+the threads pool.
+"""
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Future, wait
+
+import redis.asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from project.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerEventLoop:
+
+    def __init__(self):
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.engine = None
+        self.session_maker = None
+        self.redis: redis.asyncio.StrictRedis | None = None
+        self._pid: int | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        # Last future submitted per ordering key, see submit()
+        self._pending: dict = {}
+        # Every submitted future not done yet, awaited by stop()
+        self._in_flight: set = set()
+
+    @property
+    def running(self) -> bool:
+        # A loop thread inherited through fork does not run in the child
+        return self.loop is not None and self._pid == os.getpid()
+
+    def ensure_started(self):
+        with self._lock:
+            if self.running:
+                return
+            self.loop = asyncio.new_event_loop()
+            self.engine = create_async_engine(
+                settings.DATABASE_URL, connect_args=settings.DATABASE_CONNECT_DICT
+            )
+            self.session_maker = async_sessionmaker(self.engine, expire_on_commit=False)
+            self.redis = redis.asyncio.StrictRedis.from_url(settings.REDIS_URL)
+            self._pending = {}
+            self._in_flight = set()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self.loop.run_forever, name="worker-event-loop", daemon=True
+            )
+            self._thread.start()
+            logger.info(f"Worker event loop started in process {self._pid}")
+
+    def submit(self, coro, key=None) -> Future:
+        """
+        Schedule a coroutine on the loop from any thread. Coroutines sharing
+        a key run one after the other in submission order, others run
+        concurrently.
+        """
+        self.ensure_started()
+        with self._lock:
+            previous = self._pending.get(key) if key is not None else None
+            future = asyncio.run_coroutine_threadsafe(self._after(previous, coro), self.loop)
+            if key is not None:
+                self._pending[key] = future
+            self._in_flight.add(future)
+        # Outside the lock, the callback runs right away if the future is already done
+        future.add_done_callback(lambda done: self._release(key, done))
+        return future
+
+    @staticmethod
+    async def _after(previous: Future | None, coro):
+        if previous is not None:
+            # The outcome of the previous coroutine is its submitter's concern
+            await asyncio.wait([asyncio.wrap_future(previous)])
+        return await coro
+
+    def _release(self, key, future: Future):
+        with self._lock:
+            self._in_flight.discard(future)
+            if key is not None and self._pending.get(key) is future:
+                del self._pending[key]
+
+    async def _close_pools(self):
+        await self.engine.dispose()
+        await self.redis.aclose()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Let the submitted coroutines finish, for up to `timeout` seconds, so
+        a worker shutting down still records the outcomes of its last tasks,
+        then close the engine and Redis pools and stop the loop.
+        """
+        if not self.running:
+            return
+        with self._lock:
+            in_flight = list(self._in_flight)
+        _, not_done = wait(in_flight, timeout)
+        if not_done:
+            logger.warning(f"Stopping the worker event loop with {len(not_done)} hooks still running")
+        asyncio.run_coroutine_threadsafe(self._close_pools(), self.loop).result(timeout)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self.loop = None
+        logger.info(f"Worker event loop stopped in process {os.getpid()}")
+
+
+worker_loop = WorkerEventLoop()
@@ -176,6 +176,16 @@ function get-revision-postgres() {
     docker compose run web alembic revision --autogenerate 
 }
 
+function seed-db() {
+    # Seed reference data once per deploy instead of from every web process
+    python -m project.cli seed
+}
+
+function export-kernels() {
+    # Compile the linear models so serving processes skip fitting and sklearn
+    python -m project.cli export-kernels
+}
+
 function generate-servers-json() {
     # Function to generate servers.json from template
     try-load-dotenv || { echo "Failed to load environment variables"; return 1; }
@@ -205,6 +215,16 @@ function run-tests {
     pytest -vv -s -x -rs --cov --cov-report=html
 }
 
+function run-benchmarks {
+    # Usage: ./run.sh run-benchmarks [output.json] [extra benchmarks.run args]
+    python -m benchmarks.run --output "${1:-bench_output.json}" "${@:2}"
+}
+
+function compare-benchmarks {
+    # Usage: ./run.sh compare-benchmarks base.json head.json
+    python -m benchmarks.compare "$@"
+}
+
 
 #================================================================#
 ########################    UTILS    #############################
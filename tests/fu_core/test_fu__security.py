@@ -0,0 +1,85 @@
+import json
+import jwt
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+from project.fu_core import keys
+from project.fu_core.keys import SigningKeys, load_signing_keys, parse_keys
+from project.fu_core.security import KeyRotatingJWTStrategy
+
+
+@pytest.fixture
+def user_manager():
+    manager = MagicMock()
+    manager.parse_id.side_effect = lambda user_id: user_id
+    manager.get = AsyncMock(side_effect=lambda user_id: MagicMock(id=user_id))
+    return manager
+
+
+def test_parse_keys():
+    assert parse_keys("new:s3cret, old:older:with:colons") == {"new": "s3cret", "old": "older:with:colons"}
+    with pytest.raises(ValueError):
+        parse_keys("missing-secret")
+
+
+def test_load_signing_keys_from_file(tmp_path, monkeypatch, settings):
+    key_file = tmp_path / "jwt_keys.json"
+    key_file.write_text(json.dumps({"active": "b", "keys": {"a": "secret-a", "b": "secret-b"}}))
+    monkeypatch.setattr(settings, "JWT_KEY_FILE", str(key_file))
+    monkeypatch.setattr(settings, "JWT_SIGNING_KEYS", "ignored:key")
+
+    assert load_signing_keys() == SigningKeys("b", {"a": "secret-a", "b": "secret-b"})
+
+    monkeypatch.setattr(settings, "JWT_ACTIVE_KID", "c")
+    with pytest.raises(ValueError):
+        load_signing_keys()
+
+
+def test_load_signing_keys_defaults(monkeypatch, settings):
+    monkeypatch.setattr(settings, "JWT_SIGNING_KEYS", "a:secret-a,b:secret-b")
+    assert load_signing_keys().active_kid == "a"
+
+    monkeypatch.setattr(settings, "JWT_SIGNING_KEYS", "")
+    assert load_signing_keys() == SigningKeys(keys.DEFAULT_KID, {keys.DEFAULT_KID: settings.SECRET_KEY})
+
+
+def test_several_web_workers_require_a_configured_key(monkeypatch, settings):
+    monkeypatch.setattr(settings, "JWT_SIGNING_KEYS", "")
+    monkeypatch.setattr(settings, "SECRET_KEY_CONFIGURED", False)
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+    with pytest.raises(ValueError):
+        load_signing_keys()
+
+    monkeypatch.setattr(settings, "SECRET_KEY_CONFIGURED", True)
+    assert load_signing_keys().active_kid == keys.DEFAULT_KID
+
+
+@pytest.mark.asyncio
+async def test_tokens_verify_across_processes_and_rotation(user_manager):
+    user = MagicMock(id=str(uuid4()))
+    before = KeyRotatingJWTStrategy(SigningKeys("old", {"old": "secret-old"}), 3600)
+    # Another process that already knows the next key
+    during = KeyRotatingJWTStrategy(SigningKeys("old", {"old": "secret-old", "new": "secret-new"}), 3600)
+    after = KeyRotatingJWTStrategy(SigningKeys("new", {"old": "secret-old", "new": "secret-new"}), 3600)
+    retired = KeyRotatingJWTStrategy(SigningKeys("new", {"new": "secret-new"}), 3600)
+
+    old_token = await before.write_token(user)
+    new_token = await after.write_token(user)
+
+    assert jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert (await during.read_token(old_token, user_manager)).id == user.id
+    assert (await after.read_token(old_token, user_manager)).id == user.id
+    assert (await during.read_token(new_token, user_manager)).id == user.id
+    assert await retired.read_token(old_token, user_manager) is None
+    assert await before.read_token(new_token, user_manager) is None
+
+
+@pytest.mark.asyncio
+async def test_forged_and_malformed_tokens_are_rejected(user_manager):
+    strategy = KeyRotatingJWTStrategy(SigningKeys("a", {"a": "secret-a"}), 3600)
+    payload = {"sub": "user", "aud": strategy.token_audience}
+
+    assert await strategy.read_token("not a token", user_manager) is None
+    assert await strategy.read_token(jwt.encode(payload, "guess", headers={"kid": "a"}), user_manager) is None
+    # Tokens without a kid are checked against the active key
+    assert (await strategy.read_token(jwt.encode(payload, "secret-a"), user_manager)).id == "user"
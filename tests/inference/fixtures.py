@@ -19,15 +19,17 @@ class FakeModelOutput(BaseModel):
 
 @pytest.fixture()
 def mock_run_model(monkeypatch, mock_celery_task):
-    def mock_delay(model_id, input_data):
+    def mock_apply_async(args=(), kwargs=None, **options):
         return mock_celery_task
 
-    monkeypatch.setattr(views.tasks.run_model, "delay", mock_delay)
-    return mock_delay
+    # The views generate the task id before creating the service call
+    monkeypatch.setattr(views, "uuid", lambda: mock_celery_task.task_id)
+    monkeypatch.setattr(views.tasks.run_model, "apply_async", mock_apply_async)
+    return mock_apply_async
 
         
 @pytest.fixture
-async def setup_inference_objects(db_session):
+async def setup_inference_objects(db_session, monkeypatch):
     async with db_session() as session:
         # Set the session for all factories
         AccessPolicyFactory._meta.sqlalchemy_session = session
@@ -77,7 +79,8 @@ async def setup_inference_objects(db_session):
             "access_policy_id": model.access_policy_id,
             "func": lambda: MockModel()
         }
-        model_registry[model.id] = model_registry_entry
+        # Restored after the test, other tests load the real registry models
+        monkeypatch.setitem(model_registry, model.id, model_registry_entry)
 
         # Log the model ID and registry entry
         logger.info(f"Model ID: {model.id}")
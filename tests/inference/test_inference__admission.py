@@ -0,0 +1,97 @@
+import math
+import time
+import fakeredis
+import pytest
+from fakeredis import aioredis
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+from project.inference import admission, views
+from project.inference.admission import QueueMonitor, QueueState
+from project.inference.models import InferenceModel, ServiceCall
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    # Workers count completions on the blocking client, web processes sample on the asyncio one
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeStrictRedis(server=server)
+    async_client = aioredis.FakeRedis(server=server)
+    monkeypatch.setattr(admission, "get_broker_redis", lambda: client)
+    monkeypatch.setattr(admission, "get_async_broker_redis", lambda: async_client)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_sample_reads_backlog_and_drain_rate(broker, settings, monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_RATE_SMOOTHING", 1.0)
+    broker.rpush("default", *range(100))
+    broker.rpush("default\x06\x163", *range(20))
+    monitor = QueueMonitor()
+
+    await monitor.sample(admission.get_async_broker_redis(), now=10.0)
+    for _ in range(30):
+        admission.record_completed("default")
+    await monitor.sample(admission.get_async_broker_redis(), now=13.0)
+
+    state = monitor.queues["default"]
+    assert state.backlog == 120
+    assert state.drain_rate == pytest.approx(10.0)
+    assert state.projected_wait() == pytest.approx(12.0)
+    assert monitor.queues["high_priority"].backlog == 0
+
+
+@pytest.mark.asyncio
+async def test_refresh_samples_in_the_background(broker):
+    broker.rpush("default", *range(5))
+    monitor = QueueMonitor()
+
+    # The request is answered from the last sample, empty on the first one
+    assert monitor.refresh() == {}
+    assert monitor.refresh() == {}
+    await monitor._sampling
+
+    assert monitor.refresh()["default"].backlog == 5
+
+
+def test_projected_wait(settings, monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_MIN_BACKLOG", 50)
+    assert QueueState(backlog=10, drain_rate=0).projected_wait() == 0
+    assert QueueState(backlog=100, drain_rate=0).projected_wait() == math.inf
+    assert QueueState(backlog=100, drain_rate=20).projected_wait() == 5
+
+
+def test_record_completed_ignores_unknown_queues(broker):
+    admission.record_completed("celery")
+    admission.record_completed(None)
+    assert broker.keys("admission:*") == []
+
+
+@pytest.mark.asyncio
+async def test_predict_is_shed_over_the_model_slo(
+    client: TestClient,
+    db_session,
+    monkeypatch,
+    mock_run_model,
+    setup_inference_objects,
+):
+    objects = await setup_inference_objects
+    model_id = objects['model'].id
+    async with db_session() as session:
+        await session.execute(update(InferenceModel).where(InferenceModel.id == model_id).values(latency_slo=2.0))
+        await session.commit()
+    # Freshly sampled: 100 queued tasks drained at 10 per second
+    monitor = QueueMonitor(queues={"default": QueueState(backlog=100, drain_rate=10.0)}, sampled_at=time.monotonic())
+    monkeypatch.setattr(admission, "queue_monitor", monitor)
+    client.app.dependency_overrides[views.current_active_user] = lambda: objects['user']
+
+    response = client.get(f"/api/v1/inference/predict/{model_id}")
+    monitor.queues["default"].backlog = 10
+    admitted = client.get(f"/api/v1/inference/predict/{model_id}")
+    client.app.dependency_overrides.clear()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "8"
+    assert admitted.status_code == 200
+    async with db_session() as session:
+        service_calls = (await session.execute(select(ServiceCall))).scalars().all()
+    assert len(service_calls) == 1
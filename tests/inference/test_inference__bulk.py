@@ -0,0 +1,214 @@
+import pytest
+import io
+import numpy as np
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from uuid import uuid4
+from project.fu_core.users.models import User
+from project.inference import bulk, crud, views
+from project.inference.models import ServiceCall
+from project.inference.tasks import score_bulk_chunk, merge_bulk_results
+from project.inference.ml_models.tempertaure_predictor import TemperatureModel
+from project.inference.model_registry import model_registry
+from project.inference.tasks import run_bulk_scoring
+import logging
+logger = logging.getLogger(__name__)
+
+COLUMNS = ["latitude", "longitude", "month", "hour"]
+TEMPERATURE_LOADER = "project.inference.ml_models.tempertaure_predictor:TemperatureModel"
+
+
+@pytest.fixture
+def upload_dest(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk.settings, "UPLOAD_DEFAULT_DEST", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+async def bulk_objects(setup_inference_objects, monkeypatch):
+    objects = await setup_inference_objects
+    # Score with the temperature model under the fixture's model id and name
+    monkeypatch.setitem(
+        model_registry, objects['model'].id, {**objects['model_registry_entry'], "loader": TEMPERATURE_LOADER}
+    )
+    return objects
+
+
+@pytest.fixture
+def csv_bytes():
+    rows = ["hour,latitude,month,longitude"] + [f"{h},{h * 3},{h % 12 + 1},{-h}" for h in range(10)]
+    return ("\n".join(rows) + "\n").encode()
+
+
+def test_read_table_orders_columns(upload_dest, csv_bytes):
+    path = bulk.save_upload("job", "data.csv", io.BytesIO(csv_bytes))
+
+    X = bulk.read_table(path, COLUMNS)
+
+    assert X.shape == (10, 4)
+    assert X[2].tolist() == [6.0, -2.0, 3.0, 2.0]
+
+
+def test_save_upload_rejects_unknown_format(upload_dest):
+    with pytest.raises(ValueError):
+        bulk.save_upload("job", "data.xlsx", io.BytesIO(b""))
+
+
+def test_write_chunks(upload_dest):
+    X = np.arange(50, dtype=float).reshape(25, 2)
+
+    chunk_paths = bulk.write_chunks(X, 10, bulk.job_dir("job"))
+
+    assert len(chunk_paths) == 3
+    assert np.load(chunk_paths[-1]).shape == (5, 2)
+
+
+def test_predict_batch_matches_predict():
+    model = TemperatureModel()
+    X = np.array([[40, -74, 6, 14], [-10, 20, 1, 3]])
+
+    predictions = model.predict_batch(X)
+
+    single = model.predict(model.Input(latitude=40, longitude=-74, month=6, hour=14))
+    assert predictions.shape == (2,)
+    assert predictions[0] == pytest.approx(single.temperature)
+
+
+def test_score_and_merge_bulk_chunks(upload_dest):
+    X = np.array([[40, -74, 6, 14], [-10, 20, 1, 3], [0, 0, 12, 23]], dtype=float)
+    chunk_paths = bulk.write_chunks(X, 2, bulk.job_dir("job"))
+    input_path = bulk.job_dir("job") / "input.csv"
+
+    with patch.object(bulk, "redis_client") as mock_redis_client, \
+            patch.object(bulk, "publish_progress") as mock_publish_progress:
+        mock_redis_client.pipeline.return_value.execute.side_effect = [[1, True], [2, True]]
+        prediction_paths = [score_bulk_chunk(2, "job", path, len(chunk_paths)) for path in chunk_paths]
+
+        mock_publish_progress.assert_called_with("job", {"chunks_done": 2, "chunks_total": 2})
+
+    result = merge_bulk_results(prediction_paths, "job", str(input_path), COLUMNS)
+
+    assert result["rows_total"] == 3
+    written = np.loadtxt(result["output_path"], delimiter=",", skiprows=1)
+    assert written.shape == (3, 5)
+    assert written[:, -1] == pytest.approx(TemperatureModel().predict_batch(X))
+
+
+@pytest.mark.asyncio
+async def test_bulk_predict_success(
+    client: TestClient,
+    db_session,
+    monkeypatch,
+    bulk_objects,
+    upload_dest,
+    csv_bytes
+):
+    objects = await bulk_objects
+    client.app.dependency_overrides[views.current_active_user] = lambda: objects['user']
+
+    mock_apply_async = MagicMock()
+    monkeypatch.setattr(views.tasks.run_bulk_scoring, "apply_async", mock_apply_async)
+
+    response = client.post(
+        f"/api/v1/inference/bulk/{objects['model'].id}",
+        files={"file": ("data.csv", csv_bytes, "text/csv")},
+    )
+
+    assert response.status_code == 200
+    task_id = response.json()["task_id"]
+    mock_apply_async.assert_called_once()
+    assert mock_apply_async.call_args.kwargs["task_id"] == task_id
+    assert (upload_dest / "bulk" / task_id / "input.csv").exists()
+
+    async with db_session() as session:
+        result = await session.execute(
+            select(ServiceCall).where(ServiceCall.celery_task_id == task_id)
+        )
+        assert result.scalar_one_or_none() is not None
+
+    client.app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_bulk_predict_bad_format(
+    client: TestClient,
+    db_session,
+    setup_inference_objects,
+    upload_dest
+):
+    objects = await setup_inference_objects
+    client.app.dependency_overrides[views.current_active_user] = lambda: objects['user']
+
+    response = client.post(
+        f"/api/v1/inference/bulk/{objects['model'].id}",
+        files={"file": ("data.txt", b"foo", "text/plain")},
+    )
+
+    assert response.status_code == 400
+    client.app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_bulk_predict_missing_columns_are_rejected_before_the_quota(
+    client: TestClient,
+    bulk_objects,
+    monkeypatch,
+    upload_dest
+):
+    objects = await bulk_objects
+    client.app.dependency_overrides[views.current_active_user] = lambda: objects['user']
+    monkeypatch.setattr(views.crud, "check_user_access_and_update", MagicMock(side_effect=AssertionError))
+
+    response = client.post(
+        f"/api/v1/inference/bulk/{objects['model'].id}",
+        files={"file": ("data.csv", b"hour,latitude\n1,2\n", "text/csv")},
+    )
+    client.app.dependency_overrides.clear()
+
+    assert response.status_code == 422
+    assert "longitude" in response.json()["detail"]
+    assert list((upload_dest / "bulk").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_bulk_result_of_another_user(client: TestClient, db_session, setup_inference_objects):
+    objects = await setup_inference_objects
+    async with db_session() as session:
+        await crud.create_service_call(session, objects['model'].id, objects['user'].id, celery_task_id="foreign_job")
+    stranger = User(id=uuid4(), email="stranger@example.com", hashed_password="hashed_password")
+    client.app.dependency_overrides[views.current_active_user] = lambda: stranger
+
+    response = client.get("/api/v1/inference/bulk/foreign_job/result")
+    client.app.dependency_overrides.clear()
+
+    assert response.status_code == 404
+
+
+def test_invalid_bulk_job_is_marked_failed(upload_dest, monkeypatch):
+    mark_as_failure = MagicMock()
+    monkeypatch.setattr(run_bulk_scoring.backend, "mark_as_failure", mark_as_failure)
+
+    with pytest.raises(ValueError):
+        run_bulk_scoring(9999, str(upload_dest / "input.csv"))
+
+    assert "not found" in str(mark_as_failure.call_args.args[1])
+
+
+@pytest.mark.parametrize("content, error", [
+    # A header without rows would leave the chord without chunks
+    ("hour,latitude,month,longitude\n", ValueError),
+    ("hour,latitude,month,longitude\n14,40,six,-74\n", ValueError),
+    (None, OSError),
+])
+def test_unreadable_bulk_job_is_marked_failed(upload_dest, monkeypatch, content, error):
+    mark_as_failure = MagicMock()
+    monkeypatch.setattr(run_bulk_scoring.backend, "mark_as_failure", mark_as_failure)
+    input_path = upload_dest / "input.csv"
+    if content is not None:
+        input_path.write_text(content)
+
+    with pytest.raises(error):
+        run_bulk_scoring(2, str(input_path))
+
+    assert isinstance(mark_as_failure.call_args.args[1], error)
@@ -0,0 +1,177 @@
+import fakeredis
+import json
+import pytest
+from celery import current_app
+from fakeredis import aioredis
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from project.fu_core.users.models import User
+from project import redis_utils
+from project.inference import cancellation, crud, task_meta, usage, views
+from project.inference.models import ServiceCall, UserAccess
+
+
+@pytest.fixture
+def revoke(monkeypatch):
+    revoke = MagicMock()
+    monkeypatch.setattr(cancellation.current_app.control, "revoke", revoke)
+    return revoke
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeStrictRedis(server=server)
+    monkeypatch.setattr(redis_utils, "redis_client", client)
+    monkeypatch.setattr(redis_utils, "async_redis_client", aioredis.FakeRedis(server=server))
+    return client
+
+
+@pytest.fixture
+def result_redis(monkeypatch):
+    client = aioredis.FakeRedis()
+    monkeypatch.setattr(task_meta, "get_result_redis", lambda: client)
+    return client
+
+
+async def _service_call(db_session, objects, task_id: str, **values):
+    async with db_session() as session:
+        await crud.create_service_call(session, objects['model'].id, objects['user'].id, celery_task_id=task_id)
+        await session.execute(
+            update(UserAccess).where(UserAccess.user_id == objects['user'].id).values(api_calls=1)
+        )
+        if values:
+            await session.execute(update(ServiceCall).where(ServiceCall.celery_task_id == task_id).values(**values))
+        await session.commit()
+
+
+async def _reload(db_session, task_id: str):
+    async with db_session() as session:
+        service_call = await crud.get_service_call_by_task_id(session, task_id)
+        user_access = await crud.get_user_access(session, service_call.user_id, service_call.model_id)
+        return service_call, user_access
+
+
+@pytest.mark.asyncio
+async def test_cancel_queued_task_discards_and_refunds(
+    client: TestClient, db_session, fake_redis, revoke, result_redis, setup_inference_objects
+):
+    objects = await setup_inference_objects
+    await _service_call(db_session, objects, "queued_task")
+    client.app.dependency_overrides[views.current_active_user] = lambda: objects['user']
+
+    response = client.delete("/api/v1/inference/tasks/queued_task")
+    again = client.delete("/api/v1/inference/tasks/queued_task")
+    client.app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json() == {"task_id": "queued_task", "terminated": False, "refunded": True}
+    revoke.assert_called_once_with("queued_task", terminate=False, signal="SIGTERM")
+    # The refund is uncounted with the pending calls
+    async with db_session() as session:
+        await usage.flush(session)
+    service_call, user_access = await _reload(db_session, "queued_task")
+    assert service_call.time_cancelled is not None
+    assert service_call.quota_refunded is True
+    assert user_access.api_calls == 0
+    assert again.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_cancel_started_task_terminates_without_refund(client: TestClient, db_session, revoke, setup_inference_objects):
+    objects = await setup_inference_objects
+    await _service_call(db_session, objects, "started_task", time_started=datetime.now(timezone.utc))
+    client.app.dependency_overrides[views.current_active_user] = lambda: objects['user']
+
+    response = client.delete("/api/v1/inference/tasks/started_task")
+    client.app.dependency_overrides.clear()
+
+    assert response.json()["terminated"] is True
+    revoke.assert_called_once_with("started_task", terminate=True, signal="SIGTERM")
+    service_call, user_access = await _reload(db_session, "started_task")
+    assert service_call.quota_refunded is False
+    assert user_access.api_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cancel_task_reported_started_terminates_without_refund(db_session, revoke, result_redis, setup_inference_objects):
+    objects = await setup_inference_objects
+    # Running, but the worker did not record time_started yet
+    await _service_call(db_session, objects, "starting_task")
+    meta = {"status": "STARTED", "result": None, "traceback": None, "children": [], "task_id": "starting_task"}
+    await result_redis.set(current_app.backend.get_key_for_task("starting_task"), json.dumps(meta))
+
+    async with db_session() as session:
+        service_call = await crud.get_service_call_by_task_id(session, "starting_task")
+        response = await cancellation.cancel_prediction(session, service_call)
+
+    assert response == {"task_id": "starting_task", "terminated": True, "refunded": False}
+    revoke.assert_called_once_with("starting_task", terminate=True, signal="SIGTERM")
+    _, user_access = await _reload(db_session, "starting_task")
+    assert user_access.api_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_is_not_completed_by_its_task(db_session, setup_inference_objects):
+    objects = await setup_inference_objects
+    cancelled_at = datetime.now(timezone.utc)
+    await _service_call(db_session, objects, "cancelled_task", time_cancelled=cancelled_at)
+
+    async with db_session() as session:
+        await crud.update_service_call_time_completed(session, "cancelled_task", datetime.now(timezone.utc))
+        await crud.mark_service_call_failed(session, "cancelled_task", datetime.now(timezone.utc))
+
+    service_call, _ = await _reload(db_session, "cancelled_task")
+    assert service_call.time_cancelled is not None
+    assert service_call.time_completed is None
+    assert service_call.time_failed is None
+
+
+@pytest.mark.asyncio
+async def test_cancel_task_of_another_user(client: TestClient, db_session, revoke, setup_inference_objects):
+    objects = await setup_inference_objects
+    await _service_call(db_session, objects, "foreign_task")
+    stranger = User(id=uuid4(), email="stranger@example.com", hashed_password="hashed_password")
+    client.app.dependency_overrides[views.current_active_user] = lambda: stranger
+
+    response = client.delete("/api/v1/inference/tasks/foreign_task")
+    client.app.dependency_overrides.clear()
+
+    assert response.status_code == 404
+    revoke.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_refunded_calls_do_not_count_against_quota(db_session, setup_inference_objects):
+    objects = await setup_inference_objects
+    await _service_call(db_session, objects, "refunded_task", quota_refunded=True)
+    async with db_session() as session:
+        policy = await crud.get_access_policy(session, objects['access_policy'].id)
+        policy.daily_api_calls = 1
+        assert await crud.check_daily_limit(session, objects['user'].id, objects['model'].id, policy)
+
+
+@pytest.mark.asyncio
+async def test_wait_cancels_when_the_client_disconnects(db_session, monkeypatch, revoke, result_redis, setup_inference_objects):
+    objects = await setup_inference_objects
+    await _service_call(db_session, objects, "abandoned_task")
+    monkeypatch.setattr(views, "AsyncResult", lambda task_id: MagicMock(state="PENDING"))
+    request = MagicMock()
+
+    async def disconnected():
+        return True
+    request.is_disconnected = disconnected
+
+    async with db_session() as session:
+        response = await views.wait_for_task(
+            "abandoned_task", request, timeout=5, cancel_on_disconnect=True,
+            current_user=objects['user'], session=session
+        )
+
+    assert response.status_code == 200
+    revoke.assert_called_once()
+    service_call, _ = await _reload(db_session, "abandoned_task")
+    assert service_call.time_cancelled is not None
@@ -0,0 +1,145 @@
+import fakeredis
+import pytest
+from fakeredis import aioredis
+import redis
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock
+from pydantic import BaseModel, ValidationError
+from project import redis_utils
+from project.inference import circuit_breaker, policies, views
+from project.inference.tasks import record_circuit_outcome, run_model
+
+
+@pytest.fixture
+def fake_redis(monkeypatch, settings):
+    # Workers record outcomes on the blocking client, the endpoints read them on the asyncio one
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeStrictRedis(server=server)
+    monkeypatch.setattr(redis_utils, "redis_client", client)
+    monkeypatch.setattr(redis_utils, "async_redis_client", aioredis.FakeRedis(server=server))
+    monkeypatch.setattr(settings, "CIRCUIT_BREAKER_THRESHOLD", 3)
+    monkeypatch.setattr(settings, "CIRCUIT_BREAKER_COOLDOWN", 30)
+    policies.clear_policy_cache()
+    yield client
+    policies.clear_policy_cache()
+
+
+class Input(BaseModel):
+    value: float
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_consecutive_failures(fake_redis):
+    circuit_breaker.record_failure(1)
+    circuit_breaker.record_failure(1)
+    # A success resets the count
+    circuit_breaker.record_success(1)
+    circuit_breaker.record_failure(1)
+    circuit_breaker.record_failure(1)
+    assert await circuit_breaker.retry_after(1) is None
+
+    circuit_breaker.record_failure(1)
+
+    assert 0 < await circuit_breaker.retry_after(1) <= 30
+    # Circuits are per model
+    assert await circuit_breaker.retry_after(2) is None
+
+
+@pytest.mark.asyncio
+async def test_half_open_circuit_admits_a_single_trial(fake_redis):
+    for _ in range(3):
+        circuit_breaker.record_failure(1)
+    fake_redis.delete("circuit:1:open")  # The cooldown elapsed
+
+    assert await circuit_breaker.retry_after(1) is None
+    assert await circuit_breaker.retry_after(1) == 30
+
+    # A failed trial opens the circuit again, a successful one closes it
+    circuit_breaker.record_failure(1)
+    assert await circuit_breaker.retry_after(1) > 0
+    fake_redis.delete("circuit:1:open")
+    assert await circuit_breaker.retry_after(1) is None
+    circuit_breaker.record_success(1)
+    assert await circuit_breaker.retry_after(1) is None
+    assert await circuit_breaker.retry_after(1) is None
+
+
+@pytest.mark.asyncio
+async def test_postrun_records_outcomes_but_not_invalid_inputs(fake_redis):
+    try:
+        Input(value="not a number")
+    except ValidationError as e:
+        invalid_input = e
+    for _ in range(3):
+        record_circuit_outcome(sender=run_model, args=(1, {}), state="FAILURE", retval=invalid_input)
+        record_circuit_outcome(sender=run_model, args=(1, {}), state="FAILURE", retval=ValueError("bad column"))
+        record_circuit_outcome(sender=run_model, args=(1, {}), state="FAILURE", retval=TypeError())
+        record_circuit_outcome(sender=run_model, args=(1, {}), state="FAILURE", retval=KeyError("hour"))
+        record_circuit_outcome(sender=run_model, args=(1, {}), state="RETRY", retval=RuntimeError())
+    assert fake_redis.get("circuit:1:failures") is None
+
+    for _ in range(3):
+        record_circuit_outcome(sender=run_model, args=(1, {}), state="FAILURE", retval=RuntimeError())
+    assert await circuit_breaker.retry_after(1) > 0
+
+
+@pytest.mark.asyncio
+async def test_predict_fails_fast_while_the_circuit_is_open(
+    client: TestClient,
+    fake_redis,
+    monkeypatch,
+    setup_inference_objects,
+):
+    objects = await setup_inference_objects
+    model_id = objects['model'].id
+    for _ in range(3):
+        circuit_breaker.record_failure(model_id)
+    apply_async = MagicMock()
+    monkeypatch.setattr(views.tasks.run_model, "apply_async", apply_async)
+    client.app.dependency_overrides[views.current_active_user] = lambda: objects['user']
+
+    response = client.get(f"/api/v1/inference/predict/{model_id}")
+    client.app.dependency_overrides.clear()
+
+    assert response.status_code == 503
+    assert 0 < int(response.headers["Retry-After"]) <= 30
+    apply_async.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_failing_canary_gives_its_traffic_back_to_the_primary(
+    client: TestClient,
+    fake_redis,
+    monkeypatch,
+    setup_inference_objects,
+):
+    objects = await setup_inference_objects
+    model_id = objects['model'].id
+    canary = {"id": 4242, "deployment_status": "Canary", "traffic_percent": 100}
+    monkeypatch.setattr(views.registry_service, "candidates", lambda requested: [canary])
+    apply_async = MagicMock(return_value=MagicMock(task_id="mocked_task_id"))
+    monkeypatch.setattr(views.tasks.run_model, "apply_async", apply_async)
+    client.app.dependency_overrides[views.current_active_user] = lambda: objects['user']
+    body = {"latitude": 48, "longitude": 2, "month": 7, "hour": 14}
+
+    client.post(f"/api/v1/inference/predict-temp/{model_id}", json=body)
+    assert apply_async.call_args.kwargs["args"][0] == 4242
+    # Outcomes are recorded under the model that served the prediction
+    for _ in range(3):
+        record_circuit_outcome(sender=run_model, args=(4242, body), state="FAILURE", retval=RuntimeError())
+
+    response = client.post(f"/api/v1/inference/predict-temp/{model_id}", json=body)
+    client.app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert apply_async.call_args.kwargs["args"][0] == model_id
+    assert not fake_redis.exists(f"circuit:{model_id}:open")
+
+
+@pytest.mark.asyncio
+async def test_unavailable_redis_admits_requests(monkeypatch):
+    broken = MagicMock()
+    broken.pipeline.return_value.execute = AsyncMock(side_effect=redis.ConnectionError)
+    monkeypatch.setattr(redis_utils, "async_redis_client", broken)
+
+    await circuit_breaker.enforce_circuit(1)
@@ -1,4 +1,5 @@
 import pytest
+from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 from project.inference import crud
 from tests.factories import AccessPolicyFactory, InferenceModelFactory, UserFactory, UserAccessFactory, ServiceCallFactory
@@ -205,4 +206,100 @@ async def test_check_user_access_and_update(db_session):
         
         access_granted, message = await crud.check_user_access_and_update(session, user.id, model.id)
         assert access_granted is False
-        assert message == "Daily API call limit exceeded"
\ No newline at end of file
+        assert message == "Daily API call limit exceeded"
+
+
+
+@pytest.mark.asyncio
+async def test_service_call_lifecycle_latencies(db_session):
+    async with db_session() as session:
+        access_policy = AccessPolicyFactory.build()
+        session.add(access_policy)
+        await session.commit()
+
+        model = InferenceModelFactory.build(access_policy_id=access_policy.id)
+        session.add(model)
+        await session.commit()
+
+        time_requested = datetime.now(timezone.utc) - timedelta(seconds=10)
+        service_call = ServiceCallFactory.build(
+            model_id=model.id, celery_task_id="lifecycle_task", time_requested=time_requested
+        )
+        session.add(service_call)
+        await session.commit()
+
+        await crud.mark_service_call_started(session, "lifecycle_task", time_requested + timedelta(seconds=2))
+        await crud.update_service_call_time_completed(
+            session, "lifecycle_task", time_requested + timedelta(seconds=5)
+        )
+
+        service_call = await crud.get_service_call_by_task_id(session, "lifecycle_task")
+        assert service_call.queue_latency == pytest.approx(2)
+        assert service_call.run_latency == pytest.approx(3)
+        assert service_call.total_latency == pytest.approx(5)
+        assert service_call.time_failed is None
+
+
+@pytest.mark.asyncio
+async def test_mark_service_call_expired(db_session):
+    async with db_session() as session:
+        access_policy = AccessPolicyFactory.build()
+        session.add(access_policy)
+        await session.commit()
+
+        model = InferenceModelFactory.build(access_policy_id=access_policy.id)
+        session.add(model)
+        await session.commit()
+
+        time_requested = datetime.now(timezone.utc) - timedelta(seconds=90)
+        session.add(ServiceCallFactory.build(
+            model_id=model.id, celery_task_id="expired_task", time_requested=time_requested
+        ))
+        await session.commit()
+
+        await crud.mark_service_call_expired(session, "expired_task", time_requested + timedelta(seconds=60))
+
+        service_call = await crud.get_service_call_by_task_id(session, "expired_task")
+        assert service_call.time_expired is not None
+        assert service_call.queue_latency == pytest.approx(60)
+        # Expired calls stay out of the latency stats
+        assert service_call.total_latency is None
+
+
+@pytest.mark.asyncio
+async def test_get_latency_stats(db_session):
+    async with db_session() as session:
+        access_policy = AccessPolicyFactory.build()
+        session.add(access_policy)
+        await session.commit()
+
+        model = InferenceModelFactory.build(access_policy_id=access_policy.id)
+        session.add(model)
+        await session.commit()
+
+        now = datetime.now(timezone.utc)
+        for i in range(1, 11):
+            session.add(ServiceCallFactory.build(
+                model_id=model.id,
+                time_requested=now - timedelta(seconds=60),
+                queue_latency=0.1 * i,
+                run_latency=1.0,
+                total_latency=1.0 + 0.1 * i,
+            ))
+        session.add(ServiceCallFactory.build(
+            model_id=model.id,
+            time_requested=now - timedelta(hours=2),
+            total_latency=100.0,
+            time_failed=now - timedelta(hours=2),
+        ))
+        await session.commit()
+
+        stats = await crud.get_latency_stats(session, model.id, {"5m": 300, "24h": 86400})
+
+        assert stats["5m"]["calls"] == 10
+        assert stats["5m"]["failures"] == 0
+        assert stats["5m"]["queue_p50"] == pytest.approx(0.55)
+        assert stats["5m"]["run_p99"] == pytest.approx(1.0)
+        assert stats["24h"]["calls"] == 11
+        assert stats["24h"]["failures"] == 1
+        assert stats["24h"]["total_p99"] > 50
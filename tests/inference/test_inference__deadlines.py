@@ -0,0 +1,45 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+from fastapi.testclient import TestClient
+from project.inference import policies, views
+
+
+def _seconds_left(deadline: datetime) -> float:
+    return (deadline - datetime.now(timezone.utc)).total_seconds()
+
+
+def test_request_deadline(settings, monkeypatch):
+    monkeypatch.setattr(settings, "PREDICT_DEFAULT_TIMEOUT", 60)
+
+    assert _seconds_left(policies.request_deadline(None)) == pytest.approx(60, abs=1)
+    assert _seconds_left(policies.request_deadline({"request_timeout": 10})) == pytest.approx(10, abs=1)
+    # The header shortens the deadline but never extends it
+    assert _seconds_left(policies.request_deadline({"request_timeout": 10}, "2.5")) == pytest.approx(2.5, abs=1)
+    assert _seconds_left(policies.request_deadline({"request_timeout": 10}, "600")) == pytest.approx(10, abs=1)
+    for header in ("soon", "0", "-1", "nan"):
+        with pytest.raises(ValueError):
+            policies.request_deadline(None, header)
+
+
+@pytest.mark.asyncio
+async def test_predict_enqueues_with_deadline(
+    client: TestClient,
+    monkeypatch,
+    setup_inference_objects,
+    mock_run_model,
+):
+    objects = await setup_inference_objects
+    client.app.dependency_overrides[views.current_active_user] = lambda: objects['user']
+    enqueued = MagicMock(return_value=MagicMock(task_id="mocked_task_id"))
+    monkeypatch.setattr(views.tasks.run_model, "apply_async", enqueued)
+    url = f"/api/v1/inference/predict/{objects['model'].id}"
+
+    response = client.get(url, headers={"X-Request-Timeout": "5"})
+    invalid = client.get(url, headers={"X-Request-Timeout": "later"})
+    client.app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert _seconds_left(enqueued.call_args.kwargs["expires"]) == pytest.approx(5, abs=1)
+    assert invalid.status_code == 400
+    assert enqueued.call_count == 1
@@ -0,0 +1,129 @@
+import asyncio
+import fakeredis
+import pytest
+from fakeredis import aioredis
+from unittest.mock import MagicMock
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from project import redis_utils
+from project.inference import views
+from project.inference.idempotency import IdempotentRequest, idempotency_guard
+from project.inference.models import ServiceCall
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis_utils, "async_redis_client", aioredis.FakeRedis(server=server))
+    # Inspects the keys from whichever event loop the test runs in
+    return fakeredis.FakeStrictRedis(server=server)
+
+
+@pytest.mark.asyncio
+async def test_claim_then_replay(fake_redis):
+    first = IdempotentRequest("idempotency:k", "fp")
+    assert await first.claim() is None
+
+    with pytest.raises(HTTPException) as in_flight:
+        await IdempotentRequest("idempotency:k", "fp").claim()
+    assert in_flight.value.status_code == 409
+
+    await first.complete("task-1")
+    assert await IdempotentRequest("idempotency:k", "fp").claim() == "task-1"
+    with pytest.raises(HTTPException) as mismatch:
+        await IdempotentRequest("idempotency:k", "other").claim()
+    assert mismatch.value.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_release_only_drops_own_claim(fake_redis):
+    first = IdempotentRequest("idempotency:k", "fp")
+    await first.claim()
+    second = IdempotentRequest("idempotency:k", "fp")
+    with pytest.raises(HTTPException):
+        await second.claim()
+
+    await second.release()
+    assert fake_redis.exists("idempotency:k")
+    await first.release()
+    assert not fake_redis.exists("idempotency:k")
+
+
+@pytest.mark.asyncio
+async def test_pending_claim_expires_sooner_than_the_completed_key(fake_redis, settings):
+    first = IdempotentRequest("idempotency:k", "fp")
+    await first.claim()
+    assert 0 < fake_redis.ttl("idempotency:k") <= settings.IDEMPOTENCY_PENDING_TTL
+
+    await first.complete("task-1")
+    assert fake_redis.ttl("idempotency:k") > settings.IDEMPOTENCY_PENDING_TTL
+    # A completed key is kept for the replays
+    await first.release()
+    assert fake_redis.exists("idempotency:k")
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_releases_its_key(fake_redis):
+    request = MagicMock(headers={"Idempotency-Key": "k"}, url=MagicMock(path="/predict/1"))
+
+    async def body():
+        return b"{}"
+    request.body = body
+    guard = idempotency_guard(request, MagicMock(id="user"))
+
+    await (await guard.__anext__()).claim()
+    assert fake_redis.keys("idempotency:*")
+    with pytest.raises(asyncio.CancelledError):
+        await guard.athrow(asyncio.CancelledError())
+
+    assert fake_redis.keys("idempotency:*") == []
+
+
+@pytest.mark.asyncio
+async def test_predict_temperature_replay_skips_db_and_enqueue(
+    client: TestClient,
+    db_session,
+    fake_redis,
+    monkeypatch,
+    setup_inference_objects,
+    mock_run_model,
+):
+    objects = await setup_inference_objects
+    client.app.dependency_overrides[views.current_active_user] = lambda: objects['user']
+    enqueued = MagicMock(return_value=MagicMock(task_id="mocked_task_id"))
+    monkeypatch.setattr(views.tasks.run_model, "apply_async", enqueued)
+    url = f"/api/v1/inference/predict-temp/{objects['model'].id}"
+    body = {"latitude": 48, "longitude": 2, "month": 7, "hour": 14}
+    headers = {"Idempotency-Key": "retry-me"}
+
+    first = client.post(url, json=body, headers=headers)
+    replay = client.post(url, json=body, headers=headers)
+    changed = client.post(url, json={**body, "hour": 15}, headers=headers)
+    client.app.dependency_overrides.clear()
+
+    assert first.json() == replay.json() == {"task_id": "mocked_task_id"}
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert changed.status_code == 422
+    assert enqueued.call_count == 1
+    async with db_session() as session:
+        assert (await session.execute(select(func.count(ServiceCall.id)))).scalar() == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_request_releases_its_key(
+    client: TestClient,
+    fake_redis,
+    monkeypatch,
+    setup_inference_objects,
+    mock_run_model,
+):
+    objects = await setup_inference_objects
+    client.app.dependency_overrides[views.current_active_user] = lambda: objects['user']
+    monkeypatch.setattr(views.crud, "check_user_access_and_update", MagicMock(side_effect=HTTPException(status_code=403)))
+
+    response = client.get(f"/api/v1/inference/predict/{objects['model'].id}", headers={"Idempotency-Key": "k"})
+    client.app.dependency_overrides.clear()
+
+    assert response.status_code == 403
+    assert fake_redis.keys("idempotency:*") == []
@@ -0,0 +1,66 @@
+import json
+import numpy as np
+import pytest
+from project import cli
+from project.inference.ml_models import linear_kernel
+from project.inference.ml_models.linear_kernel import LinearKernel
+from project.inference.ml_models.linreg_placeholder import LinearPlaceholderModel
+from project.inference.ml_models.tempertaure_predictor import TemperatureModel
+
+
+@pytest.fixture
+def artifact_dir(tmp_path, monkeypatch, settings):
+    monkeypatch.setattr(settings, "MODEL_ARTIFACT_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.parametrize("model_class", [TemperatureModel, LinearPlaceholderModel])
+def test_kernel_matches_estimator(artifact_dir, model_class):
+    estimator = model_class.fit_estimator()
+    kernel = model_class.compile_kernel()
+    X = np.random.default_rng(0).uniform(-90, 90, size=(50, len(kernel.features)))
+
+    np.testing.assert_allclose(kernel.predict_batch(X), estimator.predict(X))
+    assert kernel.predict_row(X[0].tolist()) == pytest.approx(estimator.predict(X[:1])[0])
+
+
+def test_kernel_save_and_load(tmp_path):
+    kernel = LinearKernel(["a", "b"], [1.5, -2.0], 0.25)
+    path = tmp_path / "nested" / "kernel.json"
+
+    kernel.save(path)
+    loaded = LinearKernel.load(path)
+
+    assert json.loads(path.read_text())["features"] == ["a", "b"]
+    assert loaded.predict_row([2, 1]) == kernel.predict_row([2, 1]) == 1.25
+
+
+def test_from_estimator_rejects_feature_mismatch():
+    estimator = LinearPlaceholderModel.fit_estimator()
+    with pytest.raises(ValueError):
+        LinearKernel.from_estimator(estimator, ["x0", "x1"])
+
+
+def test_model_uses_exported_kernel_without_fitting(artifact_dir, monkeypatch):
+    path = TemperatureModel.export_kernel()
+    assert path.parent == artifact_dir
+
+    def fail():
+        raise AssertionError("The model should load its exported kernel")
+    monkeypatch.setattr(TemperatureModel, "fit_estimator", fail)
+
+    model = TemperatureModel()
+    output = model.predict(TemperatureModel.Input(latitude=48, longitude=2, month=7, hour=14))
+
+    assert isinstance(output, TemperatureModel.Output)
+    assert output.temperature == pytest.approx(model.predict_batch([[48, 2, 7, 14]])[0])
+
+
+def test_export_kernels_command(artifact_dir):
+    cli.main(["export-kernels"])
+
+    assert sorted(path.name for path in artifact_dir.iterdir()) == [
+        "linreg_placeholder.kernel.json",
+        "temperature_model.kernel.json",
+    ]
+    assert linear_kernel.kernel_path("temperature_model").exists()
@@ -0,0 +1,203 @@
+import pytest
+import importlib
+import json
+from unittest.mock import MagicMock
+import fakeredis
+import redis
+import threading
+from project import redis_utils
+from project.inference.ml_models.tempertaure_predictor import TemperatureModel
+from project.inference.model_registry import (
+    declare_model, get_model, model_registry, reload_model, warmup_models
+)
+from project.inference.model_reload import apply_active_reloads, handle_reload_message, publish_model_reload
+
+PLACEHOLDER_LOADER = "project.inference.ml_models.linreg_placeholder:LinearPlaceholderModel"
+TEMPERATURE_LOADER = "project.inference.ml_models.tempertaure_predictor:TemperatureModel"
+
+# `project.inference` re-exports the registry dict under the module's name
+registry_module = importlib.import_module("project.inference.model_registry")
+
+
+@pytest.fixture
+def artifact_dir(tmp_path, monkeypatch, settings):
+    monkeypatch.setattr(settings, "MODEL_ARTIFACT_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = fakeredis.FakeStrictRedis()
+    monkeypatch.setattr(redis_utils, "redis_client", client)
+    return client
+
+
+@pytest.fixture
+def registry_index():
+    index = 9001
+    yield index
+    model_registry.pop(index, None)
+    registry_module._model_instances.pop(index, None)
+
+
+def test_declare_model_imports_on_first_use(monkeypatch, registry_index):
+    imported = []
+    real_import_module = registry_module.importlib.import_module
+    monkeypatch.setattr(
+        registry_module.importlib, "import_module",
+        lambda name, *args, **kwargs: imported.append(name) or real_import_module(name, *args, **kwargs)
+    )
+
+    declare_model(
+        index=registry_index, name="lazy", problem="regression", category="test",
+        version="0.0.1", access_policy_id=1, loader=PLACEHOLDER_LOADER
+    )
+    assert imported == []
+    assert model_registry[registry_index]["loader"] == PLACEHOLDER_LOADER
+
+    model = get_model(registry_index)
+
+    assert "project.inference.ml_models.linreg_placeholder" in imported
+    assert get_model(registry_index) is model
+
+
+def test_get_model_rebuilds_when_func_changes(registry_index):
+    first, second = MagicMock(), MagicMock()
+    model_registry[registry_index] = {"func": first}
+    assert get_model(registry_index) is first.return_value
+
+    model_registry[registry_index] = {"func": second}
+    assert get_model(registry_index) is second.return_value
+    first.assert_called_once()
+
+
+def test_warmup_models_builds_declared_models(monkeypatch, registry_index):
+    built = MagicMock()
+    declare_model(
+        index=registry_index, name="lazy", problem="regression", category="test",
+        version="0.0.1", access_policy_id=1, loader=PLACEHOLDER_LOADER
+    )
+    monkeypatch.setattr(registry_module, "get_model", built)
+
+    warmup_models()
+
+    built.assert_any_call(registry_index)
+
+
+def test_reload_model_swaps_instance_atomically(registry_index, artifact_dir):
+    declare_model(
+        index=registry_index, name="lazy", problem="regression", category="test",
+        version="0.0.1", access_policy_id=1, loader=PLACEHOLDER_LOADER
+    )
+    in_flight = get_model(registry_index)
+    TemperatureModel.export_kernel("0.0.2")
+
+    reloaded = reload_model(registry_index, loader=TEMPERATURE_LOADER, version="0.0.2")
+
+    # Tasks holding the old instance keep it, new lookups get the new one
+    assert type(in_flight).__name__ == "LinearPlaceholderModel"
+    assert get_model(registry_index) is reloaded
+    assert type(reloaded).__name__ == "TemperatureModel"
+    assert model_registry[registry_index]["version"] == "0.0.2"
+    assert model_registry[registry_index]["name"] == "lazy"
+
+
+def test_reload_model_failure_keeps_current_instance(registry_index):
+    declare_model(
+        index=registry_index, name="lazy", problem="regression", category="test",
+        version="0.0.1", access_policy_id=1, loader=PLACEHOLDER_LOADER
+    )
+    current = get_model(registry_index)
+
+    handle_reload_message(json.dumps({"model_id": registry_index, "loader": "project.inference.ml_models.linreg_placeholder:Missing"}))
+
+    assert get_model(registry_index) is current
+    assert model_registry[registry_index]["version"] == "0.0.1"
+
+
+def test_declared_models_must_implement_the_batch_protocol(registry_index):
+    declare_model(
+        index=registry_index, name="lazy", problem="regression", category="test",
+        version="0.0.1", access_policy_id=1, loader="collections:OrderedDict"
+    )
+
+    with pytest.raises(TypeError):
+        get_model(registry_index)
+
+
+def test_reload_model_only_imports_allowed_loaders(registry_index):
+    declare_model(
+        index=registry_index, name="lazy", problem="regression", category="test",
+        version="0.0.1", access_policy_id=1, loader=PLACEHOLDER_LOADER
+    )
+
+    with pytest.raises(ValueError):
+        reload_model(registry_index, loader="subprocess:Popen", version="0.0.2")
+
+
+def test_versioned_reload_needs_its_artifact(registry_index, artifact_dir):
+    declare_model(
+        index=registry_index, name="lazy", problem="regression", category="test",
+        version="0.0.1", access_policy_id=1, loader=PLACEHOLDER_LOADER
+    )
+
+    with pytest.raises(FileNotFoundError):
+        reload_model(registry_index, version="0.0.2")
+
+    path = TemperatureModel.export_kernel("0.0.2")
+    assert path.name == "temperature_model-0.0.2.kernel.json"
+    reload_model(registry_index, loader=TEMPERATURE_LOADER, version="0.0.2")
+    # Later reloads without a version keep serving the 0.0.2 artifact
+    reload_model(registry_index)
+    assert model_registry[registry_index]["artifact_version"] == "0.0.2"
+
+
+def test_new_worker_processes_apply_recorded_reloads(registry_index, artifact_dir, fake_redis):
+    declare_model(
+        index=registry_index, name="lazy", problem="regression", category="test",
+        version="0.0.1", access_policy_id=1, loader=PLACEHOLDER_LOADER
+    )
+    TemperatureModel.export_kernel("0.0.2")
+    publish_model_reload(registry_index, TEMPERATURE_LOADER, "0.0.2")
+    # A reload without a loader keeps the recorded one
+    publish_model_reload(registry_index, version="0.0.2")
+
+    # As a process forked after the reload, before its warmup
+    apply_active_reloads()
+
+    assert model_registry[registry_index]["loader"] == TEMPERATURE_LOADER
+    assert model_registry[registry_index]["version"] == "0.0.2"
+    assert registry_index not in registry_module._model_instances
+    assert type(get_model(registry_index)).__name__ == "TemperatureModel"
+
+
+def test_reload_listener_resubscribes_after_redis_errors(monkeypatch):
+    model_reload = importlib.import_module("project.inference.model_reload")
+    handled, resubscribed = [], threading.Event()
+    monkeypatch.setattr(model_reload, "RECONNECT_DELAY", 0)
+    monkeypatch.setattr(model_reload, "handle_reload_message", handled.append)
+    monkeypatch.setattr(model_reload, "apply_active_reloads", MagicMock())
+    pubsub = MagicMock()
+    pubsub.listen.return_value = iter([{"data": "reload"}])
+
+    calls = []
+
+    def subscribe(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise redis.ConnectionError("connection reset")
+        if len(calls) == 2:
+            return pubsub
+        resubscribed.set()
+        threading.Event().wait()
+
+    client = MagicMock()
+    client.pubsub.side_effect = subscribe
+    monkeypatch.setattr(redis_utils, "redis_client", client)
+
+    model_reload.start_reload_listener()
+
+    assert resubscribed.wait(5)
+    assert handled == ["reload"]
+    # Catching up on reloads published while disconnected
+    model_reload.apply_active_reloads.assert_called_with(build=True)
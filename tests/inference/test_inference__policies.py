@@ -0,0 +1,68 @@
+import pytest
+from unittest.mock import MagicMock
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from project.inference import policies, views
+from project.inference.models import AccessPolicy
+
+
+def test_service_lane():
+    assert policies.service_lane({"service_tier": "premium"}) == {"queue": "high_priority", "priority": 0}
+    assert policies.service_lane({"service_tier": "batch"})["queue"] == "low_priority"
+    # Unknown tiers and missing policies get the standard lane
+    assert policies.service_lane({"service_tier": "gold"})["queue"] == "default"
+    assert policies.service_lane(None)["queue"] == "default"
+
+
+def test_service_lanes_are_declared_queues(settings):
+    queues = {queue.name for queue in settings.CELERY_TASK_QUEUES}
+    priority_steps = settings.CELERY_BROKER_TRANSPORT_OPTIONS["priority_steps"]
+    for lane in [*settings.SERVICE_TIERS.values(), settings.SHADOW_LANE]:
+        assert lane["queue"] in queues
+        assert lane["priority"] in priority_steps
+
+
+@pytest.mark.asyncio
+async def test_get_user_policy_is_cached(db_session, setup_inference_objects):
+    objects = await setup_inference_objects
+    user_id, model_id = objects['user'].id, objects['model'].id
+    policies.clear_policy_cache()
+
+    async with db_session() as session:
+        policy = await policies.get_user_policy(session, user_id, model_id)
+        await session.execute(
+            update(AccessPolicy).where(AccessPolicy.id == objects['access_policy'].id).values(service_tier="premium")
+        )
+        await session.commit()
+        cached = await policies.get_user_policy(session, user_id, model_id)
+        policies.clear_policy_cache()
+        refreshed = await policies.get_user_policy(session, user_id, model_id)
+
+    assert policy["service_tier"] == cached["service_tier"] == "standard"
+    assert refreshed["service_tier"] == "premium"
+
+
+@pytest.mark.asyncio
+async def test_premium_predictions_use_the_high_priority_lane(
+    client: TestClient,
+    db_session,
+    monkeypatch,
+    setup_inference_objects,
+    mock_run_model,
+):
+    objects = await setup_inference_objects
+    async with db_session() as session:
+        await session.execute(
+            update(AccessPolicy).where(AccessPolicy.id == objects['access_policy'].id).values(service_tier="premium")
+        )
+        await session.commit()
+    client.app.dependency_overrides[views.current_active_user] = lambda: objects['user']
+    enqueued = MagicMock(return_value=MagicMock(task_id="mocked_task_id"))
+    monkeypatch.setattr(views.tasks.run_model, "apply_async", enqueued)
+
+    response = client.get(f"/api/v1/inference/predict/{objects['model'].id}")
+    client.app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert enqueued.call_args.kwargs["queue"] == "high_priority"
+    assert enqueued.call_args.kwargs["priority"] == 0
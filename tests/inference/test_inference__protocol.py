@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+from project.inference.ml_models.linreg_placeholder import LinearPlaceholderModel
+from project.inference.ml_models.protocol import BatchModel, validate_columns
+from project.inference.ml_models.tempertaure_predictor import TemperatureModel
+from project.inference.tasks import run_model_batch
+
+COLUMNS = {"latitude": [40, -10], "longitude": [-74, 20], "month": [6, 1], "hour": [14, 3]}
+
+
+@pytest.mark.parametrize("model_class", [TemperatureModel, LinearPlaceholderModel])
+def test_registered_models_implement_the_batch_protocol(model_class):
+    model = model_class()
+    X = np.zeros((3, len(model.Input.model_fields)))
+
+    assert isinstance(model, BatchModel)
+    assert model.predict_batch(X).shape == (3,)
+
+
+def test_validate_columns_stacks_fields_in_input_order():
+    X = validate_columns(TemperatureModel, {**COLUMNS, "latitude": ["40", -10]})
+
+    assert X.shape == (2, 4)
+    assert X[:, 0].tolist() == [40.0, -10.0]
+    assert X[0].tolist() == [40.0, -74.0, 6.0, 14.0]
+
+
+def test_validate_columns_rejects_bad_inputs():
+    with pytest.raises(ValidationError):
+        validate_columns(TemperatureModel, {**COLUMNS, "hour": ["noon", 3]})
+    with pytest.raises(ValidationError):
+        validate_columns(TemperatureModel, {"latitude": [40]})
+    with pytest.raises(ValueError):
+        validate_columns(TemperatureModel, {**COLUMNS, "hour": [14]})
+
+
+def test_run_model_batch_scores_columns():
+    result = run_model_batch(2, COLUMNS)
+
+    model = TemperatureModel()
+    expected = model.predict_batch(validate_columns(model, COLUMNS))
+    assert result["predictions"] == pytest.approx(expected.tolist())
@@ -0,0 +1,84 @@
+import pytest
+from fakeredis import aioredis
+from unittest.mock import MagicMock
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from project import redis_utils
+from project.inference import policies, rate_limit, views
+from project.inference.models import AccessPolicy
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = aioredis.FakeRedis()
+    monkeypatch.setattr(redis_utils, "async_redis_client", client)
+    policies.clear_policy_cache()
+    yield client
+    policies.clear_policy_cache()
+
+
+@pytest.mark.asyncio
+async def test_acquire_admits_a_full_burst_then_rejects(fake_redis):
+    user_id = uuid4()
+    limits = {"requests_per_second": 3}
+
+    assert [await rate_limit.acquire(user_id, 1, limits) for _ in range(3)] == [0, 0, 0]
+    retry_after = await rate_limit.acquire(user_id, 1, limits)
+
+    assert 0 < retry_after <= 1 / 3
+    # Buckets are per user and model
+    assert await rate_limit.acquire(user_id, 2, limits) == 0
+    assert await rate_limit.acquire(uuid4(), 1, limits) == 0
+
+
+@pytest.mark.asyncio
+async def test_acquire_rejection_does_not_consume_other_limits(fake_redis):
+    user_id = uuid4()
+    await rate_limit.acquire(user_id, 1, {"requests_per_second": 1, "requests_per_minute": 2})
+    assert await rate_limit.acquire(user_id, 1, {"requests_per_second": 1, "requests_per_minute": 2}) > 0
+
+    # The rejected request left a single minute slot used
+    assert await rate_limit.acquire(user_id, 1, {"requests_per_minute": 2}) == 0
+    assert await rate_limit.acquire(user_id, 1, {"requests_per_minute": 2}) > 1
+
+
+@pytest.mark.asyncio
+async def test_predict_returns_429_with_retry_after(
+    client: TestClient,
+    db_session,
+    fake_redis,
+    mock_run_model,
+    monkeypatch,
+    setup_inference_objects,
+):
+    objects = await setup_inference_objects
+    async with db_session() as session:
+        await session.execute(
+            update(AccessPolicy)
+            .where(AccessPolicy.id == objects['access_policy'].id)
+            .values(requests_per_minute=1)
+        )
+        await session.commit()
+    client.app.dependency_overrides[views.current_active_user] = lambda: objects['user']
+
+    first = client.get(f"/api/v1/inference/predict/{objects['model'].id}")
+    # Rejected requests must not reach the quota queries
+    monkeypatch.setattr(views.crud, "check_user_access_and_update", MagicMock(side_effect=AssertionError))
+    second = client.get(f"/api/v1/inference/predict/{objects['model'].id}")
+    client.app.dependency_overrides.clear()
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert 1 <= int(second.headers["Retry-After"]) <= 60
+
+
+@pytest.mark.asyncio
+async def test_unlimited_policy_skips_redis(db_session, setup_inference_objects, monkeypatch):
+    objects = await setup_inference_objects
+    monkeypatch.setattr(redis_utils, "async_redis_client", MagicMock(side_effect=AssertionError))
+    policies.clear_policy_cache()
+
+    async with db_session() as session:
+        await rate_limit.enforce_rate_limit(objects['model'].id, objects['user'], session)
+        assert await rate_limit.get_rate_limits(session, objects['user'].id, objects['model'].id) == {}
@@ -0,0 +1,120 @@
+import asyncio
+import pytest
+import sys
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from project.inference.model_registry import model_registry
+from project.inference.registry_service import NOTIFY_CHANNEL, ModelRegistryService
+from tests.factories import AccessPolicyFactory, InferenceModelFactory
+
+
+async def _create_model(session, **kwargs):
+    AccessPolicyFactory._meta.sqlalchemy_session = session
+    InferenceModelFactory._meta.sqlalchemy_session = session
+    access_policy = AccessPolicyFactory()
+    await session.flush()
+    model = InferenceModelFactory(access_policy_id=access_policy.id, **kwargs)
+    await session.commit()
+    return model
+
+
+@pytest.mark.asyncio
+async def test_load_skips_models_without_matching_implementation(db_session, monkeypatch):
+    service = ModelRegistryService()
+    async with db_session() as session:
+        served = await _create_model(session)
+        renamed = await _create_model(session)
+        monkeypatch.setitem(model_registry, served.id, {"name": served.name, "func": lambda: None})
+        monkeypatch.setitem(model_registry, renamed.id, {"name": "other_model", "func": lambda: None})
+
+        await service.load(session)
+
+        assert (await service.get(session, served.id))["name"] == served.name
+        assert await service.get(session, renamed.id) is None
+
+
+@pytest.mark.asyncio
+async def test_get_falls_back_to_database_on_miss(db_session, monkeypatch):
+    service = ModelRegistryService()
+    async with db_session() as session:
+        await service.load(session)
+
+        # Created after the registry was loaded, e.g. by another process
+        model = await _create_model(session)
+        monkeypatch.setitem(model_registry, model.id, {"name": model.name, "func": lambda: None})
+
+        metadata = await service.get(session, model.id)
+        assert metadata["id"] == model.id
+        assert metadata["version"] == model.version
+
+
+@pytest.mark.asyncio
+async def test_get_remembers_unknown_models(db_session, monkeypatch, settings):
+    monkeypatch.setattr(settings, "MODEL_REGISTRY_MISS_TTL", 60)
+    service = ModelRegistryService()
+    async with db_session() as session:
+        await service.load(session)
+        assert await service.get(session, 999) is None
+
+        model = await _create_model(session, id=999)
+        monkeypatch.setitem(model_registry, 999, {"name": model.name, "func": lambda: None})
+        assert await service.get(session, 999) is None
+
+        await service.reload_model(session, 999)
+        assert (await service.get(session, 999))["id"] == 999
+
+
+class FakeListenerConnection:
+    """
+    asyncpg-like connection whose first instance drops right after LISTEN.
+    """
+    opened = []
+
+    def __init__(self):
+        self.driver_connection = self
+        self.listeners = {}
+        FakeListenerConnection.opened.append(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def get_raw_connection(self):
+        return self
+
+    def add_termination_listener(self, callback):
+        if len(FakeListenerConnection.opened) == 1:
+            asyncio.get_running_loop().call_soon(callback, self)
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+
+@pytest.mark.asyncio
+async def test_listener_reconnects_and_resyncs(monkeypatch, settings):
+    monkeypatch.setattr(settings, "MODEL_REGISTRY_RESYNC_INTERVAL", 0.01)
+    monkeypatch.setattr(sys.modules[ModelRegistryService.__module__], "RECONNECT_DELAY", 0.001)
+    FakeListenerConnection.opened = []
+    engine = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"), connect=FakeListenerConnection)
+    service = ModelRegistryService()
+    resyncs = []
+    monkeypatch.setattr(service, "_resync", AsyncMock(side_effect=lambda _maker: resyncs.append(1)))
+    changes = []
+    monkeypatch.setattr(service, "_on_change", AsyncMock(side_effect=lambda _maker, model_id: changes.append(model_id)))
+
+    await service.start_listener(engine, session_maker=None)
+    await asyncio.sleep(0.1)
+
+    assert len(FakeListenerConnection.opened) == 2
+    # Once per connection, then periodically
+    assert len(resyncs) >= 3
+    FakeListenerConnection.opened[-1].listeners[NOTIFY_CHANNEL](None, 0, NOTIFY_CHANNEL, "7")
+    assert len(service._change_tasks) == 1
+    await asyncio.sleep(0)
+    assert changes == [7]
+
+    await service.stop_listener()
+    assert service._listener_task is None
+
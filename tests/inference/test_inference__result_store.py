@@ -0,0 +1,70 @@
+import json
+import os
+import time
+import pytest
+from unittest.mock import MagicMock
+from fastapi.testclient import TestClient
+from project.inference import result_store, views
+
+
+@pytest.fixture
+def blob_store(tmp_path, monkeypatch, settings):
+    monkeypatch.setattr(settings, "RESULT_STORE_URL", f"file://{tmp_path}")
+    monkeypatch.setattr(settings, "RESULT_OFFLOAD_THRESHOLD", 100)
+    result_store.get_blob_store.cache_clear()
+    yield result_store.get_blob_store()
+    result_store.get_blob_store.cache_clear()
+
+
+def test_offload_result_keeps_small_results_inline(blob_store):
+    assert result_store.offload_result("small", {"temperature": 21.5}) == {"temperature": 21.5}
+    assert list(blob_store.root.iterdir()) == []
+
+
+def test_offload_result_stores_large_results(blob_store):
+    result = {"values": list(range(100))}
+
+    ref = result_store.offload_result("large", result)
+
+    assert result_store.is_reference(ref)
+    assert ref["result_ref"]["size"] == len(json.dumps(result))
+    assert result_store.load_result(ref) == result
+
+
+def test_parse_range():
+    assert result_store.parse_range("bytes=0-9", 100) == (0, 10)
+    assert result_store.parse_range("bytes=90-", 100) == (90, 100)
+    assert result_store.parse_range("bytes=-5", 100) == (95, 100)
+    assert result_store.parse_range("bytes=90-200", 100) == (90, 100)
+    with pytest.raises(ValueError):
+        result_store.parse_range("bytes=100-", 100)
+    with pytest.raises(ValueError):
+        result_store.parse_range("bytes=0-1,5-6", 100)
+
+
+def test_collect_garbage_deletes_old_blobs(blob_store):
+    blob_store.put("old.json", b"{}")
+    blob_store.put("new.json", b"{}")
+    an_hour_ago = time.time() - 3600
+    os.utime(blob_store.root / "old.json", (an_hour_ago, an_hour_ago))
+
+    assert result_store.collect_garbage(max_age=600) == 1
+    assert [path.name for path in blob_store.root.iterdir()] == ["new.json"]
+
+
+def test_task_status_streams_stored_results(client: TestClient, blob_store, monkeypatch):
+    result = {"values": list(range(100))}
+    task = MagicMock(state="SUCCESS", result=result_store.offload_result("task-1", result))
+    monkeypatch.setattr(views, "AsyncResult", lambda task_id: task)
+
+    response = client.get("/api/v1/inference/task_status/task-1")
+    assert response.status_code == 200
+    assert response.json() == {"state": "SUCCESS", "result": result}
+
+    response = client.get("/api/v1/inference/task_status/task-1/result", headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206
+    assert response.content == json.dumps(result).encode()[:10]
+    assert response.headers["content-range"] == f"bytes 0-9/{len(json.dumps(result))}"
+
+    response = client.get("/api/v1/inference/task_status/task-1/result", headers={"Range": "bytes=9999-"})
+    assert response.status_code == 416
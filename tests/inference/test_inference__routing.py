@@ -0,0 +1,66 @@
+import math
+from unittest.mock import MagicMock
+from prometheus_client import REGISTRY
+from project.inference.model_registry import model_registry
+from project.inference.registry_service import ModelRegistryService
+from project.inference.routing import CANARY, SHADOW, choose_route, compare_results
+from project.inference.tasks import shadow_score
+
+
+def _version(model_id, status, percent, name="temperature_model", in_production=False):
+    return {
+        "id": model_id, "name": name, "version": f"1.{model_id}.0",
+        "deployment_status": status, "in_production": in_production, "traffic_percent": percent,
+    }
+
+
+def test_choose_route_splits_canary_traffic():
+    candidates = [_version(3, CANARY, 10), _version(4, CANARY, 20)]
+
+    assert choose_route(2, candidates, draw=lambda: 0.05) == (3, [])
+    assert choose_route(2, candidates, draw=lambda: 0.25) == (4, [])
+    assert choose_route(2, candidates, draw=lambda: 0.5) == (2, [])
+
+
+def test_choose_route_samples_shadows():
+    candidates = [_version(3, SHADOW, 50)]
+
+    assert choose_route(2, candidates, draw=lambda: 0.2) == (2, [3])
+    assert choose_route(2, candidates, draw=lambda: 0.7) == (2, [])
+
+
+def test_compare_results():
+    assert compare_results({"temperature": 20.0}, {"temperature": 21.5}) == 1.5
+    assert compare_results({"label": "a"}, {"label": "b"}) == math.inf
+    assert compare_results({"error": "boom"}, {"error": "boom"}) is None
+    assert compare_results({"temperature": 20.0}, {"other": 20.0}) is None
+
+
+def test_candidates_only_for_production_models():
+    service = ModelRegistryService()
+    service._models = {
+        2: _version(2, "Deployed", 0, in_production=True),
+        3: _version(3, CANARY, 10),
+        4: _version(4, SHADOW, 100),
+        5: _version(5, CANARY, 10, name="other_model"),
+        6: _version(6, "Pending", 0),
+    }
+
+    assert [candidate["id"] for candidate in service.candidates(2)] == [3, 4]
+    assert service.candidates(3) == []
+
+
+def test_shadow_score_records_diff(monkeypatch):
+    model = MagicMock()
+    model.predict.return_value.dict.return_value = {"temperature": 22.0}
+    monkeypatch.setitem(model_registry, 9002, {"name": "shadowed", "version": "2.0.0", "func": lambda: model})
+    labels = {"model": "shadowed", "version": "2.0.0", "outcome": "mismatch"}
+    before = REGISTRY.get_sample_value("shadow_comparisons_total", labels) or 0
+
+    shadow_score({"temperature": 20.0}, 9002, {"latitude": 40})
+
+    model.Input.assert_called_once_with(latitude=40)
+    assert REGISTRY.get_sample_value("shadow_comparisons_total", labels) == before + 1
+    assert REGISTRY.get_sample_value(
+        "shadow_result_abs_diff_sum", {"model": "shadowed", "version": "2.0.0"}
+    ) >= 2.0
@@ -0,0 +1,21 @@
+import pytest
+from sqlalchemy import func, select
+from project.inference.models import AccessPolicy, InferenceModel
+from project.inference.model_registry import model_registry
+from project.inference.seeders import seed_inference_data
+
+
+@pytest.mark.asyncio
+async def test_seed_inference_data_is_idempotent(db_session):
+    async with db_session() as session:
+        await seed_inference_data(session)
+        await seed_inference_data(session)
+
+        policies = (await session.execute(select(func.count(AccessPolicy.id)))).scalar()
+        assert policies == 1
+
+        models = (await session.execute(select(InferenceModel))).scalars().all()
+        assert {model.id for model in models} == set(model_registry)
+        for model in models:
+            assert model.name == model_registry[model.id]["name"]
+            assert model.access_policy_id == model_registry[model.id]["access_policy_id"]
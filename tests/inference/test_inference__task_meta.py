@@ -0,0 +1,56 @@
+import json
+import pytest
+from celery import current_app
+from fakeredis import aioredis
+from fastapi.testclient import TestClient
+from project.inference import result_store, task_meta
+
+
+@pytest.fixture
+def result_redis(monkeypatch):
+    client = aioredis.FakeRedis()
+    monkeypatch.setattr(task_meta, "get_result_redis", lambda: client)
+    return client
+
+
+async def store_meta(client, task_id: str, status: str, result):
+    backend = current_app.backend
+    meta = {"status": status, "result": result, "traceback": None, "children": [], "task_id": task_id}
+    await client.set(backend.get_key_for_task(task_id), json.dumps(meta))
+
+
+@pytest.mark.asyncio
+async def test_get_statuses_reads_all_tasks_in_one_mget(result_redis, monkeypatch):
+    await store_meta(result_redis, "done", "SUCCESS", {"temperature": 21.5})
+    await store_meta(result_redis, "big", "SUCCESS", {result_store.RESULT_REF_KEY: {"key": "big.json", "size": 10}})
+    await store_meta(
+        result_redis, "failed", "FAILURE", {"exc_type": "ValueError", "exc_message": ["bad input"], "exc_module": "builtins"}
+    )
+    calls = []
+    mget = result_redis.mget
+
+    async def counted_mget(keys):
+        calls.append(keys)
+        return await mget(keys)
+
+    monkeypatch.setattr(result_redis, "mget", counted_mget)
+
+    statuses = await task_meta.get_statuses(["done", "big", "failed", "unknown", "done"])
+
+    assert len(calls) == 1
+    assert statuses == {
+        "done": {"state": "SUCCESS", "result": {"temperature": 21.5}},
+        "big": {"state": "SUCCESS", "result_ref": {"key": "big.json", "size": 10}},
+        "failed": {"state": "FAILURE", "error": "bad input"},
+        "unknown": {"state": "PENDING", "result": None},
+    }
+
+
+def test_bulk_task_status_endpoint(client: TestClient, result_redis, settings):
+    response = client.post("/api/v1/inference/task_status", json={"task_ids": ["a", "b"]})
+    assert response.status_code == 200
+    assert response.json() == {"a": {"state": "PENDING", "result": None}, "b": {"state": "PENDING", "result": None}}
+
+    too_many = [str(i) for i in range(settings.TASK_STATUS_MAX_IDS + 1)]
+    assert client.post("/api/v1/inference/task_status", json={"task_ids": too_many}).status_code == 422
+    assert client.post("/api/v1/inference/task_status", json={"task_ids": []}).status_code == 422
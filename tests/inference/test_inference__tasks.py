@@ -2,7 +2,13 @@ import pytest
 import asyncio
 from unittest.mock import MagicMock, patch, ANY
 from celery.result import AsyncResult
-from project.inference.tasks import run_model, task_success_handler
+from project.inference.tasks import (
+    run_model,
+    task_failure_handler,
+    task_postrun_handler,
+    task_prerun_handler,
+    task_revoked_handler,
+)
 from project.inference.models import ServiceCall
 from sqlalchemy import select
 from project.inference.model_registry import model_registry
@@ -57,22 +63,42 @@ async def test_run_model_not_found(db_session, setup_inference_objects):
         
         
 @pytest.mark.asyncio
-async def test_task_success_handler():
-    # Mock the sender and result
-    mock_sender = MagicMock()
-    mock_sender.request.id = "mocked_task_id"
-    mock_result = {"result": "success"}
-
+async def test_task_postrun_handler():
     # Mock the update_service_call_time_completed function
     with patch("project.inference.tasks.update_service_call_time_completed", new_callable=MagicMock) as mock_update:
-        # Call the success handler
-        task_success_handler(sender=mock_sender, result=mock_result)
+        # A retry also runs postrun and must not complete the service call
+        task_postrun_handler(sender=run_model, task_id="mocked_task_id", state="RETRY")
+        task_postrun_handler(sender=run_model, task_id="mocked_task_id", state="SUCCESS")
 
         # Ensure the update_service_call_time_completed function was called with the correct arguments
         await asyncio.sleep(0.1)  # Give the event loop a chance to run the task
         mock_update.assert_called_once_with(ANY, "mocked_task_id", ANY)
+
+
+@pytest.mark.asyncio
+async def test_task_prerun_and_failure_handlers():
+    with patch("project.inference.tasks.mark_service_call_started", new_callable=MagicMock) as mock_started, \
+            patch("project.inference.tasks.mark_service_call_failed", new_callable=MagicMock) as mock_failed:
+        task_prerun_handler(sender=run_model, task_id="mocked_task_id")
+        task_failure_handler(sender=run_model, task_id="mocked_task_id", exception=ValueError())
+
+        await asyncio.sleep(0.1)
+        mock_started.assert_called_once_with(ANY, "mocked_task_id", ANY)
+        mock_failed.assert_called_once_with(ANY, "mocked_task_id", ANY)
         
         
+@pytest.mark.asyncio
+async def test_task_revoked_handler_marks_expired_calls():
+    with patch("project.inference.tasks.crud.mark_service_call_expired", new_callable=MagicMock) as mock_expired:
+        request = MagicMock(id="mocked_task_id")
+        # A revoke that is not an expiry leaves the service call alone
+        task_revoked_handler(sender=run_model, request=request, expired=False)
+        task_revoked_handler(sender=run_model, request=request, expired=True)
+
+        await asyncio.sleep(0.1)
+        mock_expired.assert_called_once_with(ANY, "mocked_task_id", ANY)
+
+
 @pytest.mark.asyncio
 async def test_run_model_cache_hit(db_session, setup_inference_objects):
     objects = await setup_inference_objects
@@ -100,6 +126,7 @@ async def test_run_model_cache_hit(db_session, setup_inference_objects):
         assert result == {"result": "cached_success"}
 
         # Ensure the cache was checked but not set
-        cache_key = f"model_{model_id}_result_{hash(frozenset(input_data.items()))}"
+        version = model_registry[model_id]["version"]
+        cache_key = f"model_{model_id}_{version}_result_{hash(frozenset(input_data.items()))}"
         mock_redis_client.get.assert_called_once_with(cache_key)
         mock_redis_client.set.assert_not_called()
\ No newline at end of file
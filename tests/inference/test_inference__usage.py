@@ -0,0 +1,117 @@
+import fakeredis
+import pytest
+from fakeredis import aioredis
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+from project import redis_utils
+from project.inference import crud, usage
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    # Requests count on the asyncio client, the flush reads on the blocking one
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeStrictRedis(server=server)
+    monkeypatch.setattr(redis_utils, "redis_client", client)
+    monkeypatch.setattr(redis_utils, "async_redis_client", aioredis.FakeRedis(server=server))
+    return client
+
+
+async def _user_access(db_session, objects):
+    async with db_session() as session:
+        return await crud.get_user_access(session, objects['user'].id, objects['model'].id)
+
+
+@pytest.mark.asyncio
+async def test_calls_are_counted_in_redis_and_flushed_once(db_session, fake_redis, setup_inference_objects):
+    objects = await setup_inference_objects
+    before = await _user_access(db_session, objects)
+
+    async with db_session() as session:
+        for _ in range(3):
+            assert (await crud.check_user_access_and_update(session, objects['user'].id, objects['model'].id))[0]
+    # The row is left alone until the flush
+    assert (await _user_access(db_session, objects)).api_calls == before.api_calls
+
+    async with db_session() as session:
+        assert await usage.flush(session) == 1
+        assert await usage.flush(session) == 0
+
+    user_access = await _user_access(db_session, objects)
+    assert user_access.api_calls == before.api_calls + 3
+    last_accessed = user_access.last_accessed.replace(tzinfo=user_access.last_accessed.tzinfo or timezone.utc)
+    assert abs((last_accessed - datetime.now(timezone.utc)).total_seconds()) < 60
+    assert not fake_redis.exists(usage.CALLS_KEY, usage.LAST_ACCESSED_KEY)
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_the_pending_calls(db_session, fake_redis, setup_inference_objects):
+    objects = await setup_inference_objects
+    await usage.record_call(objects['user'].id, objects['model'].id)
+    session = MagicMock()
+    session.execute.side_effect = RuntimeError("database down")
+
+    with pytest.raises(RuntimeError):
+        await usage.flush(session)
+
+    field = f"{objects['user'].id}:{objects['model'].id}"
+    assert int(fake_redis.hget(usage.CALLS_KEY, field)) == 1
+    assert fake_redis.hexists(usage.LAST_ACCESSED_KEY, field)
+
+
+@pytest.mark.asyncio
+async def test_calls_counted_during_a_flush_are_kept(db_session, fake_redis, setup_inference_objects):
+    objects = await setup_inference_objects
+    before = await _user_access(db_session, objects)
+    field = f"{objects['user'].id}:{objects['model'].id}"
+    await usage.record_call(objects['user'].id, objects['model'].id)
+
+    async with db_session() as session:
+        commit = session.commit
+
+        async def commit_with_a_concurrent_call():
+            await usage.record_call(objects['user'].id, objects['model'].id)
+            await commit()
+        session.commit = commit_with_a_concurrent_call
+        assert await usage.flush(session) == 1
+
+    assert int(fake_redis.hget(usage.CALLS_KEY, field)) == 1
+    async with db_session() as session:
+        assert await usage.flush(session) == 1
+    assert (await _user_access(db_session, objects)).api_calls == before.api_calls + 2
+    assert not fake_redis.exists(usage.CALLS_KEY, usage.LAST_ACCESSED_KEY)
+
+
+@pytest.mark.asyncio
+async def test_refunds_are_flushed_as_negative_calls(db_session, fake_redis, setup_inference_objects):
+    objects = await setup_inference_objects
+    before = await _user_access(db_session, objects)
+    user_id, model_id = objects['user'].id, objects['model'].id
+
+    await usage.record_call(user_id, model_id)
+    await usage.refund_call(user_id, model_id)
+    async with db_session() as session:
+        # Nothing pending, the call and its refund cancel out
+        assert await usage.flush(session) == 0
+    await usage.refund_call(user_id, model_id)
+    fake_redis.hdel(usage.LAST_ACCESSED_KEY, f"{user_id}:{model_id}")
+    async with db_session() as session:
+        assert await usage.flush(session) == 1
+
+    user_access = await _user_access(db_session, objects)
+    assert user_access.api_calls == before.api_calls - 1
+    assert user_access.last_accessed == before.last_accessed
+
+
+@pytest.mark.asyncio
+async def test_rows_are_updated_directly_without_redis(db_session, setup_inference_objects, monkeypatch):
+    objects = await setup_inference_objects
+    broken = MagicMock()
+    broken.pipeline.return_value.execute = AsyncMock(side_effect=usage.redis.ConnectionError)
+    monkeypatch.setattr(redis_utils, "async_redis_client", broken)
+    before = await _user_access(db_session, objects)
+
+    async with db_session() as session:
+        await crud.check_user_access_and_update(session, objects['user'].id, objects['model'].id)
+
+    assert (await _user_access(db_session, objects)).api_calls == before.api_calls + 1
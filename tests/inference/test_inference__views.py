@@ -10,6 +10,9 @@ from project.inference import views
 from unittest.mock import MagicMock
 from project.inference.models import InferenceModel, ServiceCall
 from project.inference.ml_models.schemas import TemperatureModelInput
+from project.inference.model_registry import model_registry
+
+TEMPERATURE_LOADER = "project.inference.ml_models.tempertaure_predictor:TemperatureModel"
 
 @pytest.fixture
 def override_current_active_user():
@@ -229,7 +232,7 @@ async def test_task_status(
     mock_task_id = "mocked_task_id"
     mock_task = MagicMock()
     mock_task.task_id = mock_task_id
-    monkeypatch.setattr(views.tasks.run_model, "delay", lambda model_id: mock_task)
+    monkeypatch.setattr(views.tasks.run_model, "apply_async", lambda args=(), kwargs=None, **options: mock_task)
 
     # Create a task
     response = client.get(f"/api/v1/inference/predict/{objects['model'].id}")
@@ -492,4 +495,141 @@ async def test_predict_temperature_unauthorized(
     assert "access" in response.json()["detail"].lower()
 
     # Clean up the dependency override
-    client.app.dependency_overrides.clear()
\ No newline at end of file
+    client.app.dependency_overrides.clear()
+
+@pytest.mark.asyncio
+async def test_latency_stats(client: TestClient, db_session, setup_inference_objects, override_current_superuser):
+    objects = await setup_inference_objects
+    superuser = User(id=uuid4(), email="admin@example.com", hashed_password="hashed_password", is_superuser=True)
+    client.app.dependency_overrides[views.current_superuser] = override_current_superuser(superuser)
+
+    response = client.get(f"/api/v1/inference/latency/{objects['model'].id}")
+
+    assert response.status_code == 200
+    assert response.json()["model_id"] == objects['model'].id
+    assert set(response.json()["windows"]) == {"5m", "1h", "24h"}
+    assert response.json()["windows"]["5m"]["calls"] == 0
+
+    client.app.dependency_overrides.clear()
+
+
+def test_reload_model_publishes_to_workers(client: TestClient, monkeypatch, override_current_superuser):
+    published = MagicMock(return_value=2)
+    monkeypatch.setattr(views, "publish_model_reload", published)
+    superuser = User(id=uuid4(), email="admin@example.com", hashed_password="hashed_password", is_superuser=True)
+    client.app.dependency_overrides[views.current_superuser] = override_current_superuser(superuser)
+
+    response = client.post("/api/v1/inference/models/2/reload", json={"version": "1.1.0"})
+
+    assert response.status_code == 200
+    assert response.json() == {"model_id": 2, "receivers": 2}
+    published.assert_called_once_with(2, None, "1.1.0")
+
+    response = client.post("/api/v1/inference/models/424242/reload", json={})
+    assert response.status_code == 404
+
+    # Only declared loaders or classes of the model package can be loaded
+    response = client.post("/api/v1/inference/models/2/reload", json={"loader": "os:system", "version": "1.2.0"})
+    assert response.status_code == 422
+    response = client.post(
+        "/api/v1/inference/models/2/reload",
+        json={"loader": "project.inference.ml_models.linreg_placeholder:LinearPlaceholderModel"},
+    )
+    assert response.status_code == 422
+    published.assert_called_once()
+
+    client.app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_predict_temperature_routes_canary_traffic(
+    client: TestClient,
+    db_session,
+    setup_inference_objects,
+    mock_run_model,
+    monkeypatch,
+    override_current_active_user,
+    temperature_model_input
+):
+    objects = await setup_inference_objects
+    model_id = objects['model'].id
+    client.app.dependency_overrides[views.current_active_user] = override_current_active_user(objects['user'])
+
+    canary = {"id": 4242, "deployment_status": "Canary", "traffic_percent": 100}
+    monkeypatch.setattr(views.registry_service, "candidates", lambda requested: [canary])
+    enqueued = MagicMock(return_value=MagicMock(task_id="mocked_task_id"))
+    monkeypatch.setattr(views.tasks.run_model, "apply_async", enqueued)
+
+    response = client.post(f"/api/v1/inference/predict-temp/{model_id}", json=temperature_model_input.dict())
+
+    assert response.status_code == 200
+    assert enqueued.call_args.kwargs["args"][0] == 4242
+    async with db_session() as session:
+        result = await session.execute(select(ServiceCall).where(ServiceCall.celery_task_id == "mocked_task_id"))
+        service_call = result.scalars().first()
+    assert service_call.model_id == model_id
+    assert service_call.served_model_id == 4242
+
+    client.app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_predict_batch(
+    client: TestClient,
+    db_session,
+    setup_inference_objects,
+    mock_run_model,
+    monkeypatch,
+    override_current_active_user
+):
+    objects = await setup_inference_objects
+    model_id = objects['model'].id
+    monkeypatch.setitem(model_registry, model_id, {**objects['model_registry_entry'], "loader": TEMPERATURE_LOADER})
+    client.app.dependency_overrides[views.current_active_user] = override_current_active_user(objects['user'])
+    enqueued = MagicMock(return_value=MagicMock(task_id="mocked_task_id"))
+    monkeypatch.setattr(views.tasks.run_model_batch, "apply_async", enqueued)
+
+    columns = {"latitude": [40, -10], "longitude": [-74, 20], "month": [6, 1], "hour": [14, 3]}
+    response = client.post(f"/api/v1/inference/predict-batch/{model_id}", json={"columns": columns})
+
+    assert response.status_code == 200
+    assert response.json() == {"task_id": "mocked_task_id"}
+    assert enqueued.call_args.kwargs["args"] == (model_id, columns)
+
+    response = client.post(
+        f"/api/v1/inference/predict-batch/{model_id}", json={"columns": {**columns, "hour": [14]}}
+    )
+    assert response.status_code == 422
+
+    client.app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_predict_batch_rejects_columns_not_matching_the_model(
+    client: TestClient,
+    db_session,
+    setup_inference_objects,
+    monkeypatch,
+    override_current_active_user
+):
+    objects = await setup_inference_objects
+    model_id = objects['model'].id
+    monkeypatch.setitem(model_registry, model_id, {**objects['model_registry_entry'], "loader": TEMPERATURE_LOADER})
+    client.app.dependency_overrides[views.current_active_user] = override_current_active_user(objects['user'])
+    enqueued = MagicMock(return_value=MagicMock(task_id="mocked_task_id"))
+    monkeypatch.setattr(views.tasks.run_model_batch, "apply_async", enqueued)
+    monkeypatch.setattr(views.crud, "check_user_access_and_update", MagicMock(side_effect=AssertionError))
+
+    for columns in (
+        {"latitude": [40], "longitude": [-74], "month": [6]},
+        {"latitude": [40], "longitude": [-74], "month": [6], "hour": ["noon"]},
+    ):
+        response = client.post(f"/api/v1/inference/predict-batch/{model_id}", json={"columns": columns})
+        assert response.status_code == 422
+
+    enqueued.assert_not_called()
+    async with db_session() as session:
+        result = await session.execute(select(ServiceCall).where(ServiceCall.model_id == model_id))
+        assert result.scalars().first() is None
+
+    client.app.dependency_overrides.clear()
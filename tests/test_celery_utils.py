@@ -0,0 +1,108 @@
+import os
+import pytest
+import subprocess
+import sys
+import threading
+from unittest.mock import MagicMock
+from prometheus_client import REGISTRY
+from project.celery_utils import enqueue_task
+
+
+class FakeTask:
+    name = "project.inference.tasks.fake"
+
+    def __init__(self):
+        self.calls = []
+
+    def apply_async(self, args=(), kwargs=None, **options):
+        self.calls.append((threading.current_thread().name, args, options))
+        return "result"
+
+
+@pytest.mark.asyncio
+async def test_enqueue_task_publishes_off_the_event_loop():
+    task = FakeTask()
+    labels = {"task": FakeTask.name, "outcome": "ok"}
+    before = REGISTRY.get_sample_value("celery_task_publish_duration_seconds_count", labels) or 0
+
+    result = await enqueue_task(task, (1, {"a": 1}), task_id="abc")
+
+    assert result == "result"
+    thread_name, args, options = task.calls[0]
+    assert thread_name.startswith("celery-publish")
+    assert args == (1, {"a": 1})
+    assert options == {"task_id": "abc"}
+    assert REGISTRY.get_sample_value("celery_task_publish_duration_seconds_count", labels) == before + 1
+
+
+def test_celery_app_uses_the_configured_performance_profile(app, settings):
+    profile = settings.CELERY_PERFORMANCE_PROFILES[settings.CELERY_PROFILE]
+    conf = app.celery_app.conf
+    assert conf.worker_prefetch_multiplier == profile["worker_prefetch_multiplier"]
+    assert conf.task_acks_late == profile["task_acks_late"]
+    assert conf.task_ignore_result == profile["task_ignore_result"]
+    assert conf.result_expires == profile["result_expires"]
+    assert conf.result_backend_thread_safe == profile["result_backend_thread_safe"]
+    assert conf.worker_pool == profile["worker_pool"]
+
+
+def test_unknown_celery_profile_lists_the_valid_ones():
+    env = dict(os.environ, CELERY_PROFILE="fastest")
+    result = subprocess.run(
+        [sys.executable, "-c", "import project.config"], capture_output=True, text=True, env=env
+    )
+    assert result.returncode != 0
+    assert "ValueError: Unknown CELERY_PROFILE 'fastest', expected one of: latency, throughput, io, memory" in result.stderr
+
+
+def test_worker_tasks_are_bound_after_the_config_is_loaded():
+    # Test collection already bound the tasks in this process, start the
+    # way `celery -A main.celery worker` does in a fresh interpreter
+    code = "import main; from project.inference.tasks import run_model; print(run_model.acks_late)"
+    env = dict(os.environ, CELERY_PROFILE="throughput")
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True
+    ).stdout
+    assert output.strip().splitlines()[-1] == "False"
+
+    env["CELERY_PROFILE"] = "latency"
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True
+    ).stdout
+    assert output.strip().splitlines()[-1] == "True"
+
+
+def test_failed_tasks_are_dead_lettered_without_retry(monkeypatch):
+    import fakeredis
+    from pydantic import BaseModel
+    from celery.exceptions import Retry
+    from project import dead_letter, redis_utils
+    from project.inference.tasks import run_model
+
+    monkeypatch.setattr(redis_utils, "redis_client", fakeredis.FakeStrictRedis())
+    retry = MagicMock(side_effect=Retry)
+    monkeypatch.setattr(run_model, "retry", retry)
+
+    class Input(BaseModel):
+        value: float
+
+    # Invalid inputs are poison, they are dead-lettered right away
+    monkeypatch.setattr("project.inference.tasks.get_model", MagicMock(return_value=MagicMock(Input=Input)))
+    with pytest.raises(ValueError):
+        run_model(1, {"not": "an input"})
+    retry.assert_not_called()
+
+    # Other failures are retried by the decorator alone, then dead-lettered
+    monkeypatch.setattr("project.inference.tasks.get_model", MagicMock(side_effect=RuntimeError("boom")))
+    with pytest.raises(Retry):
+        run_model(1, {})
+    retry.assert_called_once()
+    # Direct calls run as the first attempt, spend the budget instead
+    monkeypatch.setattr(run_model, "max_retries", 0)
+    with pytest.raises(RuntimeError):
+        run_model(1, {})
+    retry.assert_called_once()
+
+    letters = dead_letter.read()
+    assert [letter["exception"].split(":")[0] for letter in letters] == ["RuntimeError", "ValidationError"]
+    assert letters[1]["args"] == [1, {"not": "an input"}]
@@ -0,0 +1,78 @@
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from project import metrics
+from project.redis_utils import get_cache
+
+
+def _sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_metrics_endpoint_exposes_request_latency(client: TestClient):
+    labels = {"method": "GET", "route": "/api/v1/inference/health", "status": "200"}
+    before = _sample("http_request_duration_seconds_count", labels)
+
+    client.get("/api/v1/inference/health")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert "http_request_duration_seconds_bucket" in response.text
+    assert _sample("http_request_duration_seconds_count", labels) == before + 1
+
+
+def test_task_signals_record_queue_wait_and_runtime():
+    task = SimpleNamespace(name="project.inference.tasks.run_model", request=SimpleNamespace())
+    headers = {}
+    metrics.stamp_enqueue_time(headers=headers)
+    task.request.enqueued_at = headers["enqueued_at"] - 0.5
+
+    wait_labels = {"task": task.name}
+    runtime_labels = {"task": task.name, "model_id": "7"}
+    wait_before = _sample("celery_task_queue_wait_seconds_sum", wait_labels)
+    runtime_before = _sample("celery_task_runtime_seconds_count", runtime_labels)
+
+    metrics.record_task_start(task_id="abc", task=task)
+    time.sleep(0.01)
+    metrics.record_task_runtime(task_id="abc", task=task, args=(7, {}), kwargs={})
+
+    assert _sample("celery_task_queue_wait_seconds_sum", wait_labels) >= wait_before + 0.5
+    assert _sample("celery_task_runtime_seconds_count", runtime_labels) == runtime_before + 1
+
+
+def test_expired_and_late_tasks_are_counted():
+    labels = {"task": "project.inference.tasks.run_model"}
+    expired_before = _sample("celery_tasks_expired_total", labels)
+    late_before = _sample("celery_tasks_completed_late_total", labels)
+    past = (datetime.now(timezone.utc) - timedelta(seconds=5)).isoformat()
+    task = SimpleNamespace(name=labels["task"], request=SimpleNamespace(expires=past))
+
+    metrics.record_task_expired(sender=task, expired=True)
+    metrics.record_task_expired(sender=task, expired=False)
+    metrics.record_task_start(task_id="late", task=task)
+    metrics.record_task_runtime(task_id="late", task=task, args=(7,), kwargs={})
+
+    assert _sample("celery_tasks_expired_total", labels) == expired_before + 1
+    assert _sample("celery_tasks_completed_late_total", labels) == late_before + 1
+
+
+def test_cache_lookups_are_counted():
+    hits_before = _sample("cache_requests_total", {"result": "hit"})
+    misses_before = _sample("cache_requests_total", {"result": "miss"})
+
+    with patch('project.redis_utils.redis_client') as mock_redis_client:
+        mock_redis_client.get.side_effect = [b'{"a": 1}', None]
+        get_cache("k1")
+        get_cache("k2")
+
+    assert _sample("cache_requests_total", {"result": "hit"}) == hits_before + 1
+    assert _sample("cache_requests_total", {"result": "miss"}) == misses_before + 1
+
+
+def test_worker_exporter_port_in_use_does_not_stop_the_worker():
+    with patch.object(metrics, "start_http_server", side_effect=OSError(98, "Address already in use")) as server:
+        metrics.start_worker_exporter()
+    server.assert_called_once()
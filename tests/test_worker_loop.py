@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import pytest
+from datetime import datetime, timezone
+from sqlalchemy import select
+from project.inference.crud import create_service_call, mark_service_call_started
+from project.inference.models import ServiceCall
+from types import SimpleNamespace
+from project.inference import tasks
+from project.inference.tasks import run_in_session
+from project.worker_loop import WorkerEventLoop
+from tests.factories import InferenceModelFactory, AccessPolicyFactory, UserFactory
+
+
+@pytest.fixture
+def event_loop_thread():
+    loop = WorkerEventLoop()
+    yield loop
+    loop.stop()
+
+
+def test_submit_runs_on_one_persistent_thread(event_loop_thread):
+    async def thread_name():
+        return threading.current_thread().name
+
+    names = {event_loop_thread.submit(thread_name()).result(1) for _ in range(3)}
+
+    assert names == {"worker-event-loop"}
+
+
+def test_submit_keeps_order_per_key(event_loop_thread):
+    events = []
+
+    async def record(name, delay):
+        await asyncio.sleep(delay)
+        events.append(name)
+
+    first = event_loop_thread.submit(record("started", 0.05), key="task-1")
+    other = event_loop_thread.submit(record("other", 0), key="task-2")
+    second = event_loop_thread.submit(record("completed", 0), key="task-1")
+    for future in (first, other, second):
+        future.result(1)
+
+    assert events == ["other", "started", "completed"]
+
+
+def test_loop_restarts_in_forked_process(event_loop_thread):
+    event_loop_thread.ensure_started()
+    inherited = event_loop_thread.loop
+
+    # As seen from a prefork child
+    event_loop_thread._pid = -1
+    event_loop_thread.ensure_started()
+
+    assert event_loop_thread.loop is not inherited
+    assert event_loop_thread.running
+    inherited.call_soon_threadsafe(inherited.stop)
+
+
+def test_stop_waits_for_submitted_coroutines():
+    loop = WorkerEventLoop()
+    events = []
+
+    async def record():
+        await asyncio.sleep(0.05)
+        events.append("completed")
+
+    future = loop.submit(record())
+    loop.stop()
+
+    assert events == ["completed"]
+    assert future.done()
+    assert not loop.running
+
+
+def test_redis_client_is_bound_to_the_loop_and_closed_with_it(monkeypatch):
+    loop = WorkerEventLoop()
+    loop.ensure_started()
+    client = loop.redis
+    closed = []
+
+    async def aclose():
+        closed.append(asyncio.get_running_loop())
+    monkeypatch.setattr(client, "aclose", aclose)
+    running_loop = loop.loop
+
+    loop.stop()
+
+    assert closed == [running_loop]
+
+
+@pytest.mark.parametrize("pool, started", [("threads", True), ("prefork", False), ("solo", False)])
+def test_worker_init_runs_process_hooks_without_child_processes(monkeypatch, pool, started):
+    calls = []
+    monkeypatch.setattr(tasks, "warmup_worker_models", lambda **kwargs: calls.append("warmup"))
+    monkeypatch.setattr(tasks, "listen_for_model_reloads", lambda **kwargs: calls.append("listen"))
+
+    tasks.init_worker_without_children(sender=SimpleNamespace(pool_cls=pool))
+
+    assert calls == (["warmup", "listen"] if started else [])
+
+
+@pytest.mark.parametrize("pool, stopped", [("threads", True), ("solo", True), ("prefork", False)])
+def test_worker_shutdown_stops_loop_without_child_processes(monkeypatch, pool, stopped):
+    calls = []
+    monkeypatch.setattr(tasks, "stop_worker_loop", lambda **kwargs: calls.append("stop"))
+
+    tasks.shutdown_worker_without_children(sender=SimpleNamespace(pool_cls=pool))
+
+    assert calls == (["stop"] if stopped else [])
+
+
+@pytest.mark.asyncio
+async def test_run_in_session_uses_the_worker_loop(db_session, settings, monkeypatch):
+    monkeypatch.setattr(settings, "WORKER_EVENT_LOOP", True)
+    async with db_session() as session:
+        for factory in (AccessPolicyFactory, InferenceModelFactory, UserFactory):
+            factory._meta.sqlalchemy_session = session
+        policy = AccessPolicyFactory()
+        await session.flush()
+        model = InferenceModelFactory(access_policy_id=policy.id)
+        user = UserFactory()
+        await session.commit()
+        await create_service_call(session, model.id, user.id, celery_task_id="loop-task")
+
+    future = run_in_session(mark_service_call_started, "loop-task", datetime.now(timezone.utc))
+    await asyncio.wrap_future(future)
+
+    async with db_session() as session:
+        service_call = (await session.execute(
+            select(ServiceCall).where(ServiceCall.celery_task_id == "loop-task")
+        )).scalars().first()
+    assert service_call.time_started is not None